@@ -4,8 +4,9 @@ from urllib.parse import quote, unquote
 import dash_bootstrap_components as dbc
 from utils.api_reader import ApiReader
 from utils.data_manager import DataManager
+from utils import metrics
 from flask_login import LoginManager, UserMixin
-from flask import Flask, session, send_from_directory, request
+from flask import Flask, session, send_from_directory, request, Response
 from flask_session import Session 
 import logging
 import os
@@ -112,7 +113,8 @@ def exempt_paths():
         path.startswith('/static/'),
         path.startswith('/assets/'),
         path.endswith(('.js', '.css', '.png', '.jpg', '.ico', '.svg', '.woff', '.woff2', '.ttf', '.json', '.map')),
-        path == '/health'
+        path == '/health',
+        path == '/metrics'
     ])
 
 # Special high-limit decorator for Dash development routes
@@ -142,12 +144,16 @@ def create_app():
                 raise RuntimeError(f"Config directory not found at {config_dir}")
             
             logger.info(f"Attempting to initialize DataManager...")
-            data_manager = DataManager('conf')  # Use just the directory name for Hydra
-            logger.info("DataManager initialized successfully")
+            # In snapshot mode the ingestion service (utils/ingest.py) refreshes
+            # Redis and web workers never call the pool API themselves
+            snapshot_mode = os.getenv('DATA_MANAGER_MODE', 'direct') == 'snapshot'
+            data_manager = DataManager('conf', read_only=snapshot_mode)  # Use just the directory name for Hydra
+            logger.info(f"DataManager initialized successfully (snapshot mode: {snapshot_mode})")
             
-            logger.info("Attempting to update data...")
-            data_manager.update_data()
-            logger.info("Data update completed successfully")
+            if not snapshot_mode:
+                logger.info("Attempting to update data...")
+                data_manager.update_data()
+                logger.info("Data update completed successfully")
             
             logger.info("Initializing ApiReader...")
             api_reader = ApiReader(data_manager)
@@ -185,6 +191,14 @@ def create_app():
     def _reload_route(path):
         return dash_app.server._reload_route(path)
 
+    # Prometheus metrics, merged across gunicorn workers (see utils/metrics.py)
+    metrics.instrument_dash(server)
+
+    @server.route('/metrics')
+    def metrics_route():
+        body, content_type = metrics.render()
+        return Response(body, mimetype=content_type)
+
     # Add routes to serve React app
     @server.route('/mint/')
     @server.route('/mint')
@@ -8,5 +8,22 @@
 # Run the database initialization script
 # python3 -m utils.init_db
 
-# Start the web server with gunicorn
-gunicorn -w 4 --timeout 2000 -b 0.0.0.0:8050 app:application
+# Prometheus multiprocess metrics: workers write here and /metrics merges them.
+# Files from a previous run would be merged too, so start from an empty directory.
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Worker model. Upstream requests run on each worker's asyncio loop, so a
+# worker only needs enough request slots to wait on them:
+#   gthread (default) - GUNICORN_THREADS request threads per worker
+#   sync              - one request at a time per worker (previous behaviour)
+GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
+GUNICORN_WORKER_CLASS=${GUNICORN_WORKER_CLASS:-gthread}
+case "$GUNICORN_WORKER_CLASS" in
+    gthread) WORKER_ARGS="-k gthread --threads ${GUNICORN_THREADS:-32}" ;;
+    *)       WORKER_ARGS="-k sync" ;;
+esac
+
+# Start the web server with gunicorn (gunicorn.conf.py is picked up automatically)
+gunicorn -w "$GUNICORN_WORKERS" $WORKER_ARGS --timeout 2000 -b 0.0.0.0:8050 app:application
@@ -0,0 +1,7 @@
+# gunicorn.conf.py
+# Loaded automatically by gunicorn from the working directory.
+from utils import metrics
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the merged /metrics output
+    metrics.mark_process_dead(worker.pid)
@@ -14,6 +14,7 @@ from typing import Dict
 import uuid
 import os
 from utils.get_erg_prices import PriceReader
+from utils.hashrate_series import DEFAULT_RANGE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -176,13 +177,13 @@ def setup_front_page_callbacks(app, api_reader):
     def update_metrics(n):
         try:
             data = api_reader.get_pool_stats()
-            block_data = api_reader.get_block_stats()
+            block_summary = api_reader.get_block_summary()
             
             data['minimumpayment'] = 0.5
             data['fee'] = 0.9
             data['paid'] = api_reader.get_payment_stats()['total_paid']
             data['payoutscheme'] = 'PPLNS'
-            data['blocks'] = len(block_data) if block_data else 0
+            data['blocks'] = block_summary['count']
             
             left_stats = [
                 ('Minimum Payout:', str(data['minimumpayment'])),
@@ -254,21 +255,17 @@ def setup_front_page_callbacks(app, api_reader):
 
     @app.callback(
         [Output('plot-1', 'figure'), Output('plot-title', 'children')],
-        [Input('fp-int-2', 'n_intervals'), Input('chart-dropdown', 'value')],
+        [Input('fp-int-2', 'n_intervals'), Input('chart-dropdown', 'value'), Input('hash-range', 'value')],
         prevent_initial_call=False
     )
-    def update_plots(n, value):
+    def update_plots(n, value, hash_range):
         try:
             if value == 'effort':
-                block_data = api_reader.get_block_stats()
-                block_df = pd.DataFrame(block_data)
+                # Cumulative mean effort per block, oldest first, kept by the block store
+                block_df = pd.DataFrame(api_reader.get_block_summary()['effort_curve'])
                 if not block_df.empty:
-                    block_df['rolling_effort'] = block_df['effort'].expanding().mean()
-                    block_df['effort'] = block_df['effort'] * 100
                     title = 'EFFORT AND DIFFICULTY'
                     
-                    block_df = block_df.rename(columns={'created': 'time_found'})
-                    block_df = block_df.sort_values('time_found')
                     response_df = block_df.melt(id_vars=['time_found'], value_vars=['rolling_effort', 
                                                                                     # 'effort', 'networkdifficulty'
                                                                                    ])
@@ -302,18 +299,38 @@ def setup_front_page_callbacks(app, api_reader):
                     return effort_response_chart, title
 
             title = 'HASHRATE OVER TIME'
-            data = api_reader.get_total_hash_stats()
+            # Already sorted and downsampled to the selected range
+            data = api_reader.get_total_hash_stats(hash_range or DEFAULT_RANGE)
             performance_df = pd.DataFrame(data)
             
             performance_df = performance_df.rename(columns={
                 'timestamp': 'Time',
                 'total_hashrate': 'hashrate'
             })
-            performance_df['hashrate'] = performance_df['hashrate'] / 1e9
-            performance_df = performance_df.sort_values(['Time'])
+            for column in ['hashrate', 'min', 'max']:
+                performance_df[column] = performance_df[column] / 1e9
             
             total_hashrate_plot = {
                 'data': [
+                    # Min/max band of each downsampled point
+                    go.Scatter(
+                        x=performance_df['Time'],
+                        y=performance_df['max'],
+                        mode='lines',
+                        line={'width': 0},
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ),
+                    go.Scatter(
+                        x=performance_df['Time'],
+                        y=performance_df['min'],
+                        mode='lines',
+                        line={'width': 0},
+                        fill='tonexty',
+                        fillcolor='rgba(255,255,255,0.1)',
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ),
                     go.Scatter(
                         x=performance_df['Time'],
                         y=performance_df['hashrate'],
@@ -604,19 +621,34 @@ def get_layout(api_reader):
                                 'letterSpacing': '0.03em'
                             }
                         ),
-                        dcc.Dropdown(
-                            id='chart-dropdown',
-                            options=[
-                                {'label': 'Hashrate', 'value': 'hash'},
-                                {'label': 'Effort', 'value': 'effort'}
-                            ],
-                            value='hash',
-                            style={
-                                'width': '300px',
-                                'color': 'black',
-                                'borderRadius': '4px'
-                            }
-                        )
+                        html.Div([
+                            dcc.RadioItems(
+                                id='hash-range',
+                                options=[
+                                    {'label': '24H', 'value': '1d'},
+                                    {'label': '7D', 'value': '7d'},
+                                    {'label': '30D', 'value': '30d'},
+                                    {'label': 'All', 'value': 'all'}
+                                ],
+                                value=DEFAULT_RANGE,
+                                inline=True,
+                                inputStyle={'marginRight': '4px'},
+                                labelStyle={'marginRight': '12px'}
+                            ),
+                            dcc.Dropdown(
+                                id='chart-dropdown',
+                                options=[
+                                    {'label': 'Hashrate', 'value': 'hash'},
+                                    {'label': 'Effort', 'value': 'effort'}
+                                ],
+                                value='hash',
+                                style={
+                                    'width': '300px',
+                                    'color': 'black',
+                                    'borderRadius': '4px'
+                                }
+                            )
+                        ], style={'display': 'flex', 'alignItems': 'center'})
                     ], style={
                         'display': 'flex',
                         'justifyContent': 'space-between',
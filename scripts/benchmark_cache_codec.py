@@ -0,0 +1,139 @@
+"""
+Compare cache codecs on the payload shape of every DataManager cache.
+
+Raw endpoint payloads are reduced with prepare_cache_data, so each cache is
+benchmarked with the summary DataManager actually stores, not the raw list.
+
+For each endpoint and each available serializer/compression pair this reports
+encode time, decode time and the number of bytes that would be stored in Redis.
+
+Usage:
+    python scripts/benchmark_cache_codec.py                  # synthetic payloads
+    python scripts/benchmark_cache_codec.py --live           # real payloads from the pool API
+    python scripts/benchmark_cache_codec.py --api http://5.78.102.130:8000 --live
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.cache_codec import CacheCodec, SERIALIZERS, COMPRESSORS, DEFAULT_COMPRESS_THRESHOLD  # noqa: E402
+from utils.data_manager import ENDPOINTS, prepare_cache_data  # noqa: E402
+from utils.demurrage_utils import DEMURRAGE_WALLET  # noqa: E402
+
+DEFAULT_API = 'http://5.78.102.130:8000'
+
+def _address(rng):
+    return '9' + ''.join(rng.choice('abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ123456789') for _ in range(50))
+
+def _timestamp(rng, days=365):
+    moment = datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, days * 86400))
+    return moment.isoformat() + 'Z'
+
+def synthetic_payloads(seed=7):
+    """Raw payloads shaped like the upstream responses, sized like a mature pool"""
+    rng = random.Random(seed)
+    miners = [_address(rng) for _ in range(400)]
+    return {
+        'total_hash_stats': [
+            {'timestamp': _timestamp(rng), 'total_hashrate': rng.uniform(5e9, 2e10)} for _ in range(8000)
+        ],
+        'payment_stats': [
+            {
+                'address': rng.choice(miners), 'amount': rng.uniform(0.5, 20),
+                'created': _timestamp(rng), 'status': 'confirmed',
+                'transactionconfirmationdata': os.urandom(32).hex()
+            } for _ in range(20000)
+        ],
+        'pool_stats': {
+            'poolhashrate': 1.2e10, 'networkhashrate': 1.5e13, 'networkdifficulty': 1.9e15,
+            'connectedminers': 250, 'sharespersecond': 12.5, 'blockheight': 1400000,
+            'lastnetworkblocktime': _timestamp(rng), 'effort': 0.83
+        },
+        'block_stats': [
+            {
+                'created': _timestamp(rng), 'blockheight': 1000000 + i, 'effort': rng.uniform(0.1, 3),
+                'confirmationprogress': 1.0, 'reward': 27.0, 'miner': rng.choice(miners),
+                'networkdifficulty': rng.uniform(1e15, 2e15), 'status': 'confirmed',
+                'hash': os.urandom(32).hex()
+            } for i in range(2500)
+        ],
+        'live_miner_data': [
+            {
+                'address': address, 'hashrate': rng.uniform(1e6, 5e9), 'sharesPerSecond': rng.uniform(0, 2),
+                'lastStatTime': _timestamp(rng, 1), 'last_block_found': _timestamp(rng)
+            } for address in miners
+        ],
+        'shares': [
+            {'miner': address, 'shares': rng.randint(1, 100000), 'last_share': _timestamp(rng, 1)}
+            for address in miners
+        ],
+        'demurrage_stats': {
+            'items': [
+                {
+                    'id': os.urandom(32).hex(), 'timestamp': 1704067200000 + i * 3600000,
+                    'inputs': [{'address': DEMURRAGE_WALLET if i % 24 == 0 else rng.choice(miners),
+                                'value': rng.randint(10**9, 10**11)}],
+                    'outputs': [{'address': rng.choice(miners + [DEMURRAGE_WALLET]),
+                                 'value': rng.randint(10**8, 10**10)} for _ in range(rng.randint(1, 20))]
+                } for i in range(500)
+            ],
+            'total': 500
+        }
+    }
+
+def live_payloads(api):
+    payloads = {}
+    for cache_key, endpoint in ENDPOINTS.items():
+        url = endpoint if '://' in endpoint else f'{api}{endpoint}'
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        payloads[cache_key] = response.json()
+    return payloads
+
+def _best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark(payloads, threshold, repeat):
+    rows = []
+    for cache_key, data in payloads.items():
+        # Wrap each cached value in a cache entry, as DataManager stores it
+        entry = {'fetched_at': time.time(), 'version': 1, 'data': prepare_cache_data(cache_key, data)}
+        for serializer in sorted(SERIALIZERS):
+            for compression in sorted(COMPRESSORS):
+                codec = CacheCodec(serializer, compression, compress_threshold=threshold)
+                encoded = codec.encode(entry)
+                rows.append((
+                    cache_key, serializer, compression, len(encoded),
+                    _best_of(lambda: codec.encode(entry), repeat) * 1000,
+                    _best_of(lambda: CacheCodec.decode(encoded), repeat) * 1000
+                ))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--live', action='store_true', help='fetch real payloads from the pool API')
+    parser.add_argument('--api', default=DEFAULT_API, help='pool API base URL for --live')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_COMPRESS_THRESHOLD,
+                        help='compression threshold in bytes')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    payloads = live_payloads(args.api) if args.live else synthetic_payloads()
+    print(f"{'endpoint':<18} {'serializer':<10} {'compress':<8} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+    for cache_key, serializer, compression, size, encode_ms, decode_ms in benchmark(payloads, args.threshold, args.repeat):
+        print(f"{cache_key:<18} {serializer:<10} {compression:<8} {size:>10} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+if __name__ == '__main__':
+    main()
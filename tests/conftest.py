@@ -0,0 +1,18 @@
+import pytest
+from utils.data_manager import DataManager
+
+@pytest.fixture
+def data_manager():
+    """Create a DataManager without Hydra, Redis or a local store, with its event loop running"""
+    manager = DataManager.__new__(DataManager)
+    manager.api = 'http://pool.test'
+    manager.data = {}
+    manager.redis = None
+    manager.stale_while_revalidate = True
+    manager.read_only = False
+    manager.signal_driven = False
+    manager.local_store = False
+    manager._initialize_caches()
+    manager._initialize_event_loop()
+    yield manager
+    manager.close()
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+import pytest
+from aiohttp import web
+from unittest.mock import MagicMock
+from utils import async_api_reader
+from utils.api_reader import ApiReader
+from utils.http_client import HttpError
+
+ADDRESS = '9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu'
+
+@pytest.fixture
+def reader(data_manager):
+    reader = ApiReader(data_manager)
+    reader.data_manager.get_pool_stats = MagicMock(return_value={'poolhashrate': 10})
+    return reader
+
+def slow_request(delay):
+    async def _request(endpoint, params=None, timeout=None):
+        await asyncio.sleep(delay)
+        return {'endpoint': endpoint, 'current_hashrate': 1.0}
+    return _request
+
+def test_concurrent_pages_are_not_capped_by_threads(reader):
+    """Many miner pages waiting on a slow upstream overlap instead of queueing on 4 threads"""
+    reader.async_reader._request = slow_request(0.3)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(reader.get_miner_stats(f'{ADDRESS}{i}')))
+        for i in range(20)
+    ]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 20 and all(stats.current_hashrate == 1.0 for stats in results)
+    assert time.monotonic() - start < 1.0
+
+def test_fetch_many_deadline(reader):
+    async def _request(endpoint, params=None, timeout=None):
+        await asyncio.sleep(1.0 if endpoint == '/slow' else 0)
+        return endpoint
+    reader.async_reader._request = _request
+
+    batch = reader.fetch_many([('/fast', None), ('/slow', None)], deadline=0.2)
+
+    assert batch.results == ['/fast', None]
+    assert batch.failed == [1]
+
+def test_bundle_is_built_on_the_event_loop(reader):
+    async def _request(endpoint, params=None, timeout=None):
+        if endpoint.endswith('/workers'):
+            return {'rig1': [{'hashrate': 1e6}]}
+        return {'current_hashrate': 1.0}
+    reader.async_reader._request = _request
+
+    bundle = reader.get_miner_bundle(ADDRESS)
+
+    assert bundle.stats.current_hashrate == 1.0
+    assert bundle.workers['rig1'][0]['hashrate'] == 1e6
+    assert bundle.pool['poolhashrate'] == 10
+
+def test_request_retries_server_errors(data_manager):
+    """5xx responses are retried on the pooled client before giving up"""
+    data_manager.http.policy.backoff = 0
+    attempts = []
+
+    async def flaky(request):
+        attempts.append(request.path)
+        if len(attempts) < 3:
+            return web.Response(status=503)
+        return web.json_response({'ok': True})
+
+    async def start_server():
+        app = web.Application()
+        app.router.add_get('/flaky', flaky)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = data_manager.run_async(start_server())
+    try:
+        data_manager.api = f'http://127.0.0.1:{port}'
+        reader = async_api_reader.AsyncApiReader(data_manager)
+
+        assert data_manager.run_async(reader.request('/flaky')) == {'ok': True}
+        assert len(attempts) == 3
+        with pytest.raises(HttpError):
+            data_manager.run_async(reader.request('/missing'))
+    finally:
+        data_manager.run_async(runner.cleanup())
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from utils.block_store import ENDPOINT, BlockStore, summarize_blocks
+from utils.local_store import LocalStore
+
+def block(height, effort=1.0, status='confirmed', progress=1.0):
+    return {'blockheight': height, 'effort': effort, 'status': status, 'confirmationprogress': progress,
+            'created': f'2024-01-{height:02d}T00:00:00', 'reward': 27.0, 'miner': '9fMinerAddress'}
+
+class FakeApi:
+    """Newest-first /miningcore/blocks honouring limit and offset"""
+    def __init__(self, blocks):
+        self.blocks = {b['blockheight']: b for b in blocks}
+        self.calls = []
+
+    async def fetch(self, endpoint, params=None):
+        assert endpoint == ENDPOINT
+        self.calls.append(params)
+        newest_first = [self.blocks[h] for h in sorted(self.blocks, reverse=True)]
+        if not params:
+            return newest_first
+        return newest_first[params['offset']:params['offset'] + params['limit']]
+
+@pytest.fixture
+def store(tmp_path):
+    return BlockStore(LocalStore(str(tmp_path / 'store.sqlite3')), page_size=2)
+
+def refresh(store, api):
+    return asyncio.run(store.refresh(api.fetch))
+
+def test_summary_matches_full_list(store):
+    blocks = [block(h, effort=h / 10) for h in range(1, 8)]
+
+    assert refresh(store, FakeApi(blocks)) == summarize_blocks(blocks)
+
+def test_effort_curve_is_cumulative_mean_oldest_first(store):
+    summary = refresh(store, FakeApi([block(1, 1.0), block(2, 3.0), block(3, 2.0)]))
+
+    assert [point['rolling_effort'] for point in summary['effort_curve']] == [1.0, 2.0, 2.0]
+    assert summary['count'] == 3
+    assert summary['latest']['blockheight'] == 3
+    assert [b['blockheight'] for b in summary['recent']] == [3, 2, 1]
+
+def test_refresh_fetches_down_to_highest_known_block(store):
+    api = FakeApi([block(h) for h in range(1, 10)])
+    refresh(store, api)
+    api.calls.clear()
+    api.blocks[10] = block(10, effort=10.0)
+
+    summary = refresh(store, api)
+
+    assert api.calls == [{'limit': 2, 'offset': 0}]
+    assert summary['count'] == 10
+    assert summary['effort_curve'][-1]['rolling_effort'] == pytest.approx(19 / 10)
+
+def test_unconfirmed_blocks_are_polled_until_confirmed(store):
+    api = FakeApi([block(h) for h in range(1, 6)] + [block(6, status='pending', progress=0.2)] +
+                  [block(h) for h in range(7, 10)])
+    refresh(store, api)
+    api.calls.clear()
+    api.blocks[6] = block(6, status='confirmed', progress=1.0)
+
+    summary = refresh(store, api)
+
+    # Pages reach down to the pending block at height 6
+    assert api.calls == [{'limit': 2, 'offset': 0}, {'limit': 2, 'offset': 2}]
+    assert summary['recent'][3]['status'] == 'confirmed'
+    assert summary['count'] == 9
+    api.calls.clear()
+
+    # Once confirmed, the block no longer holds the floor down
+    refresh(store, api)
+    assert api.calls == [{'limit': 2, 'offset': 0}]
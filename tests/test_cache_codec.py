@@ -0,0 +1,36 @@
+import json
+import pytest
+from utils.cache_codec import CacheCodec, SERIALIZERS, COMPRESSORS, HEADER_SIZE
+
+PAYLOAD = {
+    'fetched_at': 1700000000.5,
+    'version': 3,
+    'data': [{'blockheight': 1000 + i, 'effort': 0.5, 'miner': '9f' * 25, 'status': 'confirmed'} for i in range(500)]
+}
+
+@pytest.mark.parametrize('serializer', sorted(SERIALIZERS))
+@pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+def test_round_trip(serializer, compression):
+    """Every available serializer and compression decodes back to the original value"""
+    codec = CacheCodec(serializer, compression, compress_threshold=0)
+    assert CacheCodec.decode(codec.encode(PAYLOAD)) == PAYLOAD
+
+def test_small_values_are_not_compressed():
+    """Values below the threshold are stored uncompressed"""
+    codec = CacheCodec('json', 'zlib', compress_threshold=1024)
+    encoded = codec.encode({'blockheight': 1})
+    assert encoded[HEADER_SIZE - 1] == 0
+    assert encoded[HEADER_SIZE:] == b'{"blockheight":1}'
+
+def test_large_values_are_compressed():
+    codec = CacheCodec('json', 'zlib', compress_threshold=1024)
+    assert len(codec.encode(PAYLOAD)) < len(json.dumps(PAYLOAD)) / 4
+
+def test_legacy_json_is_decoded():
+    """Plain JSON written before the envelope existed is still readable"""
+    assert CacheCodec.decode(b'[{"blockheight": 1}]') == [{'blockheight': 1}]
+    assert CacheCodec.decode('{"total_paid": 2.5}') == {'total_paid': 2.5}
+
+def test_unknown_serializer_is_rejected():
+    with pytest.raises(ValueError):
+        CacheCodec('pickle')
@@ -0,0 +1,79 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, breaker_for
+from utils.get_erg_prices import PriceReader
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    circuit_breaker.reset_breakers()
+    yield
+    circuit_breaker.reset_breakers()
+
+def test_opens_at_failure_rate_after_minimum_calls():
+    breaker = CircuitBreaker('pool', failure_rate=0.5, minimum_calls=4)
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == circuit_breaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker('pool', minimum_calls=1, open_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == circuit_breaker.CLOSED
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker('pool', minimum_calls=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    assert not breaker.allow()
+
+def test_breakers_are_per_host():
+    assert breaker_for('http://5.78.102.130:8000/miningcore/blocks') is breaker_for('http://5.78.102.130:8000/sigscore')
+    assert breaker_for('https://api.ergoplatform.com/api/v1') is not breaker_for('http://5.78.102.130:8000')
+
+def test_data_manager_serves_last_good_while_open(data_manager):
+    """With the pool API breaker open a miss costs no upstream wait"""
+    data_manager._last_good['pool_stats'] = {'blockheight': 1}
+    breaker = breaker_for('http://pool.test')
+    for _ in range(circuit_breaker.MINIMUM_CALLS):
+        breaker.record_failure()
+
+    start = time.monotonic()
+    assert data_manager.get_pool_stats() == {'blockheight': 1}
+    assert time.monotonic() - start < 0.5
+
+def test_price_reader_falls_back_to_last_prices():
+    reader = PriceReader()
+    reader.http = MagicMock()
+    reader.http.get_json.return_value = {'bitcoin': {'usd': 60000}, 'ergo': {'usd': 1.5}}
+    assert reader.get() == (60000, 1.5)
+
+    reader.http.get_json.side_effect = ConnectionError('down')
+    assert reader.get() == (60000, 1.5)
+
+def test_price_reader_without_history_raises():
+    reader = PriceReader()
+    reader.http = MagicMock()
+    reader.http.get_json.side_effect = ConnectionError('down')
+
+    with pytest.raises(ConnectionError):
+        reader.get()
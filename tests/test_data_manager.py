@@ -0,0 +1,224 @@
+import asyncio
+import json
+import time
+import pytest
+from utils.data_manager import ENDPOINTS
+
+def fake_request(delays, payloads=None):
+    """Build a _make_request replacement that sleeps per endpoint"""
+    async def _make_request(url):
+        endpoint = url.replace('http://pool.test', '')
+        await asyncio.sleep(delays.get(endpoint, 0))
+        if payloads and endpoint in payloads:
+            return payloads[endpoint]
+        return [{'status': 'confirmed', 'amount': 1.0}]
+    return _make_request
+
+def test_update_data_fetches_endpoints_concurrently(data_manager):
+    """A concurrent refresh should take about as long as the slowest endpoint"""
+    data_manager._make_request = fake_request({endpoint: 0.2 for endpoint in ENDPOINTS.values()})
+
+    start = time.monotonic()
+    report = data_manager.update_data()
+    elapsed = time.monotonic() - start
+
+    assert report == {key: True for key in ENDPOINTS}
+    assert elapsed < 0.6
+    assert data_manager.get_payment_stats() == {'total_paid': 1.0}
+
+def test_update_data_reports_timed_out_endpoints(data_manager):
+    """Endpoints slower than the per-endpoint timeout are reported as failed"""
+    data_manager._make_request = fake_request({'/miningcore/blocks': 1.0})
+
+    report = data_manager.update_data(endpoint_timeout=0.2, deadline=2)
+
+    assert report['block_stats'] is False
+    assert all(ok for key, ok in report.items() if key != 'block_stats')
+    assert 'block_stats' not in data_manager.caches['block_stats']
+
+def test_update_data_keeps_results_finished_before_deadline(data_manager):
+    """The global deadline cancels stragglers but keeps what already arrived"""
+    data_manager._make_request = fake_request({'/sigscore/history': 1.0})
+
+    report = data_manager.update_data(endpoint_timeout=5, deadline=0.3)
+
+    assert report['total_hash_stats'] is False
+    assert report['pool_stats'] is True
+
+def test_update_data_skips_fresh_caches(data_manager):
+    """Only expired caches are refreshed"""
+    data_manager._make_request = fake_request({})
+    for cache_key in ENDPOINTS:
+        data_manager._set_cached_data(cache_key, {'cached': True})
+
+    assert data_manager.update_data() == {}
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands DataManager uses"""
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+
+    def eval(self, script, numkeys, key, token):
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+def test_lease_holder_elsewhere_serves_previous_value(data_manager):
+    """While another worker holds the lease, the last good value is served without a fetch"""
+    data_manager.redis = FakeRedis()
+    data_manager.redis.set('lease:pool_stats', 'other-worker')
+    data_manager.redis.setex('pool_stats:last', 60, '{"blockheight": 1}')
+    calls = []
+
+    async def _make_request(url):
+        calls.append(url)
+        return {'blockheight': 2}
+    data_manager._make_request = _make_request
+
+    assert data_manager.get_pool_stats() == {'blockheight': 1}
+    assert calls == []
+
+def test_lease_is_released_after_refresh(data_manager):
+    """The worker that wins the lease fetches, stores and releases it"""
+    data_manager.redis = FakeRedis()
+    data_manager._make_request = fake_request({}, {'/miningcore/poolstats': {'blockheight': 2}})
+
+    assert data_manager.get_pool_stats() == {'blockheight': 2}
+    assert 'lease:pool_stats' not in data_manager.redis.store
+    assert data_manager.codec.decode(data_manager.redis.get('pool_stats:last')) == {'blockheight': 2}
+
+def test_stale_entry_is_served_and_revalidated(data_manager):
+    """Past the soft TTL the cached value is returned at once and refreshed in the background"""
+    data_manager._set_cached_data('pool_stats', {'blockheight': 1})
+    data_manager.caches['pool_stats']['pool_stats']['fetched_at'] -= 1900
+    data_manager._make_request = fake_request(
+        {'/miningcore/poolstats': 0.2}, {'/miningcore/poolstats': {'blockheight': 2}}
+    )
+
+    start = time.monotonic()
+    assert data_manager.get_pool_stats() == {'blockheight': 1}
+    assert time.monotonic() - start < 0.1
+
+    data_manager._refresh_executor.shutdown(wait=True)
+    assert data_manager.get_pool_stats() == {'blockheight': 2}
+
+def test_stale_entry_blocks_without_swr(data_manager):
+    """With stale-while-revalidate off, an entry past the soft TTL is refetched inline"""
+    data_manager.stale_while_revalidate = False
+    data_manager._set_cached_data('pool_stats', {'blockheight': 1})
+    data_manager.caches['pool_stats']['pool_stats']['fetched_at'] -= 1900
+    data_manager._make_request = fake_request({}, {'/miningcore/poolstats': {'blockheight': 2}})
+
+    assert data_manager.get_pool_stats() == {'blockheight': 2}
+
+def test_read_only_mode_never_fetches(data_manager):
+    """Read-only workers serve the ingested snapshot, however old, and never call upstream"""
+    data_manager.redis = FakeRedis()
+    data_manager._set_cached_data('pool_stats', {'blockheight': 1})
+    data_manager.caches['pool_stats'].clear()
+    data_manager.read_only = True
+    calls = []
+
+    async def _make_request(url):
+        calls.append(url)
+        return {}
+    data_manager._make_request = _make_request
+
+    assert data_manager.get_pool_stats() == {'blockheight': 1}
+    assert data_manager.get_block_stats() == {}
+    assert data_manager.update_data() == {}
+    assert calls == []
+
+def test_snapshots_are_versioned(data_manager):
+    """Each write to Redis bumps the cache's version counter"""
+    data_manager.redis = FakeRedis()
+    data_manager._set_cached_data('pool_stats', {'blockheight': 1})
+    data_manager._set_cached_data('pool_stats', {'blockheight': 2})
+
+    entry = data_manager._get_cache_entry('pool_stats')
+    assert entry['version'] == 2
+    assert entry['data'] == {'blockheight': 2}
+
+class CountingRedis(FakeRedis):
+    """FakeRedis that records which keys were read"""
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def get(self, key):
+        self.reads.append(key)
+        return super().get(key)
+
+def test_l1_hit_only_reads_version(data_manager):
+    """A hit on an up-to-date L1 entry costs one version GET and no payload read"""
+    data_manager.redis = CountingRedis()
+    data_manager._set_cached_data('block_stats', [{'blockheight': 1}])
+    data_manager.redis.reads.clear()
+
+    assert data_manager.get_block_stats() == [{'blockheight': 1}]
+    assert data_manager.redis.reads == ['block_stats:version']
+
+def test_l1_is_replaced_when_l2_version_changes(data_manager):
+    """A newer version written by another process is picked up from L2"""
+    data_manager.redis = CountingRedis()
+    data_manager._set_cached_data('block_stats', [{'blockheight': 1}])
+    # Another worker writes a newer snapshot
+    version = data_manager.redis.incr('block_stats:version')
+    data_manager.redis.setex('block_stats', 60, json.dumps(
+        {'fetched_at': time.time(), 'version': version, 'data': [{'blockheight': 2}]}
+    ))
+    data_manager.redis.reads.clear()
+
+    assert data_manager.get_block_stats() == [{'blockheight': 2}]
+    assert data_manager.redis.reads == ['block_stats:version', 'block_stats']
+    assert data_manager.caches['block_stats']['block_stats']['version'] == version
+
+def test_fetch_passes_query_params(data_manager):
+    """fetch() sends params as a query string and does not touch the caches"""
+    calls = []
+
+    async def _make_request(url):
+        calls.append(url)
+        return [{'blockheight': 5}]
+    data_manager._make_request = _make_request
+
+    assert data_manager.fetch('/miningcore/blocks', {'limit': 1}) == [{'blockheight': 5}]
+    assert calls == ['http://pool.test/miningcore/blocks?limit=1']
+    assert data_manager._get_cached_data('block_stats') is None
+
+def test_revalidation_after_close_is_skipped(data_manager):
+    """A stale read after close() serves the cached value without raising or leaving the key marked"""
+    data_manager._set_cached_data('pool_stats', {'blockheight': 1})
+    data_manager.caches['pool_stats']['pool_stats']['fetched_at'] -= 1900
+    data_manager._refresh_executor.shutdown(wait=True)
+
+    assert data_manager.get_pool_stats() == {'blockheight': 1}
+    assert 'pool_stats' not in data_manager._revalidating
+
+def test_sequential_update_reports_failed_fetches(data_manager):
+    """A failed payments fetch is reported as failed, not hidden by get_payment_stats' default"""
+    async def _make_request(url):
+        return None if url.endswith('/miningcore/payments') else [{'status': 'confirmed', 'amount': 1.0}]
+    data_manager._make_request = _make_request
+
+    report = data_manager.update_data(concurrent=False)
+
+    assert report['payment_stats'] is False
+    assert report['pool_stats'] is True
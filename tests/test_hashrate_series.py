@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from utils.hashrate_series import ENDPOINT, HashrateSeries, summarize_history, to_epoch
+from utils.local_store import LocalStore
+
+START = 1704067200  # 2024-01-01T00:00:00Z
+
+def history(minutes, step=60, hashrate=lambda i: 1e9 * (i % 10)):
+    """One /sigscore/history record every step seconds"""
+    return [{'timestamp': START + i * step, 'total_hashrate': hashrate(i)} for i in range(minutes)]
+
+@pytest.fixture
+def series(tmp_path):
+    return HashrateSeries(LocalStore(str(tmp_path / 'store.sqlite3')), max_points=50)
+
+def test_timestamps_are_parsed_as_utc():
+    assert to_epoch('2024-01-01T00:00:00') == START
+    assert to_epoch('2024-01-01T00:00:00Z') == START
+    assert to_epoch(START * 1000) == START
+    assert to_epoch('not a time') is None
+
+def test_apply_appends_only_new_points(series):
+    assert series.apply(history(10)) == 10
+    assert series.apply(history(15)) == 5
+    assert series.watermark() == START + 14 * 60
+
+def test_small_ranges_are_served_raw(series):
+    series.apply(history(30))
+
+    points = series.query(START, START + 29 * 60)
+
+    assert len(points) == 30
+    assert points[1] == {'timestamp': '2024-01-01T00:01:00', 'hashrate': 1e9, 'min': 1e9, 'max': 1e9}
+
+def test_large_ranges_use_the_finest_rollup_that_fits(series):
+    series.apply(history(600))  # ten hours of minutes
+
+    points = series.query(START, START + 599 * 60)
+
+    # 120 five-minute buckets exceed 50 points; ten hourly buckets fit
+    assert len(points) == 10
+    assert points[0]['min'] == 0 and points[0]['max'] == 9e9
+    assert points[0]['hashrate'] == pytest.approx(4.5e9)
+
+def test_rollups_accumulate_across_refreshes(series):
+    series.apply(history(300))
+    series.apply(history(600))
+
+    counts = [row['count'] for row in series.store.execute(
+        'SELECT count FROM hashrate_rollups WHERE resolution = 3600 ORDER BY bucket'
+    )]
+    assert counts == [60] * 10
+
+def test_refresh_summary_matches_in_memory_summary(series):
+    records = history(600)
+
+    async def fetch(endpoint, params=None):
+        assert endpoint == ENDPOINT
+        return records
+
+    summary = asyncio.run(series.refresh(fetch))
+
+    assert summary == summarize_history(records, max_points=50)
+    assert len(summary['ranges']['all']) == 10
+    assert summary['latest']['timestamp'] == '2024-01-01T09:59:00'
@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils import circuit_breaker, http_client
+from utils.circuit_breaker import CircuitOpenError, breaker_for, reset_breakers
+from utils.http_client import HttpClient, HttpError
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+@pytest.fixture
+def server():
+    """Local HTTP server answering each path with the next of its scripted (status, headers) responses"""
+    script = {}
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            path = self.path.split('?', 1)[0]
+            status, headers = script[path].pop(0) if len(script[path]) > 1 else script[path][0]
+            body = b'{"ok": true}' if status == 200 else b'{}'
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.script, httpd.hits = script, hits
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield httpd
+    httpd.shutdown()
+
+def test_retries_server_errors_then_succeeds(server):
+    server.script['/flaky'] = [(503, {}), (502, {}), (200, {})]
+    client = HttpClient('test', backoff=0)
+
+    assert client.get_json(f'{server.url}/flaky', {'limit': 1}) == {'ok': True}
+    assert server.hits == ['/flaky?limit=1'] * 3
+
+def test_gives_up_after_retries(server):
+    server.script['/down'] = [(500, {})]
+    client = HttpClient('test', retries=2, backoff=0)
+
+    with pytest.raises(HttpError) as error:
+        client.get_json(f'{server.url}/down')
+    assert error.value.status == 500
+    assert len(server.hits) == 3
+
+def test_client_errors_are_not_retried(server):
+    server.script['/missing'] = [(404, {})]
+    client = HttpClient('test', backoff=0)
+
+    assert client.get(f'{server.url}/missing').status_code == 404
+    assert len(server.hits) == 1
+    assert breaker_for(server.url).state == circuit_breaker.CLOSED
+
+def test_honours_retry_after(server):
+    server.script['/throttled'] = [(429, {'Retry-After': '0.3'}), (200, {})]
+    client = HttpClient('test', backoff=0)
+
+    start = time.monotonic()
+    assert client.get_json(f'{server.url}/throttled') == {'ok': True}
+    assert time.monotonic() - start >= 0.3
+
+def test_long_retry_after_is_not_waited_out(server):
+    server.script['/throttled'] = [(429, {'Retry-After': '3600'})]
+    client = HttpClient('test', backoff=0)
+
+    assert client.get(f'{server.url}/throttled').status_code == 429
+    assert len(server.hits) == 1
+
+def test_open_breaker_fails_fast(server):
+    server.script['/down'] = [(500, {})]
+    client = HttpClient('test', retries=0, backoff=0)
+    for _ in range(circuit_breaker.MINIMUM_CALLS):
+        client.get(f'{server.url}/down')
+
+    with pytest.raises(CircuitOpenError):
+        client.get(f'{server.url}/down')
+    assert len(server.hits) == circuit_breaker.MINIMUM_CALLS
+
+def test_retry_after_formats():
+    assert http_client.retry_after({'Retry-After': '5'}) == 5
+    assert 0 < http_client.retry_after({'Retry-After': formatdate(time.time() + 60, usegmt=True)}) <= 60
+    assert http_client.retry_after({'Retry-After': 'soon'}) is None
+    assert http_client.retry_after({}) is None
+
+def test_backoff_is_jittered_and_capped():
+    delays = [http_client.backoff_delay(10, backoff=0.5, max_backoff=8) for _ in range(50)]
+
+    assert all(0 <= delay <= 8 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import MagicMock
+from utils.ingest import Ingestor, FAILURE_RETRY_SECONDS
+
+@pytest.fixture
+def data_manager():
+    manager = MagicMock()
+    manager.refresh.side_effect = lambda keys: {key: True for key in keys}
+    return manager
+
+def test_first_run_refreshes_everything(data_manager):
+    """All configured caches are due on the first pass"""
+    ingestor = Ingestor(data_manager, {'pool_stats': 60, 'block_stats': 120})
+
+    report = ingestor.run_once()
+
+    assert report == {'pool_stats': True, 'block_stats': True}
+    assert ingestor.due() == []
+
+def test_caches_follow_their_own_interval(data_manager):
+    """Each cache becomes due again after its own interval"""
+    ingestor = Ingestor(data_manager, {'pool_stats': 60, 'block_stats': 120})
+    ingestor.run_once()
+    base = min(ingestor._next_due.values()) - 60
+
+    assert ingestor.due(base + 61) == ['pool_stats']
+    assert sorted(ingestor.due(base + 121)) == ['block_stats', 'pool_stats']
+
+def test_failed_caches_retry_early(data_manager):
+    """A failed refresh is retried before its full interval elapses"""
+    data_manager.refresh.side_effect = lambda keys: {key: key != 'total_hash_stats' for key in keys}
+    ingestor = Ingestor(data_manager, {'total_hash_stats': 300})
+    ingestor.run_once()
+    base = ingestor._next_due['total_hash_stats'] - FAILURE_RETRY_SECONDS
+
+    assert ingestor.due(base + FAILURE_RETRY_SECONDS + 1) == ['total_hash_stats']
+
+def test_unknown_cache_is_rejected(data_manager):
+    with pytest.raises(ValueError):
+        Ingestor(data_manager, {'not_a_cache': 60})
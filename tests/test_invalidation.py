@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import MagicMock
+from utils.cache_codec import CacheCodec
+from utils.invalidation import InvalidationEngine, Signal, _newest
+
+@pytest.fixture
+def data_manager():
+    manager = MagicMock()
+    manager.redis = None
+    manager.codec = CacheCodec('json', 'none')
+    manager.refresh.side_effect = lambda keys: {key: True for key in keys}
+    return manager
+
+def _engine(data_manager, responses):
+    data_manager.fetch.side_effect = lambda endpoint, params: responses[endpoint]
+    signals = [
+        Signal('latest_pool_block', '/blocks', {'limit': 1}, _newest('blockheight'), ['block_stats', 'pool_stats']),
+        Signal('latest_payment', '/payments', {'limit': 1}, _newest('created'), ['payment_stats'])
+    ]
+    return InvalidationEngine(data_manager, signals, interval=60)
+
+def test_first_observation_only_records(data_manager):
+    """Nothing is refreshed the first time a signal is seen"""
+    engine = _engine(data_manager, {'/blocks': [{'blockheight': 10}], '/payments': [{'created': 'a'}]})
+
+    assert engine.run(force=True) == {}
+    data_manager.refresh.assert_not_called()
+
+def test_changed_signal_refreshes_its_dependents(data_manager):
+    """A new block refreshes only the caches that depend on it"""
+    responses = {'/blocks': [{'blockheight': 10}], '/payments': [{'created': 'a'}]}
+    engine = _engine(data_manager, responses)
+    engine.run(force=True)
+
+    responses['/blocks'] = [{'blockheight': 11}]
+    report = engine.run(force=True)
+
+    assert report == {'block_stats': True, 'pool_stats': True}
+    data_manager.refresh.assert_called_once_with(['block_stats', 'pool_stats'])
+
+def test_checks_are_rate_limited(data_manager):
+    """Unforced runs check signals at most once per interval"""
+    engine = _engine(data_manager, {'/blocks': [], '/payments': []})
+    engine.run()
+    engine.run()
+
+    assert data_manager.fetch.call_count == 2
+    assert not engine.due()
+
+def test_failing_signal_is_skipped(data_manager):
+    """An unreachable signal does not stop the others from being checked"""
+    engine = _engine(data_manager, {'/payments': [{'created': 'a'}]})
+
+    assert engine.check() == []
+    assert engine._values == {'latest_payment': 'a'}
+
+def test_signal_ignoring_its_limit_is_disabled(data_manager):
+    """A signal whose endpoint returns the whole list stops being polled"""
+    engine = _engine(data_manager, {'/blocks': [{'blockheight': 10}, {'blockheight': 9}],
+                                    '/payments': [{'created': 'a'}]})
+
+    engine.check()
+    engine.check()
+
+    assert engine.disabled == {'latest_pool_block'}
+    data_manager.restore_ttls.assert_called_once_with(['block_stats', 'pool_stats'])
+    assert [c[0][0] for c in data_manager.fetch.call_args_list] == ['/blocks', '/payments', '/payments']
@@ -0,0 +1,43 @@
+from flask import Flask
+from prometheus_client import REGISTRY
+from utils import metrics
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_endpoint_label_collapses_addresses():
+    """Miner addresses and query strings do not create new series"""
+    address = '9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu'
+
+    assert metrics.endpoint_label(f'/sigscore/miners/{address}/workers') == '/sigscore/miners/{address}/workers'
+    assert metrics.endpoint_label('http://pool.test/miningcore/blocks?limit=1') == '/miningcore/blocks'
+
+def test_cache_and_upstream_counters():
+    before_hit = _value('cache_requests_total', layer='test', cache='pool_stats', result='hit')
+    before_retries = _value('upstream_retries_total', client='test', host='pool.test', endpoint='/miningcore/poolstats')
+
+    metrics.record_cache('test', 'pool_stats', 'hit')
+    metrics.record_upstream('test', 'http://pool.test/miningcore/poolstats', 0.2, True, retries=2)
+
+    assert _value('cache_requests_total', layer='test', cache='pool_stats', result='hit') == before_hit + 1
+    assert _value('upstream_retries_total', client='test', host='pool.test', endpoint='/miningcore/poolstats') == before_retries + 2
+
+def test_dash_callbacks_are_timed_by_output():
+    server = Flask(__name__)
+    metrics.instrument_dash(server)
+
+    @server.route('/_dash-update-component', methods=['POST'])
+    def update():
+        return {}
+
+    labels = {'callback': 'page-content.children', 'status': '200'}
+    before = _value('dash_callback_seconds_count', **labels)
+    server.test_client().post('/_dash-update-component', json={'output': 'page-content.children'})
+
+    assert _value('dash_callback_seconds_count', **labels) == before + 1
+
+def test_render_exposes_metrics():
+    body, content_type = metrics.render()
+
+    assert b'cache_requests_total' in body
+    assert content_type.startswith('text/plain')
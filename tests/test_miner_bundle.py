@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+from dataclasses import FrozenInstanceError
+from unittest.mock import MagicMock
+from utils.api_reader import ApiReader
+
+ADDRESS = '9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu'
+
+RESPONSES = {
+    f'/sigscore/miners/{ADDRESS}': {'current_hashrate': 5.0, 'balance': 1.5},
+    f'/sigscore/miners/{ADDRESS}/workers': {'rig1': [{'timestamp': 't', 'hashrate': 1e6}]},
+    f'/miningcore/blocks/{ADDRESS}': [{'created': 't', 'blockheight': 1, 'effort': 0.5}],
+    f'/miningcore/payments/{ADDRESS}': [{'created': 't', 'amount': 1.0}],
+    f'/sigscore/miners/{ADDRESS}/bonus-eligibility': {'eligible': True, 'qualifying_days': 3}
+}
+
+@pytest.fixture
+def reader():
+    data_manager = MagicMock()
+    data_manager.api = 'http://pool.test'
+    data_manager.redis = None
+    data_manager.get_pool_stats.return_value = {'poolhashrate': 10}
+    reader = ApiReader(data_manager, async_io=False)
+    reader.calls = []
+    lock = threading.Lock()
+
+    def _request(endpoint, params=None, timeout=None):
+        with lock:
+            reader.calls.append(endpoint)
+        return RESPONSES.get(endpoint)
+    reader._request = _request
+    return reader
+
+def test_bundle_fetches_each_part_once(reader):
+    bundle = reader.get_miner_bundle(ADDRESS)
+
+    assert bundle.stats.current_hashrate == 5.0
+    assert bundle.workers['rig1'][0]['hashrate'] == 1e6
+    assert bundle.blocks[0]['blockheight'] == 1
+    assert bundle.payments[0]['amount'] == 1.0
+    assert bundle.bonus['eligible'] is True
+    assert bundle.pool['poolhashrate'] == 10
+    assert sorted(reader.calls) == sorted(RESPONSES)
+
+def test_callbacks_share_one_bundle(reader):
+    """Repeated calls within the bundle TTL reuse the same snapshot"""
+    first = reader.get_miner_bundle(ADDRESS)
+    second = reader.get_miner_bundle(ADDRESS)
+
+    assert first is second
+    assert len(reader.calls) == len(RESPONSES)
+
+def test_bundle_is_immutable(reader):
+    bundle = reader.get_miner_bundle(ADDRESS)
+
+    with pytest.raises(FrozenInstanceError):
+        bundle.stats = None
+    with pytest.raises(TypeError):
+        bundle.pool['poolhashrate'] = 0
+
+def test_bundle_does_not_share_records_with_the_cache(reader):
+    """Editing a record in the bundle leaves the miner cache's copy untouched"""
+    bundle = reader.get_miner_bundle(ADDRESS)
+    bundle.blocks[0]['effort'] = 9.9
+
+    assert reader.get_my_blocks(ADDRESS)[0]['effort'] == 0.5
+    assert len(reader.calls) == len(RESPONSES)
+
+def test_bundle_without_stats_is_not_reused(reader):
+    RESPONSES_WITHOUT_STATS = dict(RESPONSES)
+    del RESPONSES_WITHOUT_STATS[f'/sigscore/miners/{ADDRESS}']
+    reader._request = lambda endpoint, params=None, timeout=None: RESPONSES_WITHOUT_STATS.get(endpoint)
+
+    assert reader.get_miner_bundle(ADDRESS).stats is None
+    assert reader._get_cached_data('miner_bundle', ADDRESS) is None
+
+def test_fetch_many_runs_in_parallel_and_keeps_order(reader):
+    def _request(endpoint, params=None, timeout=None):
+        time.sleep(0.2)
+        return endpoint
+    reader._request = _request
+
+    start = time.monotonic()
+    batch = reader.fetch_many([('/a', None), ('/b', {'x': 1}), ('/c', None)])
+
+    assert batch.results == ['/a', '/b', '/c']
+    assert batch.failed == []
+    assert time.monotonic() - start < 0.5
+
+def test_fetch_many_reports_partial_failures(reader):
+    def _request(endpoint, params=None, timeout=None):
+        if endpoint == '/broken':
+            raise ValueError('bad gateway')
+        return endpoint
+    reader._request = _request
+
+    batch = reader.fetch_many([('/a', None), ('/broken', None)])
+
+    assert batch.results == ['/a', None]
+    assert batch.errors == {1: 'bad gateway'}
+
+def test_fetch_many_enforces_the_deadline(reader):
+    def _request(endpoint, params=None, timeout=None):
+        time.sleep(1.0 if endpoint == '/slow' else 0)
+        return endpoint
+    reader._request = _request
+
+    start = time.monotonic()
+    batch = reader.fetch_many([('/fast', None), ('/slow', None)], deadline=0.2)
+
+    assert batch.results == ['/fast', None]
+    assert batch.failed == [1]
+    assert time.monotonic() - start < 0.5
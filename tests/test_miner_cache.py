@@ -0,0 +1,169 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from utils.api_reader import ApiReader
+from utils.cache_codec import CacheCodec
+from utils.miner_cache import MinerCache
+
+ADDRESS = '9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu'
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands MinerCache uses"""
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def eval(self, script, numkeys, key, token):
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+def test_hit_within_ttl_skips_fetch():
+    cache = MinerCache()
+    fetch = MagicMock(return_value={'hashrate': 1})
+
+    assert cache.get_or_fetch('stats', ADDRESS, fetch) == {'hashrate': 1}
+    assert cache.get_or_fetch('stats', ADDRESS, fetch) == {'hashrate': 1}
+    assert fetch.call_count == 1
+
+def test_entries_expire_per_data_type():
+    cache = MinerCache(ttls={'stats': 0, 'payments': 600})
+    cache.set('stats', ADDRESS, {'hashrate': 1})
+    cache.set('payments', ADDRESS, [{'amount': 1}])
+
+    assert cache.get('stats', ADDRESS) is None
+    assert cache.get('payments', ADDRESS) == [{'amount': 1}]
+
+def test_params_are_part_of_the_key():
+    cache = MinerCache()
+    cache.set('blocks', ADDRESS, [1], {'limit': 10})
+
+    assert cache.get('blocks', ADDRESS, {'limit': 100}) is None
+    assert cache.get('blocks', ADDRESS, {'limit': 10}) == [1]
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MinerCache(max_entries=2)
+    cache.set('stats', 'a', {'v': 1})
+    cache.set('stats', 'b', {'v': 2})
+    cache.get('stats', 'a')
+    cache.set('stats', 'c', {'v': 3})
+
+    assert cache.get('stats', 'b') is None
+    assert cache.get('stats', 'a') == {'v': 1}
+
+def test_memory_bound_is_respected():
+    cache = MinerCache(max_bytes=100)
+    for i in range(10):
+        cache.set('stats', str(i), {'payload': 'x' * 30})
+
+    assert cache.stats()['bytes'] <= 100
+    assert cache.get('stats', '9') is not None
+
+def test_empty_results_are_cached():
+    cache = MinerCache()
+    fetch = MagicMock(return_value=[])
+
+    assert cache.get_or_fetch('blocks', ADDRESS, fetch) == []
+    assert cache.get_or_fetch('blocks', ADDRESS, fetch) == []
+    assert fetch.call_count == 1
+
+def test_failed_results_are_not_cached():
+    cache = MinerCache()
+    fetch = MagicMock(return_value=None)
+
+    cache.get_or_fetch('blocks', ADDRESS, fetch)
+    cache.get_or_fetch('blocks', ADDRESS, fetch)
+    assert fetch.call_count == 2
+
+def test_waiting_worker_stops_when_the_lease_is_released():
+    """A worker that lost the lease fetches itself as soon as the holder gives up, not after FETCH_WAIT"""
+    redis_client, codec = FakeRedis(), CacheCodec('json', 'none')
+    cache = MinerCache(redis_client, codec)
+    key = MinerCache.make_key('blocks', ADDRESS)
+    redis_client.set(f'lease:{key}', 'other-worker')
+    fetch = MagicMock(return_value=[])
+
+    start = time.monotonic()
+    timer = threading.Timer(0.2, redis_client.store.pop, [f'lease:{key}'])
+    timer.start()
+    assert cache.get_or_fetch('blocks', ADDRESS, fetch) == []
+    timer.join()
+
+    assert time.monotonic() - start < 1
+    fetch.assert_called_once()
+
+def test_workers_share_entries_through_redis():
+    """A value fetched by one worker is served to another without a fetch"""
+    redis_client, codec = FakeRedis(), CacheCodec('json', 'none')
+    first, second = MinerCache(redis_client, codec), MinerCache(redis_client, codec)
+    first.get_or_fetch('workers', ADDRESS, lambda: {'rig1': []}, {'days': 5})
+    fetch = MagicMock()
+
+    assert second.get_or_fetch('workers', ADDRESS, fetch, {'days': 5}) == {'rig1': []}
+    fetch.assert_not_called()
+
+def test_api_reader_caches_miner_requests():
+    data_manager = MagicMock()
+    data_manager.api = 'http://pool.test'
+    data_manager.redis = None
+    reader = ApiReader(data_manager, async_io=False)
+    reader._request = MagicMock(return_value={'eligible': True, 'qualifying_days': 3})
+
+    assert reader.get_bonus_eligibility(ADDRESS)['qualifying_days'] == 3
+    assert reader.get_bonus_eligibility(ADDRESS)['eligible'] is True
+    assert reader._request.call_count == 1
+
+def test_expired_entry_is_served_when_upstream_fails():
+    cache = MinerCache(ttls={'stats': 0})
+    cache.set('stats', ADDRESS, {'hashrate': 1})
+
+    assert cache.get('stats', ADDRESS) is None
+    assert cache.get_or_fetch('stats', ADDRESS, lambda: None) == {'hashrate': 1}
+
+def test_stale_entry_is_served_when_fetch_raises():
+    cache = MinerCache(ttls={'stats': 0})
+    cache.set('stats', ADDRESS, {'hashrate': 1})
+
+    def fetch():
+        raise ConnectionError('upstream down')
+
+    assert cache.get_or_fetch('stats', ADDRESS, fetch) == {'hashrate': 1}
+
+def test_empty_result_replaces_stale_entry():
+    """A miner whose workers all went offline sees that, not the last non-empty value"""
+    cache = MinerCache(ttls={'workers': 0})
+    cache.set('workers', ADDRESS, {'rig1': [{'hashrate': 1}]})
+
+    assert cache.get_or_fetch('workers', ADDRESS, lambda: {}) == {}
+
+def test_batched_misses_respect_another_workers_lease():
+    """A batch waits for the entry another worker is fetching and fetches only the rest"""
+    redis_client, codec = FakeRedis(), CacheCodec('json', 'none')
+    first, second = MinerCache(redis_client, codec), MinerCache(redis_client, codec)
+    key = MinerCache.make_key('workers', ADDRESS)
+    redis_client.set(f'lease:{key}', 'first-worker')
+
+    def land():
+        first.set('workers', ADDRESS, {'rig1': []})
+        redis_client.store.pop(f'lease:{key}')
+    timer = threading.Timer(0.2, land)
+    timer.start()
+    fetch_batch = MagicMock(return_value=[[]])
+
+    values = second.get_or_fetch_many(ADDRESS, [('workers', None), ('blocks', None)], fetch_batch)
+    timer.join()
+
+    assert values == [{'rig1': []}, []]
+    fetch_batch.assert_called_once_with([1])
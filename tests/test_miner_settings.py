@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock, patch
+from utils.miner_settings import MinerSettings
+from utils.mining_callbacks import get_minimum_payout
+
+ADDRESS = '9gPohoQooaGWbZbgTb1JrrqFWiTpM2zBknEwiyDANwmAtAne1Y8'
+
+def connection(rows):
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value.fetchall.return_value = rows
+    return conn
+
+def test_load_reads_the_pool_in_one_query():
+    conn = connection([(ADDRESS, 2.5), ('9fOther', None)])
+    settings = MinerSettings({'host': 'db.test'})
+
+    with patch('utils.miner_settings.psycopg2.connect', return_value=conn):
+        assert settings.load()
+
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args[0][1] == ('ErgoSigmanauts',)
+    assert settings.threshold(ADDRESS) == 2.5
+    assert settings.threshold('9fOther') is None
+    conn.close.assert_called_once()
+
+def test_failed_load_keeps_previous_thresholds():
+    settings = MinerSettings({'host': 'db.test'})
+    with patch('utils.miner_settings.psycopg2.connect', return_value=connection([(ADDRESS, 2.5)])):
+        settings.load()
+
+    with patch('utils.miner_settings.psycopg2.connect', side_effect=Exception('down')):
+        assert not settings.load()
+
+    assert settings.threshold(ADDRESS) == 2.5
+
+def test_minimum_payout_prefers_miner_settings():
+    settings = MagicMock()
+    settings.threshold.side_effect = {ADDRESS: 3.0}.get
+    resolver = MagicMock()
+    resolver.minimum_payout.return_value = 1.5
+
+    assert get_minimum_payout(ADDRESS, resolver, settings) == 3.0
+    resolver.minimum_payout.assert_not_called()
+    assert get_minimum_payout('9fMissing', resolver, settings) == 1.5
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from utils.local_store import LocalStore
+from utils.payment_ledger import ENDPOINT, PaymentLedger
+
+def payment(i, status='confirmed', amount=1.0, address='9fMiner'):
+    return {'id': i, 'address': address, 'amount': amount, 'status': status,
+            'created': f'2024-01-01T00:{i:02d}:00', 'transactionconfirmationdata': f'tx{i}'}
+
+class FakeApi:
+    """Newest-first /miningcore/payments honouring limit and offset"""
+    def __init__(self, payments):
+        self.payments = payments
+        self.calls = []
+        self.fail = False
+
+    async def fetch(self, endpoint, params=None):
+        assert endpoint == ENDPOINT
+        self.calls.append(params)
+        if self.fail:
+            return None
+        newest_first = list(reversed(self.payments))
+        if not params:
+            return newest_first
+        return newest_first[params['offset']:params['offset'] + params['limit']]
+
+@pytest.fixture
+def ledger(tmp_path):
+    return PaymentLedger(LocalStore(str(tmp_path / 'store.sqlite3')), page_size=2)
+
+def refresh(ledger, api):
+    return asyncio.run(ledger.refresh(api.fetch))
+
+def test_first_refresh_downloads_everything(ledger):
+    api = FakeApi([payment(i) for i in range(5)])
+
+    summary = refresh(ledger, api)
+
+    assert api.calls == [None]
+    assert summary == {'total_paid': 5.0, 'payments': 5, 'last_payment': '2024-01-01T00:04:00'}
+
+def test_later_refreshes_fetch_only_new_pages(ledger):
+    api = FakeApi([payment(i) for i in range(5)])
+    refresh(ledger, api)
+    api.calls.clear()
+    api.payments += [payment(i, amount=2.0) for i in range(5, 8)]
+
+    summary = refresh(ledger, api)
+
+    # Three new payments span two pages; the second already holds a known payment
+    assert api.calls == [{'limit': 2, 'offset': 0}, {'limit': 2, 'offset': 2}]
+    assert summary['total_paid'] == 11.0
+    assert summary['payments'] == 8
+
+def test_confirmation_is_credited_once(ledger):
+    api = FakeApi([payment(0), payment(1, status='pending', address='9fOther')])
+    refresh(ledger, api)
+    assert ledger.summary()['total_paid'] == 1.0
+
+    api.payments[1] = payment(1, status='confirmed', address='9fOther')
+    ledger.apply(list(api.payments))
+    ledger.apply(list(api.payments))
+
+    assert ledger.summary()['total_paid'] == 2.0
+    assert ledger.totals('9fOther') == {'total_paid': 1.0, 'payments': 1, 'last_payment': '2024-01-01T00:01:00'}
+
+def test_older_pending_payment_is_credited_when_it_confirms(ledger):
+    api = FakeApi([payment(0), payment(1, status='pending')] + [payment(i) for i in range(2, 6)])
+    refresh(ledger, api)
+    assert ledger.summary()['total_paid'] == 5.0
+    api.calls.clear()
+    api.payments[1] = payment(1, status='confirmed')
+    api.payments.append(payment(6))
+
+    summary = refresh(ledger, api)
+
+    # Pages reach down to the pending payment on the third page
+    assert api.calls == [{'limit': 2, 'offset': offset} for offset in (0, 2, 4)]
+    assert summary['total_paid'] == 7.0
+    assert ledger.pending() == set()
+
+def test_failed_refresh_writes_nothing(ledger):
+    api = FakeApi([payment(i) for i in range(3)])
+    refresh(ledger, api)
+    api.payments += [payment(i) for i in range(3, 8)]
+    api.fail = True
+
+    assert refresh(ledger, api) is None
+    assert ledger.summary()['payments'] == 3
+
+    api.fail = False
+    assert refresh(ledger, api)['payments'] == 8
+
+def test_data_manager_serves_ledger_summary(data_manager, tmp_path):
+    data_manager.incremental['payment_stats'] = PaymentLedger(LocalStore(str(tmp_path / 'store.sqlite3')))
+    api = FakeApi([payment(i) for i in range(3)])
+    data_manager._fetch_endpoint = api.fetch
+
+    assert data_manager.get_payment_stats()['total_paid'] == 3.0
+    assert data_manager.refresh(['payment_stats']) == {'payment_stats': True}
+    assert api.calls == [None, {'limit': 100, 'offset': 0}]
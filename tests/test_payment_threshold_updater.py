@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock, call
 import json
-from utils.update_payment_thresholds import PaymentThresholdUpdater
+import threading
+import time
+from utils.update_payment_thresholds import PaymentThresholdUpdater, RateBudget, UPDATE_CHUNK
 
 @pytest.fixture
 def mock_db_connection():
@@ -9,6 +11,7 @@ def mock_db_connection():
     mock_conn = MagicMock()
     mock_cursor = MagicMock()
     mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_conn.closed = 0
     return mock_conn, mock_cursor
 
 @pytest.fixture
@@ -29,7 +32,7 @@ def test_get_all_miners_success(updater):
         {"address": "9f5678..."}
     ]
     
-    with patch('requests.get') as mock_get:
+    with patch.object(updater.http, 'get') as mock_get:
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = mock_miners
         
@@ -48,7 +51,7 @@ def test_get_all_miners_pagination(updater):
     page1 = [{"address": f"9f{i}..."} for i in range(100)]
     page2 = [{"address": f"9g{i}..."} for i in range(50)]
     
-    with patch('requests.get') as mock_get:
+    with patch.object(updater.http, 'get') as mock_get:
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.side_effect = [page1, page2]
         
@@ -110,7 +113,7 @@ def test_process_miner_threshold_update(updater, mock_db_connection, current_thr
     address = "9f1234..."
     
     # Mock database queries
-    mock_cursor.fetchone.return_value = (current_threshold,)
+    mock_cursor.fetchall.return_value = [(address, current_threshold)]
     
     # Mock NFT checks
     with patch.object(updater, 'get_miner_nft_threshold') as mock_get_nft:
@@ -178,7 +181,7 @@ def test_integration_flow(updater, mock_db_connection):
     new_threshold = 1.5
     
     # Mock database response
-    mock_cursor.fetchone.return_value = (current_threshold,)
+    mock_cursor.fetchall.return_value = [(address, current_threshold)]
     
     # Mock NFT checks
     with patch.object(updater.token_reader, 'find_token_name_in_wallet') as mock_find:
@@ -203,7 +206,7 @@ def test_integration_flow(updater, mock_db_connection):
             select_calls = [call for call in mock_cursor.execute.call_args_list if 'SELECT' in str(call)]
             update_calls = [call for call in mock_cursor.execute.call_args_list if 'UPDATE' in str(call)]
             
-            assert len(select_calls) == 1  # One SELECT for current threshold
+            assert len(select_calls) == 1  # One SELECT for all current thresholds
             assert len(update_calls) == 1  # One UPDATE for new threshold
             
             # Verify update values
@@ -211,5 +214,110 @@ def test_integration_flow(updater, mock_db_connection):
             # Check if the parameters contain the expected values
             assert new_threshold in update_call[0][1]  # Check parameters tuple
 
+def test_nft_lookups_run_concurrently(updater, mock_db_connection):
+    """Lookups overlap on the worker threads while database calls stay sequential"""
+    _, mock_cursor = mock_db_connection
+    mock_cursor.fetchall.return_value = [(f"9f{i}", 0.1) for i in range(8)]
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def lookup(address):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return None
+
+    with patch.object(updater, 'get_miner_nft_threshold', side_effect=lookup):
+        report = updater.process_all_miners([{"address": f"9f{i}"} for i in range(8)])
+
+    assert peak[0] > 1
+    assert report['miners'] == 8 and report['updated'] == 0
+    assert report['miners_per_second'] > 0
+
+def test_changes_are_written_in_one_transaction(updater, mock_db_connection):
+    """Changed thresholds go out in chunked UPDATE ... FROM (VALUES ...) statements and one commit"""
+    mock_conn, mock_cursor = mock_db_connection
+    count = UPDATE_CHUNK + 2
+    mock_cursor.fetchall.return_value = [(f"9f{i}", 0.1) for i in range(count)]
+
+    with patch.object(updater, 'get_miner_nft_threshold', return_value=1.0):
+        report = updater.process_all_miners([{"address": f"9f{i}"} for i in range(count)])
+
+    select_calls = [c for c in mock_cursor.execute.call_args_list if 'SELECT' in str(c)]
+    update_calls = [c for c in mock_cursor.execute.call_args_list if 'UPDATE' in str(c)]
+    assert len(select_calls) == 1
+    assert len(update_calls) == 2
+    assert len(update_calls[0][0][1]) == 2 * UPDATE_CHUNK + 1
+    assert update_calls[1][0][1] == (f"9f{UPDATE_CHUNK}", 1.0, f"9f{UPDATE_CHUNK + 1}", 1.0, 'ErgoSigmanauts')
+    mock_conn.commit.assert_called_once()
+    assert report['updated'] == count
+
+def test_process_changes_checks_only_changed_miners(updater, mock_db_connection):
+    """Only newly minted NFT owners and miners new to the database are re-verified"""
+    _, mock_cursor = mock_db_connection
+    updater.changes.reconciled(["9fA", "9fB"])
+    mock_cursor.fetchall.return_value = [("9fA", 0.1), ("9fB", 0.1), ("9fC", 0.1)]
+
+    with patch.object(updater.changes, 'poll_tokens', return_value={"9fA", "9fGone"}), \
+            patch.object(updater, 'get_miner_nft_threshold', return_value=None) as mock_lookup:
+        report = updater.process_changes()
+
+    assert sorted(c[0][0] for c in mock_lookup.call_args_list) == ["9fA", "9fC"]
+    assert report['miners'] == 2
+    select_calls = [c for c in mock_cursor.execute.call_args_list if 'SELECT' in str(c)]
+    assert len(select_calls) == 1
+
+def test_full_sweep_seeds_tracker_with_every_stored_address(updater, mock_db_connection):
+    """Inactive miners with a row are not treated as new on the first incremental pass"""
+    _, mock_cursor = mock_db_connection
+    mock_cursor.fetchall.return_value = [("9fActive", 0.1), ("9fInactive", 0.1), ("9fHistorical", 0.1)]
+
+    with patch.object(updater, 'get_miner_nft_threshold', return_value=None) as mock_lookup:
+        updater.process_all_miners([{"address": "9fActive"}])
+        mock_lookup.reset_mock()
+        with patch.object(updater.changes, 'poll_tokens', return_value=set()):
+            report = updater.process_changes()
+
+    mock_lookup.assert_not_called()
+    assert report == {'miners': 0, 'updated': 0}
+
+def test_read_transaction_is_closed_without_changes(updater, mock_db_connection):
+    """The SELECT's implicit transaction ends even when there is nothing to write"""
+    mock_conn, mock_cursor = mock_db_connection
+    mock_cursor.fetchall.return_value = [("9fA", 1.0)]
+
+    with patch.object(updater, 'get_miner_nft_threshold', return_value=1.0):
+        updater.process_all_miners([{"address": "9fA"}])
+
+    mock_conn.rollback.assert_called_once()
+    mock_conn.commit.assert_not_called()
+
+def test_failed_connection_is_reopened_on_the_next_pass(updater, mock_db_connection):
+    """A read on a dropped connection fails cleanly and the next pass reconnects"""
+    mock_conn, mock_cursor = mock_db_connection
+    mock_cursor.execute.side_effect = Exception("server closed the connection unexpectedly")
+    mock_conn.rollback.side_effect = Exception("connection already closed")
+    mock_conn.closed = 2
+
+    assert updater.get_current_thresholds() is None
+    assert updater._db_connection is None
+
+    fresh_conn, fresh_cursor = MagicMock(), MagicMock()
+    fresh_conn.cursor.return_value.__enter__.return_value = fresh_cursor
+    fresh_cursor.fetchall.return_value = [("9fA", 1.0)]
+    with patch('utils.update_payment_thresholds.psycopg2.connect', return_value=fresh_conn):
+        assert updater.get_current_thresholds() == {"9fA": 1.0}
+
+def test_rate_budget_spaces_calls():
+    budget = RateBudget(50)
+    start = time.monotonic()
+    for _ in range(6):
+        budget.acquire()
+
+    # The first call goes at once; the other five wait 20ms each
+    assert time.monotonic() - start >= 0.09
+
 if __name__ == '__main__':
     pytest.main([__file__]) 
\ No newline at end of file
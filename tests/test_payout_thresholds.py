@@ -0,0 +1,74 @@
+from unittest.mock import MagicMock
+from utils.cache_codec import CacheCodec
+from utils.payout_thresholds import COLLECTION_ID, PayoutThresholdResolver
+from tests.test_miner_cache import FakeRedis
+
+ADDRESS = '9gPohoQooaGWbZbgTb1JrrqFWiTpM2zBknEwiyDANwmAtAne1Y8'
+
+def pool_config(minimum_payout='1.5', address=ADDRESS):
+    return {'collection_id': COLLECTION_ID, 'type': 'Pool Config', 'address': address,
+            'minimumPayout': minimum_payout}
+
+def fake_tokens(descriptions):
+    """ReadTokens stand-in whose wallet holds one Sigma BYTES token per description"""
+    tokens = MagicMock()
+    tokens.find_token_name_in_wallet.return_value = [{'tokenId': token_id} for token_id in descriptions]
+    tokens.get_token_description.side_effect = lambda token_id: descriptions[token_id]
+    return tokens
+
+def test_threshold_is_resolved_once():
+    tokens = fake_tokens({'nft1': pool_config()})
+    resolver = PayoutThresholdResolver(tokens)
+
+    assert resolver.minimum_payout(ADDRESS) == 1.5
+    assert resolver.minimum_payout(ADDRESS) == 1.5
+    tokens.find_token_name_in_wallet.assert_called_once()
+    tokens.get_token_description.assert_called_once_with('nft1')
+
+def test_missing_nft_is_negatively_cached():
+    tokens = fake_tokens({'nft1': pool_config(address='9fSomeoneElse')})
+    resolver = PayoutThresholdResolver(tokens)
+
+    assert resolver.minimum_payout(ADDRESS) == 0.5
+    assert resolver.minimum_payout(ADDRESS) == 0.5
+    tokens.find_token_name_in_wallet.assert_called_once()
+
+def test_negative_result_expires_on_its_own_ttl():
+    tokens = fake_tokens({})
+    resolver = PayoutThresholdResolver(tokens, negative_ttl=0)
+
+    resolver.minimum_payout(ADDRESS)
+    resolver.minimum_payout(ADDRESS)
+
+    assert tokens.find_token_name_in_wallet.call_count == 2
+
+def test_failed_description_fetch_is_not_cached():
+    tokens = fake_tokens({'nft1': None})
+    resolver = PayoutThresholdResolver(tokens)
+
+    resolver.minimum_payout(ADDRESS)
+    resolver.minimum_payout(ADDRESS)
+
+    assert tokens.get_token_description.call_count == 2
+
+def test_workers_share_thresholds_and_descriptions_through_redis():
+    redis_client, codec = FakeRedis(), CacheCodec('json', 'none')
+    first_tokens = fake_tokens({'nft1': pool_config('2.0')})
+    PayoutThresholdResolver(first_tokens, redis_client, codec).minimum_payout(ADDRESS)
+    second_tokens = fake_tokens({'nft1': pool_config('2.0')})
+    second = PayoutThresholdResolver(second_tokens, redis_client, codec)
+
+    assert second.minimum_payout(ADDRESS) == 2.0
+    assert second.token_description('nft1') == pool_config('2.0')
+    second_tokens.find_token_name_in_wallet.assert_not_called()
+    second_tokens.get_token_description.assert_not_called()
+
+def test_failed_balance_lookup_is_not_cached():
+    tokens = fake_tokens({})
+    tokens.find_token_name_in_wallet.return_value = None
+    resolver = PayoutThresholdResolver(tokens)
+
+    assert resolver.minimum_payout(ADDRESS) == 0.5
+    resolver.minimum_payout(ADDRESS)
+
+    assert tokens.find_token_name_in_wallet.call_count == 2
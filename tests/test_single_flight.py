@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import pytest
+from utils.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    """Threads asking for the same key while a call is in flight share its result"""
+    flight = SingleFlight('test')
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        time.sleep(0.2)
+        return {'value': 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do(('/poolstats', ()), fetch)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert results == [{'value': 42}] * 5
+    assert flight.stats() == {'calls': 5, 'coalesced': 4, 'in_flight': 0}
+
+def test_different_keys_are_not_coalesced():
+    """Different params produce different keys"""
+    flight = SingleFlight('test')
+    first = SingleFlight.make_key('/blocks', {'limit': 100})
+    second = SingleFlight.make_key('/blocks', {'limit': 10})
+
+    assert first != second
+    assert flight.do(first, lambda: 1) == 1
+    assert flight.do(second, lambda: 2) == 2
+    assert flight.stats()['coalesced'] == 0
+
+def test_exception_is_shared_and_key_released():
+    """Followers see the leader's exception and the next call fetches again"""
+    flight = SingleFlight('test')
+
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: (_ for _ in ()).throw(ValueError('boom')))
+
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+def test_async_callers_coalesce():
+    """Coroutines waiting on the same key share one await"""
+    flight = SingleFlight('test')
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        return 'data'
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async('key', fetch) for _ in range(3)))
+
+    assert asyncio.run(run()) == ['data'] * 3
+    assert len(executions) == 1
+    assert flight.stats()['coalesced'] == 2
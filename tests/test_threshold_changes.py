@@ -0,0 +1,81 @@
+import json
+from unittest.mock import MagicMock
+from utils.find_miner_id import ReadTokens
+from utils.payout_thresholds import COLLECTION_ID
+from utils.threshold_changes import ThresholdChangeTracker
+
+def sigma_bytes(token_id, address, collection_id=COLLECTION_ID):
+    description = {'address': address, 'minimumPayout': 1.0, 'type': 'Pool Config', 'collection_id': collection_id}
+    return {'id': token_id, 'name': 'Sigma BYTES', 'description': json.dumps(description)}
+
+class FakeTokenSearch:
+    """ReadTokens.search_tokens over a fixed token list"""
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.calls = []
+
+    def search_tokens(self, query, offset=0, limit=100):
+        self.calls.append((offset, limit))
+        return {'items': self.tokens[offset:offset + limit], 'total': len(self.tokens)}
+
+def test_first_poll_records_existing_tokens():
+    reader = FakeTokenSearch([sigma_bytes(f't{i}', f'9f{i}') for i in range(5)])
+    tracker = ThresholdChangeTracker(reader, page_size=2)
+
+    assert tracker.poll_tokens() == set()
+    assert len(reader.calls) == 3
+    assert tracker.known_tokens == {f't{i}' for i in range(5)}
+
+def test_unchanged_total_costs_one_request():
+    reader = FakeTokenSearch([sigma_bytes(f't{i}', f'9f{i}') for i in range(5)])
+    tracker = ThresholdChangeTracker(reader, page_size=2)
+    tracker.poll_tokens()
+    reader.calls.clear()
+
+    assert tracker.poll_tokens() == set()
+    assert reader.calls == [(0, 2)]
+
+def test_new_mints_report_their_addresses():
+    reader = FakeTokenSearch([sigma_bytes('t0', '9fOld')])
+    tracker = ThresholdChangeTracker(reader)
+    tracker.poll_tokens()
+    reader.tokens += [sigma_bytes('t1', '9fNew'), sigma_bytes('t2', '9fOther', collection_id='elsewhere'),
+                      {'id': 't3', 'name': 'Sigma BYTES', 'description': 'not json'}]
+
+    assert tracker.poll_tokens() == {'9fNew'}
+    assert '9fNew' in tracker.last_changed
+
+def test_failed_poll_keeps_state():
+    reader = MagicMock()
+    reader.search_tokens.return_value = None
+    tracker = ThresholdChangeTracker(reader)
+
+    assert tracker.poll_tokens() is None
+    assert tracker.token_total is None
+
+def test_mints_are_reported_without_a_total():
+    """An explorer that omits the search total still has its new mints reported after the first poll"""
+    reader = FakeTokenSearch([sigma_bytes('t0', '9fOld')])
+    reader.search_tokens = lambda query, offset=0, limit=100: {'items': reader.tokens[offset:offset + limit]}
+    tracker = ThresholdChangeTracker(reader)
+
+    assert tracker.poll_tokens() == set()
+    reader.tokens.append(sigma_bytes('t1', '9fNew'))
+    assert tracker.poll_tokens() == {'9fNew'}
+
+def test_search_with_invalid_json_fails_the_poll():
+    tokens = ReadTokens()
+    tokens.http = MagicMock()
+    tokens.http.get.return_value.status_code = 200
+    tokens.http.get.return_value.json.side_effect = ValueError('Expecting value')
+    tracker = ThresholdChangeTracker(tokens)
+
+    assert tracker.poll_tokens() is None
+    assert not tracker.polled
+
+def test_new_addresses_are_reported_once():
+    tracker = ThresholdChangeTracker(MagicMock())
+    tracker.reconciled(['9fA'])
+
+    assert tracker.new_addresses(['9fA', '9fB']) == {'9fB'}
+    assert tracker.new_addresses(['9fA', '9fB']) == set()
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from utils.demurrage_utils import summarize_demurrage
+from utils.local_store import LocalStore
+from utils.transaction_indexer import TransactionIndexer, transactions_url
+
+WALLET = '9fDemurrageWallet'
+
+def incoming(n, value=10**9):
+    return {'id': f'tx{n}', 'timestamp': n * 1000,
+            'inputs': [{'address': '9fPool'}],
+            'outputs': [{'address': WALLET, 'value': value}]}
+
+def payout(n, value=3 * 10**9):
+    return {'id': f'tx{n}', 'timestamp': n * 1000,
+            'inputs': [{'address': WALLET}],
+            'outputs': [{'address': '9fMiner', 'value': value}, {'address': WALLET, 'value': 10**8}]}
+
+class FakeExplorer:
+    """Newest-first /addresses/{wallet}/transactions honouring limit and offset"""
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.calls = []
+
+    async def fetch(self, url, params=None):
+        assert url == transactions_url(WALLET)
+        self.calls.append(params)
+        newest_first = sorted(self.transactions, key=lambda tx: tx['timestamp'], reverse=True)
+        return {'items': newest_first[params['offset']:params['offset'] + params['limit']],
+                'total': len(newest_first)}
+
+@pytest.fixture
+def indexer(tmp_path):
+    return TransactionIndexer(LocalStore(str(tmp_path / 'store.sqlite3')), WALLET, page_size=3)
+
+def refresh(indexer, explorer):
+    return asyncio.run(indexer.refresh(explorer.fetch))
+
+def test_first_sync_pages_through_whole_history(indexer):
+    transactions = [incoming(1), payout(2)] + [incoming(n) for n in range(3, 9)]
+    explorer = FakeExplorer(transactions)
+
+    summary = refresh(indexer, explorer)
+
+    assert len(explorer.calls) == 3
+    assert summary == summarize_demurrage(transactions, WALLET)
+    assert summary == {'last_payment_ts': 2000, 'last_demurrage': 3.0, 'next_demurrage': 6.0}
+
+def test_later_syncs_stop_at_known_transactions(indexer):
+    explorer = FakeExplorer([payout(1)] + [incoming(n) for n in range(2, 8)])
+    refresh(indexer, explorer)
+    explorer.calls.clear()
+    explorer.transactions.append(incoming(8, value=5 * 10**9))
+
+    summary = refresh(indexer, explorer)
+
+    assert explorer.calls == [{'offset': 0, 'limit': 3}]
+    assert summary['next_demurrage'] == pytest.approx(11.0)
+
+def test_failed_page_stores_nothing(indexer):
+    async def fetch(url, params=None):
+        return None if params['offset'] else {'items': [incoming(n) for n in range(1, 4)]}
+
+    assert asyncio.run(indexer.refresh(fetch)) is None
+    assert indexer.summary() == {'last_payment_ts': None, 'last_demurrage': 0, 'next_demurrage': 0}
+
+def test_first_sync_resumes_where_max_pages_stopped(tmp_path):
+    indexer = TransactionIndexer(LocalStore(str(tmp_path / 'store.sqlite3')), WALLET, page_size=2, max_pages=2)
+    transactions = [incoming(1), payout(2)] + [incoming(n) for n in range(3, 10)]
+    explorer = FakeExplorer(transactions)
+
+    # The newest four transactions hold no payout yet
+    assert refresh(indexer, explorer) is None
+    assert indexer.store.get_meta(f'transactions:{WALLET}:synced_at') is None
+    explorer.calls.clear()
+
+    summary = refresh(indexer, explorer)
+
+    assert explorer.calls == [{'offset': 4, 'limit': 2}, {'offset': 6, 'limit': 2}]
+    assert summary == summarize_demurrage(transactions, WALLET)
+    assert indexer.store.get_meta(f'transactions:{WALLET}:synced_at') is None
+
+    refresh(indexer, explorer)
+    assert indexer.store.get_meta(f'transactions:{WALLET}:synced_at') is not None
+    assert indexer.known(transactions) == len(transactions)
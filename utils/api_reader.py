@@ -1,96 +1,170 @@
 # utils/api_reader.py
-from dash import Dash, dcc
-from dash.dependencies import Input, Output
-from .data_manager import DataManager
 import logging
-import requests
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
 import threading
+import time
 from functools import wraps
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from .types import MinerStats
-from .demurrage_utils import calculate_demurrage_metrics
+from .block_store import summarize_blocks
+from .hashrate_series import DEFAULT_RANGE, summarize_history
+from .types import MinerStats, MinerBundle, BatchResult, miner_bundle_requests, parse_bonus_eligibility
+from .demurrage_utils import DEMURRAGE_WALLET, format_last_payment
+from .single_flight import SingleFlight
+from .miner_cache import MinerCache
+from .async_api_reader import AsyncApiReader
+from . import metrics
+from .http_client import default_client
 from cachetools import TTLCache, cached
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Seconds a miner page bundle is reused by the page's callbacks
+BUNDLE_TTL = 30
+
+REQUEST_TIMEOUT = 30          # seconds, per upstream request
+BATCH_DEADLINE = 30           # seconds, for a whole fetch_many batch
+BATCH_WORKERS = 8             # requests running in parallel per process
+
 class ApiReader:
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, async_io: bool = True):
+        """
+        Args:
+            data_manager: DataManager providing the API base URL, Redis and,
+                with async_io, the event loop and pooled AsyncHttpClient
+            async_io: Run upstream requests as coroutines on the DataManager
+                loop (utils/async_api_reader.py) instead of on a thread pool
+        """
         self.data_manager = data_manager
-        self._executor = ThreadPoolExecutor(max_workers=4)
-        self._session = self._create_session()
-        self.wallet_address = "9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu"  # TODO: Move to config
+        self.async_io = async_io
+        self._executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='api-reader')
+        self.http = default_client()
+        # Concurrent callers asking for the same endpoint share one upstream request
+        self.single_flight = SingleFlight('api_reader')
+        self.wallet_address = DEMURRAGE_WALLET
         self._initialize_caches()
-        logger.info("ApiReader initialized")
+        self.async_reader = AsyncApiReader(data_manager, self.single_flight)
+        logger.info(f"ApiReader initialized (async I/O: {async_io})")
 
     def _initialize_caches(self):
         """Initialize caches for API responses with longer TTLs"""
         # Increase cache TTLs to reduce API calls
         self._cache = {
-            'ergo_tx': TTLCache(maxsize=100, ttl=1800),  # 30 minutes
             'demurrage': TTLCache(maxsize=100, ttl=1800),  # 30 minutes
             'payment_stats': TTLCache(maxsize=100, ttl=1800),  # 30 minutes
             'pool_stats': TTLCache(maxsize=100, ttl=900),  # 15 minutes
-            'miner_stats': TTLCache(maxsize=100, ttl=900),  # 15 minutes
-            'block_stats': TTLCache(maxsize=100, ttl=900)   # 15 minutes
+            'block_stats': TTLCache(maxsize=100, ttl=900),  # 15 minutes
+            'miner_bundle': TTLCache(maxsize=1000, ttl=BUNDLE_TTL)
         }
+        # Per-address miner page data, shared with other workers through Redis
+        self.miner_cache = MinerCache(
+            getattr(self.data_manager, 'redis', None), getattr(self.data_manager, 'codec', None)
+        )
         logger.info("Initialized API caches with extended TTLs")
 
-    def _create_session(self):
-        """Create a requests session with retry strategy"""
-        session = requests.Session()
-        retries = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504]
+    def _request(self, endpoint: str, params: Optional[Dict] = None, timeout: float = REQUEST_TIMEOUT) -> Any:
+        """Make one HTTP request on the shared pooled client; raises on failure"""
+        return self.http.get_json(f"{self.data_manager.api}{endpoint}", params, timeout)
+
+    def _coalesced_request(self, endpoint: str, params: Optional[Dict], timeout: float) -> Any:
+        """Make a request, sharing it with concurrent callers asking for the same endpoint and params"""
+        return self.single_flight.do(
+            SingleFlight.make_key(endpoint, params),
+            lambda: self._request(endpoint, params, timeout)
         )
-        session.mount('http://', HTTPAdapter(max_retries=retries))
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-        return session
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
-        """Make HTTP request with proper session handling"""
-        url = f"{self.data_manager.api}{endpoint}"
-        try:
-            response = self._session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error for {endpoint}: {str(e)}")
-            return None
+    def fetch_many(self, batch: List[Tuple[str, Optional[Dict]]], timeout: float = REQUEST_TIMEOUT,
+                   deadline: float = BATCH_DEADLINE) -> BatchResult:
+        """
+        Fetch several endpoints in parallel.
 
-    def _thread_safe_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
-        """Execute request in a thread-safe manner"""
+        Args:
+            batch: (endpoint, params) pairs
+            timeout: Per-request timeout in seconds
+            deadline: Seconds to wait for the whole batch; requests still
+                running after it are reported as failed
+
+        Returns:
+            BatchResult with one result per request, in order (None where a
+            request failed), and the error for each failed index
+        """
+        batch = list(batch)
+        if self.async_io and batch:
+            return self._fetch_many_async(batch, timeout, deadline)
+
+        result = BatchResult([None] * len(batch))
+        if len(batch) == 1:
+            # Nothing to overlap with; skip the thread handoff
+            endpoint, params = batch[0]
+            try:
+                result.results[0] = self._coalesced_request(endpoint, params, timeout)
+            except Exception as e:
+                result.errors[0] = str(e) or type(e).__name__
+        elif batch:
+            futures = {
+                self._executor.submit(self._coalesced_request, endpoint, params, timeout): index
+                for index, (endpoint, params) in enumerate(batch)
+            }
+            done, not_done = wait(futures, timeout=deadline)
+            for future in done:
+                index = futures[future]
+                try:
+                    result.results[index] = future.result()
+                except Exception as e:
+                    result.errors[index] = str(e) or type(e).__name__
+            for future in not_done:
+                future.cancel()
+                result.errors[futures[future]] = f"deadline of {deadline}s exceeded"
+
+        for index, error in result.errors.items():
+            logger.error(f"Request error for {batch[index][0]}: {error}")
+        return result
+
+    def _fetch_many_async(self, batch: List[Tuple[str, Optional[Dict]]], timeout: float,
+                          deadline: float) -> BatchResult:
+        """Run fetch_many on the DataManager event loop; the calling thread only waits"""
         try:
-            return self._executor.submit(self._make_request, endpoint, params).result(timeout=30)
+            # The coroutine enforces the deadline itself; the margin covers scheduling
+            return self.data_manager.run_async(
+                self.async_reader.fetch_many(batch, timeout, deadline), timeout=deadline + 5
+            )
         except Exception as e:
-            logger.error(f"Thread safe request failed: {str(e)}")
-            return None
+            logger.error(f"Async batch of {len(batch)} requests failed: {e}")
+            error = str(e) or type(e).__name__
+            return BatchResult([None] * len(batch), {index: error for index in range(len(batch))})
+
+    def _thread_safe_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """Make a single request; returns None on failure"""
+        return self.fetch_many([(endpoint, params)]).results[0]
+
+    def _cached_miner_request(self, kind: str, address: str, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """Request a per-address endpoint through the miner cache"""
+        return self.miner_cache.get_or_fetch(
+            kind, address, lambda: self._thread_safe_request(endpoint, params), params
+        )
+
+    def _cached_miner_requests(self, address: str, batch: List[Tuple[str, str, Optional[Dict]]]) -> Dict[str, Any]:
+        """
+        Request several per-address endpoints through the miner cache.
+
+        batch holds (kind, endpoint, params) triples; cache misses take the
+        miner cache's fetch lease and are fetched together with fetch_many.
+        Returns kind -> result (None on failure).
+        """
+        def fetch_batch(indexes):
+            return self.fetch_many([(batch[i][1], batch[i][2]) for i in indexes]).results
+
+        values = self.miner_cache.get_or_fetch_many(
+            address, [(kind, params) for kind, _, params in batch], fetch_batch
+        )
+        return {kind: value for (kind, _, _), value in zip(batch, values)}
 
     def get_miner_stats(self, address: str) -> Optional[MinerStats]:
         """Get miner statistics"""
         try:
-            result = self._thread_safe_request(f"/sigscore/miners/{address}")
-            if result:
-                data = {
-                    'address': address,
-                    'current_hashrate': result.get('current_hashrate', 0.0),
-                    'shares_per_second': result.get('shares_per_second', 0.0),
-                    'effort': result.get('effort', 0.0),
-                    'time_to_find': result.get('time_to_find', 0.0),
-                    'last_block_found': result.get('last_block_found', {}),
-                    'payments': result.get('payments', {}),
-                    'workers': result.get('workers', []),
-                    'balance': result.get('balance', 0.0),
-                    'paid_today': result.get('paid_today', 0.0),
-                    'total_paid': result.get('total_paid', 0.0)
-                }
-                return MinerStats(**data)
-            return None
+            result = self._cached_miner_request('stats', address, f"/sigscore/miners/{address}")
+            return MinerStats.from_api(address, result)
         except Exception as e:
             logger.error(f"Error getting miner stats: {str(e)}")
             return None
@@ -98,7 +172,7 @@ class ApiReader:
     def get_my_blocks(self, address: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get miner blocks"""
         try:
-            result = self._thread_safe_request(f"/miningcore/blocks/{address}", {"limit": limit})
+            result = self._cached_miner_request('blocks', address, f"/miningcore/blocks/{address}", {"limit": limit})
             return result if isinstance(result, list) else []
         except Exception as e:
             logger.error(f"Error getting blocks: {str(e)}")
@@ -107,7 +181,7 @@ class ApiReader:
     def get_miner_workers(self, address: str, days: int = 5) -> Dict[str, List[Dict[str, Any]]]:
         """Get miner workers data"""
         try:
-            result = self._thread_safe_request(f"/sigscore/miners/{address}/workers", {"days": days})
+            result = self._cached_miner_request('workers', address, f"/sigscore/miners/{address}/workers", {"days": days})
             return result if isinstance(result, dict) else {}
         except Exception as e:
             logger.error(f"Error getting miner workers: {str(e)}")
@@ -116,11 +190,33 @@ class ApiReader:
     def get_miner_payment_stats(self, address: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get miner payment statistics"""
         try:
-            return self._thread_safe_request(f"/miningcore/payments/{address}", {"limit": limit}) or []
+            return self._cached_miner_request('payments', address, f"/miningcore/payments/{address}", {"limit": limit}) or []
         except Exception as e:
             logger.error(f"Error getting payment stats: {str(e)}")
             return []
 
+    def get_miner_bundle(self, address: str) -> MinerBundle:
+        """
+        Get everything the miner page shows for address as one immutable snapshot.
+
+        Stats, workers, blocks, payments, bonus eligibility and pool stats are
+        fetched concurrently, once; every mining page callback firing within
+        BUNDLE_TTL (or concurrently) reads the same bundle.
+        """
+        bundle = self._get_cached_data('miner_bundle', address)
+        if bundle is not None:
+            return bundle
+        return self.single_flight.do(('miner_bundle', address), lambda: self._build_miner_bundle(address))
+
+    def _build_miner_bundle(self, address: str) -> MinerBundle:
+        fetched_at = time.time()
+        raw = self._cached_miner_requests(address, miner_bundle_requests(address))
+        bundle = MinerBundle.from_raw(address, raw, self.get_pool_stats(), fetched_at)
+        # A bundle without miner stats is not worth reusing; the next callback retries
+        if bundle.stats is not None:
+            self._set_cached_data('miner_bundle', address, bundle)
+        return bundle
+
     def get_pool_stats(self) -> Dict:
         """Get pool statistics with caching"""
         try:
@@ -139,69 +235,50 @@ class ApiReader:
     def get_live_miner_data(self) -> Dict:
         return self.data_manager.get_live_miner_data()
 
-    def get_total_hash_stats(self) -> Dict[str, Any]:
-        """Get total hash statistics from the historical data endpoint"""
+    def get_total_hash_stats(self, range_key: str = DEFAULT_RANGE) -> Dict[str, Any]:
+        """
+        Get pool hashrate over a chart range (a HASHRATE_RANGES key).
+
+        Returns timestamp, total_hashrate (the mean per point), min and max
+        lists, downsampled to at most a few hundred points.
+        """
+        empty = {'timestamp': [], 'total_hashrate': [], 'min': [], 'max': []}
         try:
-            result = self._thread_safe_request("/sigscore/history")
-            # logger.info(f"Raw total hash stats response: {result}")
-            
-            # Ensure we have valid data
-            if not result:
+            result = self.data_manager.get_total_hash_stats()
+            if isinstance(result, list):
+                # Snapshot written before total_hash_stats held a summary
+                result = summarize_history(result)
+            if not isinstance(result, dict) or 'ranges' not in result:
                 logger.error("No data returned from /sigscore/history endpoint")
-                return {'timestamp': [], 'total_hashrate': []}
-                
-            # Check if result is in expected format
-            if not isinstance(result, list):
-                logger.error(f"Unexpected data format from /sigscore/history. Expected list, got {type(result)}")
-                return {'timestamp': [], 'total_hashrate': []}
-                
-            # Transform the list of records into the format needed for DataFrame
-            formatted_data = {
-                'timestamp': [record.get('timestamp') for record in result],
-                'total_hashrate': [record.get('total_hashrate', 0) for record in result]
+                return empty
+
+            points = result['ranges'].get(range_key, result['ranges'].get(DEFAULT_RANGE, []))
+            return {
+                'timestamp': [point['timestamp'] for point in points],
+                'total_hashrate': [point['hashrate'] for point in points],
+                'min': [point['min'] for point in points],
+                'max': [point['max'] for point in points]
             }
             
-            return formatted_data
-            
         except Exception as e:
             logger.error(f"Error getting total hash stats: {str(e)}")
-            return {'timestamp': [], 'total_hashrate': []}
+            return empty
     
-    def _fetch_ergo_transactions(self) -> List[Dict[str, Any]]:
-        """Fetch transactions directly from Ergo Platform API with caching"""
-        try:
-            # Check cache first
-            if 'transactions' in self._cache['ergo_tx']:
-                logger.debug("Using cached Ergo Platform API transactions")
-                return self._cache['ergo_tx']['transactions']
-
-            url = f"https://api.ergoplatform.com/api/v1/addresses/{self.wallet_address}/transactions"
-            response = self._session.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            transactions = data.get("items", [])
-            
-            # Cache the result
-            self._cache['ergo_tx']['transactions'] = transactions
-            logger.info("Successfully fetched and cached transactions from Ergo Platform API")
-            
-            return transactions
-        except Exception as e:
-            logger.error(f"Error fetching from Ergo Platform API: {str(e)}")
-            return []
-
     def _get_cached_data(self, cache_key: str, data_key: str) -> Any:
         """Get data from cache with logging"""
         if cache_key in self._cache and data_key in self._cache[cache_key]:
             logger.debug(f"Cache hit for {cache_key}.{data_key}")
+            metrics.record_cache('api_reader', cache_key, 'hit')
             return self._cache[cache_key][data_key]
         logger.debug(f"Cache miss for {cache_key}.{data_key}")
+        metrics.record_cache('api_reader', cache_key, 'miss')
         return None
 
     def _set_cached_data(self, cache_key: str, data_key: str, data: Any):
         """Set data in cache with logging"""
         if cache_key in self._cache:
             self._cache[cache_key][data_key] = data
+            metrics.record_cache_size('api_reader', cache_key, len(self._cache[cache_key]), metrics.approx_bytes(data))
             logger.debug(f"Cached data for {cache_key}.{data_key}")
 
     def get_payment_stats(self) -> Dict[str, Any]:
@@ -212,39 +289,17 @@ class ApiReader:
             if cached_stats is not None:
                 return cached_stats
 
-            # Use cached transaction data
-            transactions = self._fetch_ergo_transactions()
-            
-            if not transactions:
-                logger.warning("No transaction data available")
-                default_stats = {
-                    'total_paid': 0,
-                    'next_demurrage': 0,
-                    'last_demurrage': 0,
-                    'last_payment': "Never"
-                }
-                self._set_cached_data('payment_stats', 'stats', default_stats)
-                return default_stats
+            # Demurrage figures come from the DataManager's indexed wallet transactions
+            demurrage = self.data_manager.get_demurrage_stats()
             
-            # Calculate demurrage metrics
-            metrics = calculate_demurrage_metrics(transactions, self.wallet_address)
-            
-            # Get total paid from cache if available
-            pool_payments = self._get_cached_data('payment_stats', 'pool_payments')
-            if pool_payments is None:
-                pool_payments = self._thread_safe_request("/miningcore/payments")
-                self._set_cached_data('payment_stats', 'pool_payments', pool_payments)
-            
-            total_paid = 0
-            if pool_payments and isinstance(pool_payments, list):
-                confirmed_payments = [p for p in pool_payments if p.get('status') == 'confirmed']
-                total_paid = sum(float(data.get('amount', 0)) for data in confirmed_payments)
+            # Total paid comes from the DataManager's payment summary
+            total_paid = float(self.data_manager.get_payment_stats().get('total_paid', 0))
             
             result = {
                 'total_paid': total_paid,
-                'next_demurrage': metrics['next_demurrage'],
-                'last_demurrage': metrics['last_demurrage'],
-                'last_payment': metrics['last_payment']
+                'next_demurrage': demurrage.get('next_demurrage', 0),
+                'last_demurrage': demurrage.get('last_demurrage', 0),
+                'last_payment': format_last_payment(demurrage.get('last_payment_ts'))
             }
             
             # Cache the final result
@@ -261,19 +316,26 @@ class ApiReader:
                 'last_payment': "Error"
             }
     
-    def get_block_stats(self) -> List[Dict[str, Any]]:
-        """Get block statistics"""
+    def get_block_summary(self) -> Dict[str, Any]:
+        """Get the pool block summary: count, latest block, newest blocks and the effort curve"""
         try:
-            result = self._thread_safe_request("/miningcore/blocks")
-            return result if isinstance(result, list) else []
+            result = self.data_manager.get_block_stats()
+            if isinstance(result, list):
+                # Snapshot written before block_stats held a summary
+                result = summarize_blocks(result)
+            return result if isinstance(result, dict) and 'count' in result else summarize_blocks([])
         except Exception as e:
             logger.error(f"Error getting block stats: {str(e)}")
-            return []
+            return summarize_blocks([])
+
+    def get_block_stats(self) -> List[Dict[str, Any]]:
+        """Get the newest pool blocks, newest first"""
+        return self.get_block_summary()['recent']
 
     def get_miner_share_stats(self, address: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get miner share statistics from miningcore"""
         try:
-            result = self._thread_safe_request(f"/miningcore/minerstats/{address}", {"limit": limit})
+            result = self._cached_miner_request('share_stats', address, f"/miningcore/minerstats/{address}", {"limit": limit})
             if not result:
                 logger.warning(f"No share stats found for miner {address}")
                 return []
@@ -290,7 +352,7 @@ class ApiReader:
             List[Dict[str, Any]]: List of dictionaries containing share information per miner
         """
         try:
-            result = self._thread_safe_request("/miningcore/shares")
+            result = self.data_manager.get_shares()
             if not result:
                 logger.warning("No shares data available")
                 return []
@@ -314,21 +376,13 @@ class ApiReader:
     def get_bonus_eligibility(self, address: str) -> Optional[Dict]:
         """Get miner's bonus eligibility status"""
         try:
-            result = self._thread_safe_request(f"/sigscore/miners/{address}/bonus-eligibility")
-            if result:
-                return {
-                    'eligible': result.get('eligible', False),
-                    'qualifying_days': result.get('qualifying_days', 0),
-                    'total_days_active': result.get('total_days_active', 0),
-                    'needs_days': result.get('needs_days', False),
-                    'analysis': result.get('analysis', '')
-                }
-            return None
+            result = self._cached_miner_request('bonus', address, f"/sigscore/miners/{address}/bonus-eligibility")
+            return parse_bonus_eligibility(result)
         except Exception as e:
             logger.error(f"Error getting bonus eligibility: {str(e)}")
             return None
 
-    # Synchronous versions of async methods
+    # Aliases kept for existing callers
     def sync_get_miner_stats(self, address: str) -> Optional[MinerStats]:
         return self.get_miner_stats(address)
 
@@ -365,22 +419,5 @@ class ApiReader:
 
     def __del__(self):
         """Cleanup resources"""
+        # The HTTP client is shared by the whole process and stays open
         self._executor.shutdown(wait=False)
-        self._session.close()
-
-def setup_data_manager_update(app: Dash, data_manager: DataManager, interval: int = 300000):  # 5 minutes
-    """Set up periodic data manager updates with rate limiting protection"""
-    app.layout.children.append(dcc.Interval(id='interval-component', interval=interval))
-    
-    @app.callback(
-        Output('interval-component', 'n_intervals'),
-        Input('interval-component', 'n_intervals')
-    )
-    def update_data_periodically(n):
-        try:
-            # Only update if we haven't updated in the last 5 minutes
-            data_manager.update_data()
-            logger.debug("Completed periodic data update")
-        except Exception as e:
-            logger.error(f"Error in periodic update: {e}")
-        return n
\ No newline at end of file
@@ -0,0 +1,66 @@
+# utils/async_api_reader.py
+"""
+asyncio core of ApiReader.
+
+Requests run as coroutines on the DataManager background event loop and
+share its pooled AsyncHttpClient, so a request waiting on a slow upstream
+holds a socket, not a thread. ApiReader drives fetch_many from synchronous
+Dash callbacks and keeps the miner cache in front of it; async callers can
+await request and fetch_many directly.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .single_flight import SingleFlight
+from .types import BatchResult
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 30          # seconds, per upstream request attempt
+BATCH_DEADLINE = 30           # seconds, for a whole fetch_many batch
+
+class AsyncApiReader:
+    def __init__(self, data_manager, single_flight: SingleFlight = None):
+        self.data_manager = data_manager
+        # Shared with ApiReader so sync and async callers coalesce with each other
+        self.single_flight = single_flight or SingleFlight('async_api_reader')
+
+    async def _request(self, endpoint: str, params: Optional[Dict] = None,
+                       timeout: float = REQUEST_TIMEOUT) -> Any:
+        """Make one request on DataManager's pooled client; raises HttpError or CircuitOpenError on failure"""
+        return await self.data_manager.http.get_json(f"{self.data_manager.api}{endpoint}", params, timeout)
+
+    async def request(self, endpoint: str, params: Optional[Dict] = None, timeout: float = REQUEST_TIMEOUT) -> Any:
+        """Make a request, sharing it with concurrent callers asking for the same endpoint and params"""
+        return await self.single_flight.do_async(
+            SingleFlight.make_key(endpoint, params),
+            lambda: self._request(endpoint, params, timeout)
+        )
+
+    async def fetch_many(self, batch: List[Tuple[str, Optional[Dict]]], timeout: float = REQUEST_TIMEOUT,
+                         deadline: float = BATCH_DEADLINE) -> BatchResult:
+        """
+        Fetch several endpoints concurrently.
+
+        Same contract as ApiReader.fetch_many: results in request order,
+        None and an entry in errors for every request that failed or was
+        still running at the deadline.
+        """
+        batch = list(batch)
+        result = BatchResult([None] * len(batch))
+        if not batch:
+            return result
+        tasks = [asyncio.ensure_future(self.request(endpoint, params, timeout)) for endpoint, params in batch]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for index, task in enumerate(tasks):
+            if task in pending:
+                task.cancel()
+                result.errors[index] = f"deadline of {deadline}s exceeded"
+            elif task.exception() is not None:
+                result.errors[index] = str(task.exception()) or type(task.exception()).__name__
+            else:
+                result.results[index] = task.result()
+        for index, error in result.errors.items():
+            logger.error(f"Request error for {batch[index][0]}: {error}")
+        return result
@@ -0,0 +1,164 @@
+# utils/block_store.py
+"""
+Local history of pool blocks, keyed by block height.
+
+The front page only needs a block count, the latest block, the cumulative
+(expanding mean) effort curve and the newest rows, yet it used to download
+the whole /miningcore/blocks list on every refresh. The store keeps every
+block in the local store with its running effort sum, fetches only pages
+reaching down to the highest height it already has, and keeps re-reading
+pages that still hold unconfirmed blocks so their confirmationprogress
+updates. The block_stats cache holds the summary built from it.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .local_store import Fetch, LocalStore, fetch_newest
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = '/miningcore/blocks'
+PAGE_SIZE = 50                # blocks per incremental page (newest first)
+MAX_PAGES = 20                # more new pages than this and a full download is cheaper
+RECENT_BLOCKS = 15            # newest blocks kept in the summary for the block table
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    blockheight INTEGER PRIMARY KEY,
+    created TEXT,
+    status TEXT,
+    effort REAL NOT NULL,
+    block_number INTEGER NOT NULL DEFAULT 0,
+    effort_sum REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+"""
+
+def summarize_blocks(blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the block_stats summary from a full block list.
+
+    Used when no block store is available, so block_stats has the same shape
+    either way.
+    """
+    blocks = sorted((b for b in blocks if isinstance(b, dict) and b.get('blockheight') is not None),
+                    key=lambda b: b['blockheight'])
+    effort_curve, effort_sum = [], 0.0
+    for number, block in enumerate(blocks, start=1):
+        effort_sum += float(block.get('effort') or 0)
+        effort_curve.append({'time_found': block.get('created'), 'rolling_effort': effort_sum / number})
+    newest = blocks[::-1]
+    return {
+        'count': len(blocks),
+        'latest': newest[0] if newest else None,
+        'recent': newest[:RECENT_BLOCKS],
+        'effort_curve': effort_curve
+    }
+
+class BlockStore:
+    def __init__(self, store: LocalStore, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        self.store = store
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.store.ensure_schema(_SCHEMA)
+
+    def _floor(self) -> Optional[int]:
+        """Lowest height a refresh must reach: the highest stored block, or the oldest unconfirmed one"""
+        row = self.store.execute(
+            "SELECT max(blockheight) AS top, min(CASE WHEN coalesce(status, 'pending') = 'pending' "
+            "THEN blockheight END) AS pending FROM blocks"
+        ).fetchone()
+        if row['top'] is None:
+            return None
+        return min(row['top'], row['pending']) if row['pending'] is not None else row['top']
+
+    async def _fetch_new(self, fetch: Fetch) -> Optional[List[Dict[str, Any]]]:
+        """Fetch blocks above the floor (new or unconfirmed); None if upstream failed"""
+        floor = await asyncio.to_thread(self._floor)
+        if floor is None:
+            data = await fetch(ENDPOINT)
+            return data if isinstance(data, list) else None
+
+        def reached(page):
+            heights = [b['blockheight'] for b in page if isinstance(b, dict) and b.get('blockheight') is not None]
+            return not heights or min(heights) <= floor
+
+        return await fetch_newest(fetch, ENDPOINT, self.page_size, self.max_pages, reached)
+
+    def apply(self, blocks: List[Dict[str, Any]]) -> int:
+        """Upsert blocks in one transaction and extend the running effort sums; returns how many were new"""
+        added, restart = 0, None
+        with self.store.transaction() as conn:
+            for block in blocks:
+                if not isinstance(block, dict) or block.get('blockheight') is None:
+                    continue
+                height = int(block['blockheight'])
+                effort = float(block.get('effort') or 0)
+                row = conn.execute('SELECT effort FROM blocks WHERE blockheight = ?', (height,)).fetchone()
+                if row is None:
+                    conn.execute(
+                        'INSERT INTO blocks (blockheight, created, status, effort, data) VALUES (?, ?, ?, ?, ?)',
+                        (height, block.get('created'), block.get('status'), effort, json.dumps(block))
+                    )
+                    added += 1
+                else:
+                    conn.execute(
+                        'UPDATE blocks SET created = ?, status = ?, effort = ?, data = ? WHERE blockheight = ?',
+                        (block.get('created'), block.get('status'), effort, json.dumps(block), height)
+                    )
+                    if row['effort'] == effort:
+                        continue
+                restart = height if restart is None else min(restart, height)
+            if restart is not None:
+                self._recompute_sums(conn, restart)
+            self.store.set_meta('blocks:synced_at', time.time(), conn)
+        return added
+
+    @staticmethod
+    def _recompute_sums(conn, start: int):
+        """Recompute running sums from height start up; new blocks are on top, so this is usually just them"""
+        previous = conn.execute(
+            'SELECT block_number, effort_sum FROM blocks WHERE blockheight < ? ORDER BY blockheight DESC LIMIT 1',
+            (start,)
+        ).fetchone()
+        number, effort_sum = (previous['block_number'], previous['effort_sum']) if previous else (0, 0.0)
+        rows = conn.execute(
+            'SELECT blockheight, effort FROM blocks WHERE blockheight >= ? ORDER BY blockheight', (start,)
+        ).fetchall()
+        for row in rows:
+            number += 1
+            effort_sum += row['effort']
+            conn.execute('UPDATE blocks SET block_number = ?, effort_sum = ? WHERE blockheight = ?',
+                         (number, effort_sum, row['blockheight']))
+
+    async def refresh(self, fetch: Fetch) -> Optional[Dict[str, Any]]:
+        """Bring the store up to date and return the block_stats summary; None if upstream failed"""
+        start = time.monotonic()
+        blocks = await self._fetch_new(fetch)
+        if blocks is None:
+            return None
+        added = await asyncio.to_thread(self.apply, blocks)
+        logger.info(f"Block store synced {added} new of {len(blocks)} fetched blocks in {time.monotonic() - start:.2f}s")
+        return await asyncio.to_thread(self.summary)
+
+    def summary(self) -> Dict[str, Any]:
+        """The block_stats cache value: count, latest block, newest rows and the effort curve"""
+        recent = [json.loads(row['data']) for row in self.store.execute(
+            'SELECT data FROM blocks ORDER BY blockheight DESC LIMIT ?', (RECENT_BLOCKS,)
+        )]
+        top = self.store.execute('SELECT block_number FROM blocks ORDER BY blockheight DESC LIMIT 1').fetchone()
+        effort_curve = [
+            {'time_found': row['created'], 'rolling_effort': row['effort_sum'] / row['block_number']}
+            for row in self.store.execute(
+                'SELECT created, effort_sum, block_number FROM blocks WHERE block_number > 0 ORDER BY blockheight'
+            )
+        ]
+        return {
+            'count': top['block_number'] if top else 0,
+            'latest': recent[0] if recent else None,
+            'recent': recent,
+            'effort_curve': effort_curve
+        }
@@ -0,0 +1,137 @@
+# utils/cache_codec.py
+"""
+Pluggable serialization for values stored in Redis.
+
+Every encoded value is wrapped in a small versioned envelope:
+
+    b'SC' | format version (1 byte) | serializer id (1 byte) | compression id (1 byte) | payload
+
+so readers can decode values written with any serializer or compression,
+and plain JSON written before the envelope existed is still understood.
+msgpack, orjson and zstandard are optional; without them the codec falls
+back to the standard library json and zlib modules.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MAGIC = b'SC'
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+# Payloads at least this large (in bytes, before compression) are compressed
+DEFAULT_COMPRESS_THRESHOLD = 16 * 1024
+
+SERIALIZER_IDS = {'json': 0, 'orjson': 1, 'msgpack': 2}
+COMPRESSION_IDS = {'none': 0, 'zstd': 1, 'zlib': 2}
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+def _serializers() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    serializers = {'json': (_json_dumps, _json_loads)}
+    if orjson is not None:
+        serializers['orjson'] = (orjson.dumps, orjson.loads)
+    if msgpack is not None:
+        serializers['msgpack'] = (
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False)
+        )
+    return serializers
+
+def _compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    compressors = {
+        'none': (lambda data: data, lambda data: data),
+        'zlib': (lambda data: zlib.compress(data, 6), zlib.decompress)
+    }
+    if zstandard is not None:
+        compressors['zstd'] = (
+            lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data)
+        )
+    return compressors
+
+SERIALIZERS = _serializers()
+COMPRESSORS = _compressors()
+
+def default_serializer() -> str:
+    for name in ('msgpack', 'orjson', 'json'):
+        if name in SERIALIZERS:
+            return name
+
+def default_compression() -> str:
+    return 'zstd' if 'zstd' in COMPRESSORS else 'zlib'
+
+class CacheCodec:
+    """Encode and decode cache values inside a versioned envelope"""
+
+    def __init__(self, serializer: str = None, compression: str = None,
+                 compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD):
+        self.serializer = serializer or default_serializer()
+        self.compression = compression or default_compression()
+        if self.serializer not in SERIALIZERS:
+            raise ValueError(f"Serializer {self.serializer!r} is not available")
+        if self.compression not in COMPRESSORS:
+            raise ValueError(f"Compression {self.compression!r} is not available")
+        self.compress_threshold = compress_threshold
+
+    def encode(self, obj: Any) -> bytes:
+        dumps, _ = SERIALIZERS[self.serializer]
+        payload = dumps(obj)
+        compression = 'none'
+        if self.compression != 'none' and len(payload) >= self.compress_threshold:
+            compress, _ = COMPRESSORS[self.compression]
+            payload = compress(payload)
+            compression = self.compression
+        header = MAGIC + bytes((FORMAT_VERSION, SERIALIZER_IDS[self.serializer], COMPRESSION_IDS[compression]))
+        return header + payload
+
+    @staticmethod
+    def decode(data) -> Any:
+        """Decode a value written by any codec configuration, or legacy plain JSON"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not data.startswith(MAGIC):
+            return json.loads(data)
+
+        version, serializer_id, compression_id = data[len(MAGIC):HEADER_SIZE]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache envelope version {version}")
+        serializer = _name_for(SERIALIZER_IDS, serializer_id)
+        compression = _name_for(COMPRESSION_IDS, compression_id)
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Cached value needs unavailable serializer {serializer!r}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Cached value needs unavailable compression {compression!r}")
+
+        payload = data[HEADER_SIZE:]
+        _, decompress = COMPRESSORS[compression]
+        _, loads = SERIALIZERS[serializer]
+        return loads(decompress(payload))
+
+def _name_for(ids: Dict[str, int], value: int) -> str:
+    for name, known in ids.items():
+        if known == value:
+            return name
+    raise ValueError(f"Unknown codec id {value}")
@@ -0,0 +1,124 @@
+# utils/circuit_breaker.py
+"""
+Per-host circuit breakers for upstream APIs.
+
+A breaker watches the outcome of recent calls to one host. When at least
+MINIMUM_CALLS calls in the last WINDOW seconds have failed at a rate of
+FAILURE_RATE or more, it opens and callers fail fast (allow() is False)
+instead of waiting out timeouts and retries; they serve the last good value
+instead. After OPEN_SECONDS one probe call is let through (half-open): a
+success closes the breaker, a failure keeps it open for another period.
+
+Breakers are per process; every gunicorn worker learns about an outage from
+its own first few failed calls.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict
+from urllib.parse import urlparse
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+FAILURE_RATE = 0.5            # fraction of failed calls that opens the breaker
+MINIMUM_CALLS = 5             # calls in the window before the rate is judged
+WINDOW = 60                   # seconds of call outcomes considered
+OPEN_SECONDS = 30             # seconds to fail fast before probing again
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose breaker is open"""
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_rate: float = FAILURE_RATE, minimum_calls: int = MINIMUM_CALLS,
+                 window: float = WINDOW, open_seconds: float = OPEN_SECONDS):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque()  # (monotonic time, succeeded)
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+            self.state = state
+            metrics.record_circuit_state(self.name, state)
+
+    def allow(self) -> bool:
+        """Return True if a call may go ahead; an open breaker lets one probe through after OPEN_SECONDS"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._set_state(HALF_OPEN)
+            # A probe that never reported back (e.g. its caller died) is replaced after a while
+            if self.state == HALF_OPEN and (not self._probing or time.monotonic() - self._probe_started >= self.open_seconds):
+                self._probing = True
+                self._probe_started = time.monotonic()
+                return True
+        metrics.record_circuit_rejection(self.name)
+        return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead"""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                self._probing = False
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            self._record(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                self._open()
+                return
+            self._record(False)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (self.state == CLOSED and len(self._outcomes) >= self.minimum_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._open()
+
+    def _record(self, succeeded: bool):
+        """Add an outcome and drop those older than the window; caller holds the lock"""
+        now = time.monotonic()
+        self._outcomes.append((now, succeeded))
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """Return the process-wide breaker for the host of url (or for a bare host name)"""
+    host = urlparse(url).netloc or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+def reset_breakers():
+    """Forget every breaker (for tests)"""
+    with _breakers_lock:
+        _breakers.clear()
@@ -1,22 +1,113 @@
 # data_manager.py
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 import asyncio
-import aiohttp
 from cachetools import TTLCache
 from hydra import compose, initialize
 from hydra.core.global_hydra import GlobalHydra
 import redis
-import json
 import os
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from .single_flight import SingleFlight
+from .cache_codec import CacheCodec
+from . import metrics
+from .circuit_breaker import CircuitOpenError
+from .http_client import AsyncHttpClient
+from .invalidation import InvalidationEngine, EXTENDED_TTLS
+from .local_store import LocalStore
+from .payment_ledger import PaymentLedger
+from .block_store import BlockStore, summarize_blocks
+from .hashrate_series import HashrateSeries, summarize_history
+from .demurrage_utils import DEMURRAGE_WALLET, summarize_demurrage
+from .transaction_indexer import TransactionIndexer, transactions_url
 
 logger = logging.getLogger(__name__)
 
 _hydra_initialized = False
 
+# Upstream HTTP settings for the shared AsyncHttpClient
+REQUEST_TIMEOUT = 30          # seconds, per request
+CONNECTION_LIMIT = 100        # total pooled connections, shared with AsyncApiReader
+CONNECTION_LIMIT_PER_HOST = 50
+
+# Upstream endpoint behind each cache refreshed by update_data (pool API paths,
+# or absolute URLs for other hosts)
+ENDPOINTS = {
+    'total_hash_stats': '/sigscore/history',
+    'payment_stats': '/miningcore/payments',
+    'pool_stats': '/miningcore/poolstats',
+    'block_stats': '/miningcore/blocks',
+    'live_miner_data': '/sigscore/miners',
+    'shares': '/miningcore/shares',
+    'demurrage_stats': transactions_url(DEMURRAGE_WALLET)
+}
+# Cache name -> (soft TTL, hard TTL) in seconds. Past the soft TTL an entry is
+# served stale while it is refreshed in the background; past the hard TTL it is gone.
+CACHE_TTLS = {
+    'total_hash_stats': (1800, 7200),
+    'payment_stats': (1800, 7200),
+    'pool_stats': (1800, 7200),
+    'block_stats': (1800, 7200),
+    'live_miner_data': (1800, 7200),
+    'shares': (300, 1200),
+    'demurrage_stats': (1800, 7200)
+}
+DEFAULT_TTLS = (1800, 1800)
+ENDPOINT_TIMEOUT = 20         # seconds, per endpoint during a concurrent refresh
+REFRESH_DEADLINE = 45         # seconds, for the whole concurrent refresh
+
+# Cross-worker refresh lease; must outlive a fetch including its retries
+LEASE_TTL = 120               # seconds
+LEASE_WAIT = 10               # seconds a worker with nothing to serve waits for the lease holder
+LEASE_POLL_INTERVAL = 0.25    # seconds
+LAST_GOOD_TTL = 86400         # seconds the last good value is kept in Redis
+
+# Delete the lease only if it still holds our token
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def summarize_payments(payments) -> Dict[str, Any]:
+    """Sum confirmed payments into the payment_stats shape (used when the payment ledger is unavailable)"""
+    confirmed_payments = [p for p in payments if p.get('status') == 'confirmed']
+    return {'total_paid': sum(float(p.get('amount', 0)) for p in confirmed_payments)}
+
+def prepare_cache_data(cache_key: str, data: Any) -> Any:
+    """Turn raw endpoint data into what is cached under cache_key"""
+    if cache_key == 'payment_stats':
+        return summarize_payments(data)
+    if cache_key == 'block_stats':
+        return summarize_blocks(data)
+    if cache_key == 'total_hash_stats':
+        return summarize_history(data)
+    if cache_key == 'demurrage_stats':
+        items = data.get('items', []) if isinstance(data, dict) else data
+        return summarize_demurrage(items, DEMURRAGE_WALLET)
+    return data
+
 class DataManager:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, stale_while_revalidate: bool = True, read_only: bool = False,
+                 signal_driven: bool = True, local_store: bool = False):
+        """
+        Args:
+            config_path: Hydra config directory
+            stale_while_revalidate: Serve entries past their soft TTL while refreshing them
+            read_only: Only read snapshots written to Redis by the ingestion service
+                (utils/ingest.py) and never call the pool API
+            signal_driven: Refresh block and payment data when a new block or
+                payment appears (utils/invalidation.py) instead of on short TTLs
+            local_store: Keep incrementally synced history in the local store
+                (utils/local_store.py); only the ingest service sets this, so web
+                workers never build their own copy
+        """
         try:
             # Change working directory if needed
             if os.path.exists('/app'):
@@ -47,8 +138,14 @@ class DataManager:
             logger.info(f"API endpoint configured: {self.api}")
             
             self.data = {}
+            self.stale_while_revalidate = stale_while_revalidate
+            self.read_only = read_only
+            self.signal_driven = signal_driven and not read_only
+            self.local_store = local_store and not read_only
             self._initialize_caches()
             self._initialize_redis()
+            self._initialize_stores()
+            self._initialize_event_loop()
             
         except Exception as e:
             logger.error(f"Failed to initialize DataManager: {e}", exc_info=True)
@@ -68,191 +165,518 @@ class DataManager:
             logger.error(f"Failed to connect to Redis: {e}")
             self.redis = None
 
+    def _initialize_stores(self):
+        """Open the local store behind the incremental caches (the ingest process only)"""
+        if not self.local_store:
+            return
+        try:
+            self.store = LocalStore()
+            self.incremental['payment_stats'] = PaymentLedger(self.store)
+            self.incremental['block_stats'] = BlockStore(self.store)
+            self.incremental['total_hash_stats'] = HashrateSeries(self.store)
+            self.incremental['demurrage_stats'] = TransactionIndexer(self.store)
+        except Exception as e:
+            # Without it those caches fall back to downloading their full endpoint
+            logger.error(f"Failed to open local store: {e}")
+
+    def _initialize_event_loop(self):
+        """Start a long-lived event loop on a background thread for upstream fetches"""
+        self._loop = asyncio.new_event_loop()
+        self._loop_pid = os.getpid()
+        # Its sessions belong to this loop, so a new loop gets a new client
+        self.http = AsyncHttpClient(
+            'data_manager',
+            timeout=REQUEST_TIMEOUT,
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST
+        )
+        self._loop_thread = threading.Thread(
+            target=self._run_event_loop,
+            name="data-manager-loop",
+            daemon=True
+        )
+        self._loop_thread.start()
+        logger.info("Started DataManager background event loop")
+
+    def _run_event_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _run_sync(self, coro, timeout: float = None) -> Any:
+        """Run a coroutine on the background loop and block until it completes"""
+        # A loop thread started before a fork (e.g. gunicorn --preload) does not
+        # survive into the child process, so start a fresh one there.
+        if self._loop_pid != os.getpid() or not self._loop_thread.is_alive():
+            self._initialize_event_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def run_async(self, coro, timeout: float = None) -> Any:
+        """Run a coroutine on the shared background loop from synchronous code"""
+        return self._run_sync(coro, timeout)
+
+    def close(self):
+        """Close the shared session and stop the background event loop"""
+        self._refresh_executor.shutdown(wait=False)
+        if self._loop_pid != os.getpid() or not self._loop.is_running():
+            return
+        try:
+            self._run_sync(self.http.close(), timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error closing aiohttp session: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        logger.info("Stopped DataManager background event loop")
+
     def _initialize_caches(self):
         """Initialize caches with longer TTLs and proper maxsize"""
+        self.cache_ttls = dict(CACHE_TTLS)
+        self.invalidation = None
+        if self.signal_driven:
+            # Signals refresh these caches when they change, so their TTLs are only a safety net
+            self.cache_ttls.update(EXTENDED_TTLS)
+            self.invalidation = InvalidationEngine(self)
+        # Entries live until their hard TTL; freshness is judged against the soft TTL
         self.caches = {
-            'total_hash_stats': TTLCache(maxsize=100, ttl=1800),  # 30 minutes
-            'payment_stats': TTLCache(maxsize=100, ttl=1800),     # 30 minutes
-            'pool_stats': TTLCache(maxsize=100, ttl=1800),        # 30 minutes
-            'block_stats': TTLCache(maxsize=100, ttl=1800),       # 30 minutes
-            'live_miner_data': TTLCache(maxsize=1000, ttl=1800),  # 30 minutes
-            'shares': TTLCache(maxsize=100, ttl=300)              # 5 minutes
+            cache_key: TTLCache(maxsize=100, ttl=hard_ttl)
+            for cache_key, (_, hard_ttl) in self.cache_ttls.items()
         }
+        # Serialization and compression of values stored in Redis
+        self.codec = CacheCodec(os.getenv('CACHE_SERIALIZER'), os.getenv('CACHE_COMPRESSION'))
+        # Concurrent cache misses for the same endpoint share one upstream request
+        self.single_flight = SingleFlight('data_manager')
+        # Last successfully fetched value per cache, served while a refresh is in progress
+        self._last_good = {}
+        # Caches backed by a local incremental store instead of a full download
+        self.incremental = {}
+        # Background revalidation of stale entries
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='data-manager-refresh')
         logger.info("Initialized DataManager caches with extended TTLs")
 
-    def _get_cached_data(self, cache_key: str) -> Any:
-        """Get data from cache with Redis fallback"""
-        # Try Redis first if available
+    def _get_cache_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached {'fetched_at', 'version', 'data'} entry for cache_key.
+
+        L1 is the in-process cache of already-parsed entries, L2 is Redis. With
+        Redis available, L1 is revalidated by reading the tiny version counter:
+        if it matches, the parsed L1 entry is returned without touching the
+        payload. Only a version change costs a payload GET and a decode.
+        """
+        local = self.caches[cache_key].get(cache_key) if cache_key in self.caches else None
         if self.redis:
             try:
-                data = self.redis.get(cache_key)
-                if data:
-                    logger.debug(f"Redis cache hit for {cache_key}")
-                    return json.loads(data)
+                version = self.redis.get(f"{cache_key}:version")
+                if version is not None:
+                    version = int(version)
+                    if local is not None and local.get('version') == version:
+                        logger.debug(f"L1 cache hit for {cache_key} (version {version})")
+                        return local
+
+                    data = self.redis.get(cache_key)
+                    if data:
+                        entry = self.codec.decode(data)
+                        # Values written before entries carried a timestamp are treated as misses
+                        if isinstance(entry, dict) and 'fetched_at' in entry:
+                            logger.debug(f"L2 cache hit for {cache_key} (version {entry.get('version')})")
+                            if cache_key in self.caches:
+                                self.caches[cache_key][cache_key] = entry
+                                self._record_size(cache_key, entry['data'])
+                            return entry
             except Exception as e:
                 logger.error(f"Redis error for {cache_key}: {e}")
 
-        # Fallback to in-memory cache
-        if cache_key in self.caches and cache_key in self.caches[cache_key]:
+        if local is not None:
             logger.debug(f"Memory cache hit for {cache_key}")
-            return self.caches[cache_key][cache_key]
+            return local
         
         logger.debug(f"Cache miss for {cache_key}")
         return None
 
+    @staticmethod
+    def _entry_age(entry: Dict[str, Any]) -> float:
+        return time.time() - entry.get('fetched_at', 0)
+
+    def _is_fresh(self, cache_key: str, entry: Optional[Dict[str, Any]]) -> bool:
+        return entry is not None and self._entry_age(entry) < self.cache_ttls.get(cache_key, DEFAULT_TTLS)[0]
+
+    def _get_cached_data(self, cache_key: str) -> Any:
+        """Get fresh (within soft TTL) data from cache"""
+        entry = self._get_cache_entry(cache_key)
+        if self._is_fresh(cache_key, entry):
+            return entry['data']
+        return None
+
     def _set_cached_data(self, cache_key: str, data: Any):
         """Set data in cache with Redis support"""
+        entry = {'fetched_at': time.time(), 'version': 0, 'data': data}
+        hard_ttl = self.cache_ttls.get(cache_key, DEFAULT_TTLS)[1]
+
         # Try to store in Redis if available
         if self.redis:
             try:
-                self.redis.setex(
-                    cache_key,
-                    self.caches[cache_key].ttl if cache_key in self.caches else 1800,
-                    json.dumps(data)
-                )
+                # Every write gets a new version so readers can tell snapshots apart
+                entry['version'] = self.redis.incr(f"{cache_key}:version")
+                self.redis.setex(cache_key, hard_ttl, self.codec.encode(entry))
+                # Kept well past the TTL so other workers can serve it during a refresh
+                self.redis.setex(f"{cache_key}:last", LAST_GOOD_TTL, self.codec.encode(data))
                 logger.debug(f"Stored data in Redis for {cache_key}")
             except Exception as e:
                 logger.error(f"Redis storage error for {cache_key}: {e}")
 
         # Always store in memory cache as fallback
+        self._last_good[cache_key] = data
         if cache_key in self.caches:
-            self.caches[cache_key][cache_key] = data
+            self.caches[cache_key][cache_key] = entry
+            self._record_size(cache_key, data)
             logger.debug(f"Stored data in memory cache for {cache_key}")
 
-    async def _make_request(self, url: str) -> Dict:
-        """Make async HTTP request with error handling and retries"""
-        retries = 3
-        for attempt in range(retries):
+    def _record_size(self, cache_key: str, data: Any):
+        metrics.record_cache_size('data_manager', cache_key, len(self.caches[cache_key]), metrics.approx_bytes(data))
+
+    def _get_last_good(self, cache_key: str) -> Any:
+        """Return the last successfully fetched value for cache_key, even if expired"""
+        if cache_key in self._last_good:
+            return self._last_good[cache_key]
+        if self.redis:
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            return await response.json()
-                        logger.error(f"API request failed: {response.status}")
-                        if attempt < retries - 1:  # don't sleep on the last attempt
-                            await asyncio.sleep(1 * (attempt + 1))  # exponential backoff
+                data = self.redis.get(f"{cache_key}:last")
+                if data:
+                    return self.codec.decode(data)
             except Exception as e:
-                logger.error(f"Request error for {url}: {str(e)}")
-                if attempt < retries - 1:
-                    await asyncio.sleep(1 * (attempt + 1))
+                logger.error(f"Redis error reading last good value for {cache_key}: {e}")
         return None
 
-    def _get_endpoint_data(self, endpoint: str) -> Dict:
-        """Get endpoint data with improved caching and error handling"""
-        cache_key = endpoint.strip('/').replace('/', '_')
-        
-        # Check cache first
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data is not None:
-            return cached_data
+    def _acquire_lease(self, cache_key: str) -> Optional[str]:
+        """
+        Try to take the cross-worker refresh lease for cache_key.
 
-        # If not in cache, make the request
-        url = f'{self.api}{endpoint}'
+        Returns a token to pass to _release_lease, or None if another process
+        holds the lease. Without Redis (or if Redis errors) every caller gets a
+        token, since single-flight already deduplicates within the process.
+        """
+        token = uuid.uuid4().hex
+        if not self.redis:
+            return token
         try:
-            result = asyncio.run(self._make_request(url))
-            if result is not None:
-                self._set_cached_data(cache_key, result)
-                return result
-            
-            # If request failed, return last known data from cache if available
-            if cache_key in self.caches:
-                logger.warning(f"Using stale cache data for {cache_key} due to failed request")
-                return self.caches[cache_key].get(cache_key, {})
-            
+            if self.redis.set(f"lease:{cache_key}", token, nx=True, ex=LEASE_TTL):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Redis error acquiring lease for {cache_key}: {e}")
+            return token
+
+    def _release_lease(self, cache_key: str, token: Optional[str]):
+        """Release the refresh lease if this process still holds it"""
+        if not self.redis or token is None:
+            return
+        try:
+            self.redis.eval(_RELEASE_LEASE_SCRIPT, 1, f"lease:{cache_key}", token)
+        except Exception as e:
+            logger.error(f"Redis error releasing lease for {cache_key}: {e}")
+
+    def _wait_for_refresh(self, cache_key: str) -> Any:
+        """Poll Redis for a value being refreshed by the lease holder"""
+        deadline = time.monotonic() + LEASE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LEASE_POLL_INTERVAL)
+            data = self._get_cached_data(cache_key)
+            if data is not None:
+                return data
+        return None
+
+    async def _make_request(self, url: str) -> Dict:
+        """Make async HTTP request through the shared client; None on failure"""
+        try:
+            return await self.http.get_json(url)
+        except CircuitOpenError as e:
+            # Fail fast while the host is down; callers fall back to the last good value
+            logger.warning(f"{e}, not requesting {url}")
+        except Exception as e:
+            logger.error(f"Request error for {url}: {str(e)}")
+        return None
+
+    async def _fetch_endpoint(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """Fetch an endpoint, sharing one upstream request among concurrent callers"""
+        url = endpoint if '://' in endpoint else f'{self.api}{endpoint}'
+        if params:
+            url = f'{url}?{urlencode(params)}'
+        return await self.single_flight.do_async(
+            SingleFlight.make_key(endpoint, params),
+            lambda: self._make_request(url)
+        )
+
+    def fetch(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """Fetch an endpoint from upstream without caching"""
+        return self._run_sync(self._fetch_endpoint(endpoint, params))
+
+    async def _fetch_cache_data(self, cache_key: str) -> Any:
+        """Fetch the value cached under cache_key: its incremental store's summary or its prepared endpoint data"""
+        source = self.incremental.get(cache_key)
+        if source is not None:
+            return await source.refresh(self._fetch_endpoint)
+        data = await self._fetch_endpoint(ENDPOINTS[cache_key])
+        return prepare_cache_data(cache_key, data) if data else None
+
+    def _fetch_and_store(self, cache_key: str) -> Any:
+        """Fetch cache_key's data and store the result; returns None on failure"""
+        try:
+            data = self._run_sync(self._fetch_cache_data(cache_key))
+        except Exception as e:
+            logger.error(f"Error fetching {cache_key}: {e}")
+            return None
+        if not data:
+            return None
+        self._set_cached_data(cache_key, data)
+        return data
+
+    def _revalidate(self, cache_key: str):
+        """Refresh a stale entry in the background, if no other worker is already doing so"""
+        try:
+            lease = self._acquire_lease(cache_key)
+            if lease is None:
+                return
+            try:
+                if self._fetch_and_store(cache_key) is not None:
+                    logger.debug(f"Revalidated {cache_key} in the background")
+            finally:
+                self._release_lease(cache_key, lease)
+        except Exception as e:
+            logger.error(f"Error revalidating {cache_key}: {e}")
+        finally:
+            with self._revalidate_lock:
+                self._revalidating.discard(cache_key)
+
+    def _schedule_revalidation(self, cache_key: str):
+        """Queue a background refresh of cache_key unless one is already queued"""
+        with self._revalidate_lock:
+            if cache_key in self._revalidating:
+                return
+            self._revalidating.add(cache_key)
+        self._submit_refresh(cache_key, self._revalidate, cache_key)
+
+    def _submit_refresh(self, key: str, fn, *args):
+        """Run fn on the refresh executor; after close() it is skipped and key unmarked"""
+        try:
+            self._refresh_executor.submit(fn, *args)
+        except RuntimeError as e:
+            logger.warning(f"Not scheduling background refresh of {key}: {e}")
+            with self._revalidate_lock:
+                self._revalidating.discard(key)
+
+    def restore_ttls(self, cache_keys):
+        """Go back to the normal TTLs for caches no longer kept fresh by a signal"""
+        for cache_key in cache_keys:
+            self.cache_ttls[cache_key] = CACHE_TTLS.get(cache_key, DEFAULT_TTLS)
+
+    def check_signals(self, force: bool = False) -> Dict[str, bool]:
+        """Refresh the caches whose invalidation signal changed since the last check"""
+        if self.invalidation is None:
             return {}
+        try:
+            return self.invalidation.run(force=force)
         except Exception as e:
-            logger.error(f"Error fetching endpoint {endpoint}: {e}")
+            logger.error(f"Error checking invalidation signals: {e}")
             return {}
 
+    def _schedule_signal_check(self):
+        """Check invalidation signals in the background once they are due"""
+        if self.invalidation is not None and self.invalidation.due():
+            with self._revalidate_lock:
+                if 'signals' in self._revalidating:
+                    return
+                self._revalidating.add('signals')
+            self._submit_refresh('signals', self._run_signal_check)
+
+    def _run_signal_check(self):
+        try:
+            self.check_signals()
+        finally:
+            with self._revalidate_lock:
+                self._revalidating.discard('signals')
+
+    def _get_data(self, cache_key: str) -> Any:
+        """
+        Return cached data for cache_key, refreshing it from upstream on a miss.
+
+        In read-only mode the latest snapshot is returned as is. In
+        stale-while-revalidate mode an entry past its soft TTL is returned
+        immediately and refreshed in the background; only a missing entry (or
+        one past its hard TTL) blocks. Only the process holding the Redis
+        refresh lease fetches; the others keep serving the last good value
+        until the new one lands.
+        """
+        entry = self._get_cache_entry(cache_key)
+        if self.read_only:
+            # Snapshots are refreshed by the ingestion service; serve whatever is there
+            if entry is not None:
+                metrics.record_cache('data_manager', cache_key, 'hit' if self._is_fresh(cache_key, entry) else 'stale')
+                return entry['data']
+            previous = self._get_last_good(cache_key)
+            metrics.record_cache('data_manager', cache_key, 'miss' if previous is None else 'stale')
+            return previous
+
+        self._schedule_signal_check()
+        if entry is not None:
+            soft_ttl, hard_ttl = self.cache_ttls.get(cache_key, DEFAULT_TTLS)
+            age = self._entry_age(entry)
+            if age < soft_ttl:
+                metrics.record_cache('data_manager', cache_key, 'hit')
+                return entry['data']
+            if self.stale_while_revalidate and age < hard_ttl:
+                logger.debug(f"Serving stale {cache_key} ({age:.0f}s old) while revalidating")
+                metrics.record_cache('data_manager', cache_key, 'stale')
+                self._schedule_revalidation(cache_key)
+                return entry['data']
+
+        metrics.record_cache('data_manager', cache_key, 'miss')
+        lease = self._acquire_lease(cache_key)
+        if lease is None:
+            previous = self._get_last_good(cache_key)
+            if previous is not None:
+                logger.debug(f"Serving previous value for {cache_key} while another worker refreshes")
+                return previous
+            data = self._wait_for_refresh(cache_key)
+            if data is not None:
+                return data
+            logger.warning(f"Refresh of {cache_key} by another worker did not land, fetching directly")
+
+        try:
+            data = self._fetch_and_store(cache_key)
+        finally:
+            self._release_lease(cache_key, lease)
+
+        if data is None:
+            previous = self._get_last_good(cache_key)
+            if previous is not None:
+                logger.warning(f"Using stale cache data for {cache_key} due to failed request")
+            return previous
+        return data
+
     def get_total_hash_stats(self) -> Dict:
-        """Get total hash statistics with caching"""
-        cached_data = self._get_cached_data('total_hash_stats')
-        if cached_data is not None:
-            return cached_data
-        
-        data = self._get_endpoint_data('/sigscore/history')
-        if data:
-            self._set_cached_data('total_hash_stats', data)
-        return data or {}
+        """Get the pool hashrate summary (latest point and downsampled chart ranges) with caching"""
+        return self._get_data('total_hash_stats') or {}
 
     def get_payment_stats(self) -> Dict[str, Any]:
         """Get payment statistics with caching"""
-        cached_data = self._get_cached_data('payment_stats')
-        if cached_data is not None:
-            return cached_data
-            
-        data = self._get_endpoint_data('/miningcore/payments')
-        if not data:
-            return {'total_paid': 0}
-            
-        # Filter for confirmed transactions only
-        confirmed_payments = [p for p in data if p.get('status') == 'confirmed']
-        result = {'total_paid': sum(p['amount'] for p in confirmed_payments)}
-        
-        self._set_cached_data('payment_stats', result)
-        return result
+        return self._get_data('payment_stats') or {'total_paid': 0}
+
+    def get_demurrage_stats(self) -> Dict[str, Any]:
+        """Get the demurrage wallet summary (last_payment_ts, last_demurrage, next_demurrage) with caching"""
+        return self._get_data('demurrage_stats') or {}
 
     def get_pool_stats(self) -> Dict:
         """Get pool statistics with caching"""
-        cached_data = self._get_cached_data('pool_stats')
-        if cached_data is not None:
-            return cached_data
-            
-        data = self._get_endpoint_data('/miningcore/poolstats')
-        if data:
-            self._set_cached_data('pool_stats', data)
-        return data or {}
+        return self._get_data('pool_stats') or {}
 
     def get_shares(self) -> Dict:
         """Get shares data with shorter cache duration"""
-        cached_data = self._get_cached_data('shares')
-        if cached_data is not None:
-            return cached_data
-            
-        data = self._get_endpoint_data('/miningcore/shares')
-        if data:
-            self._set_cached_data('shares', data)
-        return data or {}
+        return self._get_data('shares') or {}
 
     def get_block_stats(self) -> Dict:
-        """Get block statistics with caching"""
-        cached_data = self._get_cached_data('block_stats')
-        if cached_data is not None:
-            return cached_data
-            
-        data = self._get_endpoint_data('/miningcore/blocks')
-        if data:
-            self._set_cached_data('block_stats', data)
-        return data or {}
+        """Get the block summary (count, latest, recent, effort_curve) with caching"""
+        return self._get_data('block_stats') or {}
 
     def get_live_miner_data(self) -> Dict:
         """Get live miner data with caching"""
-        cached_data = self._get_cached_data('live_miner_data')
-        if cached_data is not None:
-            return cached_data
-            
-        data = self._get_endpoint_data('/sigscore/miners')
-        if data:
-            self._set_cached_data('live_miner_data', data)
-        return data or {}
+        return self._get_data('live_miner_data') or {}
+
+    async def _fetch_for_refresh(self, cache_key: str, endpoint_timeout: float, results: Dict[str, Any]):
+        """Fetch one cache for a concurrent refresh, recording the result if it arrives in time"""
+        try:
+            result = await asyncio.wait_for(self._fetch_cache_data(cache_key), endpoint_timeout)
+            if result:
+                results[cache_key] = result
+        except asyncio.TimeoutError:
+            logger.warning(f"Refresh of {cache_key} timed out after {endpoint_timeout}s")
+        except Exception as e:
+            logger.error(f"Error refreshing {cache_key}: {e}")
 
-    def update_data(self):
-        """Update all cached data in a controlled manner"""
+    async def _refresh_concurrently(self, cache_keys, endpoint_timeout: float, deadline: float) -> Dict[str, Any]:
+        """Fetch all given caches' endpoints at once, keeping whatever finished before the deadline"""
+        results = {}
         try:
-            # Update each cache only if it's expired
-            for cache_key in self.caches:
-                if cache_key not in self.caches[cache_key]:
-                    if cache_key == 'total_hash_stats':
-                        self.get_total_hash_stats()
-                    elif cache_key == 'payment_stats':
-                        self.get_payment_stats()
-                    elif cache_key == 'pool_stats':
-                        self.get_pool_stats()
-                    elif cache_key == 'block_stats':
-                        self.get_block_stats()
-                    elif cache_key == 'live_miner_data':
-                        self.get_live_miner_data()
-                    elif cache_key == 'shares':
-                        self.get_shares()
+            await asyncio.wait_for(
+                asyncio.gather(*(self._fetch_for_refresh(key, endpoint_timeout, results) for key in cache_keys)),
+                deadline
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Concurrent refresh hit its {deadline}s deadline")
+        return results
+
+    def refresh(self, cache_keys, endpoint_timeout: float = ENDPOINT_TIMEOUT,
+                deadline: float = REFRESH_DEADLINE) -> Dict[str, bool]:
+        """
+        Fetch the given caches from upstream concurrently, regardless of freshness.
+
+        Every cache whose refresh lease this process wins is fetched at once on
+        the background loop, each bounded by endpoint_timeout and all of them
+        by deadline. Caches leased by another process are left out of the report.
+
+        Returns:
+            Dict[str, bool]: Whether each leased cache was refreshed successfully
+        """
+        report = {}
+        # Only refresh what no other worker is already refreshing
+        leases = {key: self._acquire_lease(key) for key in cache_keys}
+        leased = [key for key, token in leases.items() if token is not None]
+        try:
+            results = self._run_sync(
+                self._refresh_concurrently(leased, endpoint_timeout, deadline),
+                timeout=deadline + 5
+            )
+            for cache_key in leased:
+                data = results.get(cache_key)
+                if data:
+                    self._set_cached_data(cache_key, data)
+                report[cache_key] = bool(data)
+        finally:
+            for cache_key in leased:
+                self._release_lease(cache_key, leases[cache_key])
+        return report
+
+    def update_data(self, concurrent: bool = True, endpoint_timeout: float = ENDPOINT_TIMEOUT,
+                    deadline: float = REFRESH_DEADLINE) -> Dict[str, bool]:
+        """
+        Update all expired caches.
+
+        With concurrent=True the expired caches are fetched together through
+        refresh(). Otherwise they are refreshed one at a time. Either way,
+        caches leased by another process are left out of the report. Does
+        nothing in read-only mode, where the ingestion service owns refreshes.
+
+        Returns:
+            Dict[str, bool]: Whether each expired cache was refreshed successfully
+        """
+        start = time.monotonic()
+        report = {}
+        if self.read_only:
+            return report
+        try:
+            expired = [key for key in self.caches if not self._is_fresh(key, self.caches[key].get(key))]
+            if not expired:
+                return report
+
+            if concurrent:
+                report = self.refresh(expired, endpoint_timeout, deadline)
+            else:
+                for cache_key in expired:
+                    # Report the fetch itself; the getters fall back to defaults on failure
+                    lease = self._acquire_lease(cache_key)
+                    if lease is None:
+                        continue
+                    try:
+                        report[cache_key] = self._fetch_and_store(cache_key) is not None
+                    finally:
+                        self._release_lease(cache_key, lease)
         except Exception as e:
             logger.error(f"Error updating data: {e}")
+
+        succeeded = [key for key, ok in report.items() if ok]
+        failed = [key for key, ok in report.items() if not ok]
+        logger.info(
+            f"Data update finished in {time.monotonic() - start:.2f}s - "
+            f"succeeded: {succeeded}, failed: {failed}"
+        )
+        return report
@@ -1,12 +1,67 @@
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 # Conversion factor: 1 ERG = 1e9 nanoERGs
 NANOERG_FACTOR = 10**9
 
+EXPLORER_API = 'https://api.ergoplatform.com/api/v1'
+DEMURRAGE_WALLET = os.getenv('DEMURRAGE_WALLET', '9fE5o7913CKKe6wvNgM11vULjTuKiopPcvCaj7t2zcJWXM2gcLu')
+
+def classify_transaction(tx: Dict[str, Any], wallet_address: str) -> Tuple[bool, int, int]:
+    """
+    Scan a transaction's inputs and outputs once.
+
+    Returns (outgoing, sent, received): whether the wallet spends in it and
+    pays other addresses, the nanoERGs sent to other addresses, and the
+    nanoERGs sent to the wallet.
+    """
+    spends = any(inp.get("address") == wallet_address for inp in tx.get("inputs", []))
+    sent = received = 0
+    has_external_outputs = False
+    for out_box in tx.get("outputs", []):
+        if out_box.get("address") == wallet_address:
+            received += out_box.get("value", 0)
+        else:
+            has_external_outputs = True
+            sent += out_box.get("value", 0)
+    return spends and has_external_outputs, sent, received
+
+def summarize_demurrage(transactions: List[Dict[str, Any]], wallet_address: str) -> Dict[str, Any]:
+    """
+    Reduce transactions to the demurrage summary cached by DataManager.
+
+    Returns last_payment_ts (milliseconds, None without an outgoing
+    transaction), last_demurrage and next_demurrage in ERG.
+    """
+    classified = [(tx.get("timestamp", 0), *classify_transaction(tx, wallet_address)) for tx in transactions]
+    outgoing = [(ts, sent) for ts, is_outgoing, sent, _ in classified if is_outgoing]
+    if not outgoing:
+        return {"last_payment_ts": None, "last_demurrage": 0, "next_demurrage": 0}
+    last_payment_ts, last_sent = max(outgoing, key=lambda item: item[0])
+    next_received = sum(received for ts, _, _, received in classified if ts > last_payment_ts)
+    return {
+        "last_payment_ts": last_payment_ts,
+        "last_demurrage": last_sent / NANOERG_FACTOR,
+        "next_demurrage": next_received / NANOERG_FACTOR
+    }
+
+def format_last_payment(last_payment_ts: Optional[int]) -> str:
+    """Human-friendly time since a payment timestamp in milliseconds"""
+    if last_payment_ts is None:
+        return "Never"
+    delta = datetime.now() - datetime.fromtimestamp(last_payment_ts / 1000.0)
+    if delta.days > 0:
+        return f"{delta.days} days ago"
+    elif delta.seconds >= 3600:
+        return f"{delta.seconds // 3600} hours ago"
+    elif delta.seconds >= 60:
+        return f"{delta.seconds // 60} minutes ago"
+    return "Just now"
+
 def calculate_demurrage_metrics(transactions: List[Dict[str, Any]], wallet_address: str) -> Dict[str, Any]:
     """
     Calculate demurrage metrics from transaction data
@@ -19,84 +74,13 @@ def calculate_demurrage_metrics(transactions: List[Dict[str, Any]], wallet_addre
         Dict containing next_demurrage, last_demurrage, and last_payment
     """
     try:
-        # Default return values
-        default_metrics = {
-            "next_demurrage": 0,
-            "last_demurrage": 0,
-            "last_payment": "Never"
-        }
-        
         if not transactions:
             logger.warning("No transactions provided for demurrage calculation")
-            return default_metrics
-            
-        # Outgoing transactions: transactions where we spend from our wallet AND send to other addresses
-        outgoing_txs = []
-        for tx in transactions:
-            # Check if we're spending from this wallet
-            is_spending = any(inp.get("address") == wallet_address for inp in tx.get("inputs", []))
-            if is_spending:
-                # Check if any outputs go to addresses other than our wallet
-                has_external_outputs = any(
-                    out_box.get("address") != wallet_address 
-                    for out_box in tx.get("outputs", [])
-                )
-                if has_external_outputs:
-                    outgoing_txs.append(tx)
-        
-        if not outgoing_txs:
-            logger.info(f"No outgoing transactions found for wallet address: {wallet_address}")
-            return default_metrics
-        
-        # Most recent outgoing transaction (by timestamp in milliseconds)
-        last_outgoing = max(outgoing_txs, key=lambda tx: tx.get("timestamp", 0))
-        last_payment_ts = last_outgoing.get("timestamp")
-        logger.info(f"Last outgoing transaction timestamp: {last_payment_ts}")
-        
-        # Last Demurrage: sum outputs not sent back to our wallet (convert from nanoERGs to ERGs)
-        last_demurrage_nano = sum(
-            out_box.get("value", 0)
-            for out_box in last_outgoing.get("outputs", [])
-            if out_box.get("address") != wallet_address
-        )
-        last_demurrage = last_demurrage_nano / NANOERG_FACTOR
-        logger.info(f"Calculated last demurrage: {last_demurrage} ERG")
-        
-        # Next Demurrage: for transactions after the last outgoing, sum incoming outputs (to our wallet)
-        next_demurrage_nano = 0
-        incoming_count = 0
-        for tx in transactions:
-            if tx.get("timestamp", 0) > last_payment_ts:
-                for out_box in tx.get("outputs", []):
-                    if out_box.get("address") == wallet_address:
-                        next_demurrage_nano += out_box.get("value", 0)
-                        incoming_count += 1
-        next_demurrage = next_demurrage_nano / NANOERG_FACTOR
-        logger.info(f"Found {incoming_count} incoming transactions after last payment")
-        logger.info(f"Calculated next demurrage: {next_demurrage} ERG")
-        
-        # Convert last payment timestamp to human-friendly string
-        last_payment_dt = datetime.fromtimestamp(last_payment_ts / 1000.0)
-        now = datetime.now()
-        delta = now - last_payment_dt
-        
-        if delta.days > 0:
-            last_payment_str = f"{delta.days} days ago"
-        elif delta.seconds >= 3600:
-            hours = delta.seconds // 3600
-            last_payment_str = f"{hours} hours ago"
-        elif delta.seconds >= 60:
-            minutes = delta.seconds // 60
-            last_payment_str = f"{minutes} minutes ago"
-        else:
-            last_payment_str = "Just now"
-        
-        logger.info(f"Calculated last payment time: {last_payment_str}")
-        
+        summary = summarize_demurrage(transactions or [], wallet_address)
         return {
-            "next_demurrage": next_demurrage,
-            "last_demurrage": last_demurrage,
-            "last_payment": last_payment_str
+            "next_demurrage": summary["next_demurrage"],
+            "last_demurrage": summary["last_demurrage"],
+            "last_payment": format_last_payment(summary["last_payment_ts"])
         }
         
     except Exception as e:
@@ -106,4 +90,4 @@ def calculate_demurrage_metrics(transactions: List[Dict[str, Any]], wallet_addre
             "next_demurrage": 0,
             "last_demurrage": 0,
             "last_payment": "Error"
-        } 
\ No newline at end of file
+        } 
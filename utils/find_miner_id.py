@@ -1,9 +1,13 @@
 import requests
 import json 
 import logging
+from .circuit_breaker import CircuitOpenError
+from .http_client import default_client
 
 logger = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT = 15  # seconds; explorer calls used to have no timeout at all
+
 class ReadTokens:
     def __init__(self, api='https://api.ergo.aap.cornell.edu/api/v1/boxes/byAddress', token_ls_url='https://api.ergo.aap.cornell.edu/api/v1/tokens/'):
         '''
@@ -16,11 +20,12 @@ class ReadTokens:
         
         self.api = api
         self.token_ls = token_ls_url
+        self.http = default_client()
 
     def get_api_data(self, api_url):
         try:
             # Send a GET request to the API
-            response = requests.get(api_url)
+            response = self.http.get(api_url, timeout=REQUEST_TIMEOUT)
     
             # Check if the request was successful (status code 200)
             if response.status_code == 200:
@@ -31,6 +36,9 @@ class ReadTokens:
                 logger.error(f"Failed to retrieve data: Status code {response.status_code}")
                 return None
     
+        except CircuitOpenError as e:
+            logger.warning(f"{e}, skipping {api_url}")
+            return None
         except requests.exceptions.RequestException as e:
             # Handle any exceptions that occur during the request
             logger.error(f"An error occurred: {e}")
@@ -48,8 +56,11 @@ class ReadTokens:
             
             # Use the Ergo Explorer API to get balance and tokens
             url = f'https://api.ergoplatform.com/api/v1/addresses/{address}/balance/confirmed'
-            
-            response = requests.get(url)
+            try:
+                response = self.http.get(url, timeout=REQUEST_TIMEOUT)
+            except CircuitOpenError as e:
+                logger.warning(f"{e}, skipping wallet balance for {address}")
+                return None
             if response.status_code == 200:
                 data = response.json()
                 # Convert the response to match the expected format
@@ -66,15 +77,16 @@ class ReadTokens:
             return None
 
     def find_token_name_in_wallet(self, wallet, name):
+        '''Tokens in wallet named name; [] if it holds none, None if the balance could not be read'''
         try:
             wallet_data = self.get_wallet_balance(wallet)
             if not wallet_data:
                 logger.error("No wallet data received")
-                return []
+                return None
                 
             if 'error' in wallet_data:
                 logger.error(f"API error: {wallet_data['error']} - {wallet_data.get('detail', '')}")
-                return []
+                return None
                 
             if 'confirmed' not in wallet_data:
                 logger.error("No confirmed data in wallet response")
@@ -93,10 +105,10 @@ class ReadTokens:
             return ls
         except Exception as e:
             logger.error(f"Error finding tokens: {e}")
-            return []
+            return None
 
     def get_latest_miner_id(self, wallet):
-        possible_tokens = self.find_token_name_in_wallet(wallet, 'Sigmanaut Mining Pool Miner ID - Season 1')
+        possible_tokens = self.find_token_name_in_wallet(wallet, 'Sigmanaut Mining Pool Miner ID - Season 1') or []
 
         my_tokens = []
         most_recent_token = None
@@ -136,6 +148,28 @@ class ReadTokens:
 
         return most_recent_token
                                     
+    def search_tokens(self, query, offset=0, limit=100):
+        '''One page of tokens whose name matches query: {'items': [...], 'total': n}, or None on failure'''
+        url = '{}/search'.format(self.token_ls.rstrip('/'))
+        try:
+            response = self.http.get(url, params={'query': query, 'offset': offset, 'limit': limit},
+                                     timeout=REQUEST_TIMEOUT)
+        except CircuitOpenError as e:
+            logger.warning(f"{e}, skipping token search for {query}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Token search for {query} failed: {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Token search for {query} failed: status code {response.status_code}")
+            return None
+        try:
+            data = response.json()
+        except ValueError as e:
+            logger.error(f"Token search for {query} returned invalid JSON: {e}")
+            return None
+        return data if isinstance(data, dict) else None
+
     def get_token_description(self, id):
         url = '{}/{}'.format(self.token_ls, id)
         data = self.get_api_data(url)
@@ -1,24 +1,48 @@
-from pycoingecko import CoinGeckoAPI
 from pandas import DataFrame
+import logging
+from .http_client import default_client
+
+logger = logging.getLogger(__name__)
+
+# CoinGecko's public REST API, called through the shared pooled client
+SIMPLE_PRICE_URL = 'https://api.coingecko.com/api/v3/simple/price'
+REQUEST_TIMEOUT = 10  # seconds
+
+def get_price(ids, vs_currencies='usd', http=None):
+    """Current prices as {id: {currency: price}}; raises on failure"""
+    params = {'ids': ','.join(ids), 'vs_currencies': vs_currencies}
+    return (http or default_client()).get_json(SIMPLE_PRICE_URL, params, REQUEST_TIMEOUT)
 
 def get_prices():
-    cg = CoinGeckoAPI()
-    prices = cg.get_price(ids=['rosen-bridge', 'ergo', 'spectrum-finance'], vs_currencies='usd')
+    prices = get_price(['rosen-bridge', 'ergo', 'spectrum-finance'])
     df = DataFrame(prices)
     df.to_csv('price_data.csv')
-    
+
 class PriceReader:
     def __init__(self):
-        self.cg = CoinGeckoAPI()
-        
+        self.http = default_client()
+        self._last_prices = None
+
     def get(self, debug=False):
         # Fetch current price of Bitcoin (BTC) and Ergo (ERG) in USD
         if debug:
             return 10, 10
-        else:
-            prices = self.cg.get_price(ids=['bitcoin', 'ergo'], vs_currencies='usd')
+        try:
+            # The client fails fast with CircuitOpenError while CoinGecko is down
+            prices = get_price(['bitcoin', 'ergo'], http=self.http)
             btc_price = prices['bitcoin']['usd']
             erg_price = prices['ergo']['usd']
-            return btc_price, erg_price
+        except Exception as e:
+            return self._fallback(e)
+        self._last_prices = (btc_price, erg_price)
+        return btc_price, erg_price
+
+    def _fallback(self, error):
+        """Return the last prices we saw, or re-raise if there are none"""
+        if self._last_prices is None:
+            raise error
+        logger.warning(f"Using last known prices: {error}")
+        return self._last_prices
+
 if __name__ == '__main__':
-    get_prices()
\ No newline at end of file
+    get_prices()
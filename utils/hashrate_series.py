@@ -0,0 +1,194 @@
+# utils/hashrate_series.py
+"""
+Pool hashrate history (/sigscore/history) as a local time series with rollups.
+
+The front page used to receive the whole history on every plot refresh and
+sort it in pandas. The series store appends only points newer than those it
+holds and keeps 5-minute, hourly and daily rollups (min, mean, max) up to
+date as points arrive. For each chart range (HASHRATE_RANGES) it picks the
+finest resolution that fits in MAX_POINTS, so the browser gets a bounded
+number of points whatever the pool's age.
+
+The endpoint has no cursor parameter, so a refresh still downloads the list;
+only points past the stored watermark are parsed into the store.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .local_store import Fetch, LocalStore
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = '/sigscore/history'
+RESOLUTIONS = (300, 3600, 86400)  # seconds per rollup bucket: 5 minutes, 1 hour, 1 day
+MAX_POINTS = 500                  # points per chart range sent to the browser
+# Chart range -> seconds back from the newest point (None for the whole history)
+HASHRATE_RANGES = {'1d': 86400, '7d': 7 * 86400, '30d': 30 * 86400, 'all': None}
+DEFAULT_RANGE = 'all'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashrate_points (
+    ts INTEGER PRIMARY KEY,
+    hashrate REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashrate_rollups (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    low REAL NOT NULL,
+    high REAL NOT NULL,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket)
+);
+"""
+
+_ROLLUP = """
+INSERT INTO hashrate_rollups (resolution, bucket, low, high, total, count) VALUES (?, ?, ?, ?, ?, 1)
+ON CONFLICT(resolution, bucket) DO UPDATE SET
+    low = min(low, excluded.low),
+    high = max(high, excluded.high),
+    total = total + excluded.total,
+    count = count + 1
+"""
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Seconds since the epoch for an API timestamp (ISO string or epoch seconds/milliseconds)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value / 1000 if value > 1e11 else value)
+    try:
+        stamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize('UTC')
+    return int(stamp.timestamp())
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+def _point(ts: int, mean: float, low: float, high: float) -> Dict[str, Any]:
+    return {'timestamp': _iso(ts), 'hashrate': mean, 'min': low, 'max': high}
+
+def parse_history(records: List[Dict[str, Any]]) -> List[Tuple[int, float]]:
+    """(epoch, hashrate) pairs from /sigscore/history records, skipping unusable ones"""
+    points = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        ts = to_epoch(record.get('timestamp'))
+        if ts is not None:
+            points.append((ts, float(record.get('total_hashrate') or 0)))
+    return points
+
+def summarize_history(records: List[Dict[str, Any]], max_points: int = MAX_POINTS) -> Dict[str, Any]:
+    """
+    Build the total_hash_stats summary from a full history list in memory.
+
+    Used when no series store is available, so total_hash_stats has the same
+    shape either way.
+    """
+    points = sorted(dict(parse_history(records)).items())
+    if not points:
+        return {'latest': None, 'ranges': {key: [] for key in HASHRATE_RANGES}}
+    end = points[-1][0]
+    ranges = {}
+    for key, seconds in HASHRATE_RANGES.items():
+        window = [p for p in points if seconds is None or p[0] >= end - seconds]
+        if len(window) <= max_points:
+            ranges[key] = [_point(ts, value, value, value) for ts, value in window]
+            continue
+        for resolution in RESOLUTIONS:
+            buckets = defaultdict(list)
+            for ts, value in window:
+                buckets[ts - ts % resolution].append(value)
+            if len(buckets) <= max_points or resolution == RESOLUTIONS[-1]:
+                ranges[key] = [_point(bucket, sum(values) / len(values), min(values), max(values))
+                               for bucket, values in sorted(buckets.items())]
+                break
+    return {'latest': _point(end, points[-1][1], points[-1][1], points[-1][1]), 'ranges': ranges}
+
+class HashrateSeries:
+    def __init__(self, store: LocalStore, max_points: int = MAX_POINTS):
+        self.store = store
+        self.max_points = max_points
+        self.store.ensure_schema(_SCHEMA)
+
+    def watermark(self) -> Optional[int]:
+        """Timestamp of the newest stored point"""
+        return self.store.execute('SELECT max(ts) FROM hashrate_points').fetchone()[0]
+
+    def apply(self, records: List[Dict[str, Any]]) -> int:
+        """Append points newer than the watermark and fold them into the rollups; returns how many were added"""
+        watermark = self.watermark()
+        added = 0
+        with self.store.transaction() as conn:
+            for ts, value in parse_history(records):
+                if watermark is not None and ts <= watermark:
+                    continue
+                if conn.execute('INSERT OR IGNORE INTO hashrate_points (ts, hashrate) VALUES (?, ?)',
+                                (ts, value)).rowcount != 1:
+                    continue
+                added += 1
+                for resolution in RESOLUTIONS:
+                    conn.execute(_ROLLUP, (resolution, ts - ts % resolution, value, value, value))
+            self.store.set_meta('hashrate:synced_at', time.time(), conn)
+        return added
+
+    def query(self, start: int, end: int, max_points: int = None) -> List[Dict[str, Any]]:
+        """Points between start and end at the finest resolution that fits in max_points"""
+        max_points = max_points or self.max_points
+        raw = self.store.execute('SELECT count(*) FROM hashrate_points WHERE ts BETWEEN ? AND ?',
+                                 (start, end)).fetchone()[0]
+        if raw <= max_points:
+            return [_point(row['ts'], row['hashrate'], row['hashrate'], row['hashrate']) for row in self.store.execute(
+                'SELECT ts, hashrate FROM hashrate_points WHERE ts BETWEEN ? AND ? ORDER BY ts', (start, end)
+            )]
+        for resolution in RESOLUTIONS:
+            first = start - start % resolution
+            buckets = self.store.execute(
+                'SELECT count(*) FROM hashrate_rollups WHERE resolution = ? AND bucket BETWEEN ? AND ?',
+                (resolution, first, end)
+            ).fetchone()[0]
+            if buckets <= max_points or resolution == RESOLUTIONS[-1]:
+                return [_point(row['bucket'], row['total'] / row['count'], row['low'], row['high'])
+                        for row in self.store.execute(
+                            'SELECT bucket, low, high, total, count FROM hashrate_rollups '
+                            'WHERE resolution = ? AND bucket BETWEEN ? AND ? ORDER BY bucket',
+                            (resolution, first, end)
+                        )]
+        return []
+
+    async def refresh(self, fetch: Fetch) -> Optional[Dict[str, Any]]:
+        """Append new points and return the total_hash_stats summary; None if upstream failed"""
+        start = time.monotonic()
+        records = await fetch(ENDPOINT)
+        if not isinstance(records, list):
+            return None
+        added = await asyncio.to_thread(self.apply, records)
+        logger.info(f"Hashrate series appended {added} of {len(records)} points in {time.monotonic() - start:.2f}s")
+        return await asyncio.to_thread(self.summary)
+
+    def summary(self) -> Dict[str, Any]:
+        """The total_hash_stats cache value: the newest point and every chart range"""
+        row = self.store.execute(
+            'SELECT ts, hashrate FROM hashrate_points ORDER BY ts DESC LIMIT 1'
+        ).fetchone()
+        if row is None:
+            return {'latest': None, 'ranges': {key: [] for key in HASHRATE_RANGES}}
+        end = row['ts']
+        oldest = self.store.execute('SELECT min(ts) FROM hashrate_points').fetchone()[0]
+        return {
+            'latest': _point(end, row['hashrate'], row['hashrate'], row['hashrate']),
+            'ranges': {
+                key: self.query(oldest if seconds is None else end - seconds, end)
+                for key, seconds in HASHRATE_RANGES.items()
+            }
+        }
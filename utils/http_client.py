@@ -0,0 +1,226 @@
+# utils/http_client.py
+"""
+Shared HTTP clients for every upstream API (pool API, Ergo explorer, CoinGecko).
+
+HttpClient (requests) and AsyncHttpClient (aiohttp) follow the same policy:
+  - pooled keep-alive connections per host, so TCP/TLS setup is paid once
+  - a timeout on every request
+  - retries on connection errors, timeouts, 429 and 5xx with exponential
+    backoff and full jitter, honouring Retry-After
+  - the per-host circuit breaker (utils/circuit_breaker.py)
+  - per-host latency/retry metrics (utils/metrics.py)
+
+Synchronous callers share default_client(); async callers share the
+AsyncHttpClient owned by DataManager, which lives on its event loop.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+from .circuit_breaker import breaker_for
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 30          # seconds, per attempt
+RETRIES = 2                   # attempts after the first
+BACKOFF = 0.5                 # seconds, base of the exponential backoff
+MAX_BACKOFF = 8               # seconds, cap on one backoff sleep
+MAX_RETRY_AFTER = 10          # seconds; a longer Retry-After is not waited out
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+POOL_HOSTS = 16               # hosts with a connection pool kept open (sync client)
+POOL_SIZE = 32                # connections kept per host
+KEEPALIVE_TIMEOUT = 60        # seconds an idle connection is kept open (async client)
+
+class HttpError(Exception):
+    """An upstream request failed after all retries"""
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+def backoff_delay(attempt: int, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF) -> float:
+    """Exponential backoff with full jitter, so workers retrying together spread out"""
+    return random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP date), if any"""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _RetryPolicy:
+    """Retry decisions shared by the sync and async clients"""
+    def __init__(self, retries: int, backoff: float, max_backoff: float):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, status: Optional[int] = None, headers=None) -> Optional[float]:
+        """Seconds to sleep before the next attempt, or None to give up"""
+        if attempt >= self.retries:
+            return None
+        if status == 429 or status == 503:
+            wait = retry_after(headers)
+            if wait is not None:
+                return wait if wait <= MAX_RETRY_AFTER else None
+        return backoff_delay(attempt, self.backoff, self.max_backoff)
+
+def _record_status(breaker, status: int):
+    # 5xx means the host is unhealthy; anything else (even 4xx) means it answered
+    if status >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+class HttpClient:
+    """Thread-safe pooled HTTP client for synchronous callers"""
+
+    def __init__(self, name: str = 'http', timeout: float = REQUEST_TIMEOUT, retries: int = RETRIES,
+                 backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF):
+        self.name = name
+        self.timeout = timeout
+        self.policy = _RetryPolicy(retries, backoff, max_backoff)
+        self.session = requests.Session()
+        # urllib3 keeps one pool per host; retries are ours, so the adapter does none
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = None,
+            headers: Optional[Dict] = None) -> requests.Response:
+        """
+        GET url with retries. Returns the last response (which may be an
+        error status); raises CircuitOpenError if the host's breaker is open
+        and the underlying requests exception if no response was received.
+        """
+        breaker = breaker_for(url)
+        breaker.check()
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout, headers=headers)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                breaker.record_failure()
+                delay = self.policy.delay(attempt)
+                if delay is None or not breaker.allow():
+                    metrics.record_upstream(self.name, url, time.perf_counter() - start, False, attempt)
+                    raise
+            else:
+                _record_status(breaker, response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    metrics.record_upstream(self.name, url, time.perf_counter() - start, response.ok, attempt)
+                    return response
+                delay = self.policy.delay(attempt, response.status_code, response.headers)
+                if delay is None or not breaker.allow():
+                    metrics.record_upstream(self.name, url, time.perf_counter() - start, False, attempt)
+                    return response
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+            attempt += 1
+
+    def get_json(self, url: str, params: Optional[Dict] = None, timeout: float = None) -> Any:
+        """GET url and decode its JSON body; raises HttpError on an error status"""
+        response = self.get(url, params=params, timeout=timeout)
+        if response.status_code != 200:
+            raise HttpError(f"{url}: HTTP {response.status_code}", response.status_code)
+        return response.json()
+
+    def close(self):
+        self.session.close()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def default_client() -> HttpClient:
+    """The process-wide HttpClient shared by synchronous callers"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient('http')
+        return _default_client
+
+class AsyncHttpClient:
+    """Pooled aiohttp client; create and use it on a single event loop"""
+
+    def __init__(self, name: str = 'http', timeout: float = REQUEST_TIMEOUT, retries: int = RETRIES,
+                 backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 limit: int = 100, limit_per_host: int = 50):
+        self.name = name
+        self.timeout = timeout
+        self.policy = _RetryPolicy(retries, backoff, max_backoff)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            logger.info(f"Created pooled aiohttp session for {self.name}")
+        return self._session
+
+    async def get_json(self, url: str, params: Optional[Dict] = None, timeout: float = None) -> Any:
+        """
+        GET url with retries and decode its JSON body.
+
+        Raises CircuitOpenError if the host's breaker is open and HttpError
+        if no successful response was received.
+        """
+        breaker = breaker_for(url)
+        breaker.check()
+        session = await self.session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            status = None
+            try:
+                async with session.get(url, params=params, timeout=client_timeout) as response:
+                    status = response.status
+                    _record_status(breaker, status)
+                    if status == 200:
+                        data = await response.json(content_type=None)
+                        metrics.record_upstream(self.name, url, time.perf_counter() - start, True, attempt)
+                        return data
+                    error = f"HTTP {status}"
+                    delay = self.policy.delay(attempt, status, response.headers) if status in RETRY_STATUSES else None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                error = str(e) or type(e).__name__
+                delay = self.policy.delay(attempt)
+            if delay is None or not breaker.allow():
+                metrics.record_upstream(self.name, url, time.perf_counter() - start, False, attempt)
+                raise HttpError(f"{url}: {error}", status)
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,100 @@
+# utils/ingest.py
+"""
+Background ingestion service.
+
+Refreshes every pool API endpoint on its own schedule and writes versioned
+snapshots to Redis through DataManager. Web workers run DataManager in
+read-only mode (DATA_MANAGER_MODE=snapshot) and only read those snapshots,
+so the number of open browser tabs no longer affects upstream traffic.
+
+Run with: python -m utils.ingest
+"""
+import logging
+import os
+import time
+from typing import Dict
+from .data_manager import DataManager, ENDPOINTS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Cache name -> seconds between refreshes. Block and payment data are also
+# refreshed as soon as a new block or payment is seen (utils/invalidation.py).
+INGEST_INTERVALS = {
+    'pool_stats': 60,
+    'shares': 60,
+    'block_stats': 1800,
+    'live_miner_data': 120,
+    'payment_stats': 3600,
+    'total_hash_stats': 300,
+    'demurrage_stats': 600
+}
+TICK_SECONDS = 5
+FAILURE_RETRY_SECONDS = 30
+
+class Ingestor:
+    def __init__(self, data_manager: DataManager, intervals: Dict[str, int] = None):
+        self.data_manager = data_manager
+        self.intervals = intervals or INGEST_INTERVALS
+        unknown = set(self.intervals) - set(ENDPOINTS)
+        if unknown:
+            raise ValueError(f"No endpoint configured for {sorted(unknown)}")
+        # Everything is due on the first pass
+        self._next_due = {cache_key: 0.0 for cache_key in self.intervals}
+
+    def due(self, now: float = None) -> list:
+        """Return the caches whose refresh interval has elapsed"""
+        now = time.monotonic() if now is None else now
+        return [key for key, due_at in self._next_due.items() if due_at <= now]
+
+    def run_once(self) -> Dict[str, bool]:
+        """Refresh every due cache concurrently and schedule the next run of each"""
+        # Caches whose block or payment signal changed are refreshed right away
+        self.data_manager.check_signals()
+
+        now = time.monotonic()
+        due = self.due(now)
+        if not due:
+            return {}
+
+        start = time.monotonic()
+        report = self.data_manager.refresh(due)
+        for cache_key in due:
+            # Retry failures sooner than a full interval; caches leased by
+            # another ingester are not in the report and keep their schedule
+            if report.get(cache_key, True):
+                self._next_due[cache_key] = now + self.intervals[cache_key]
+            else:
+                self._next_due[cache_key] = now + min(FAILURE_RETRY_SECONDS, self.intervals[cache_key])
+
+        failed = [key for key, ok in report.items() if not ok]
+        logger.info(
+            f"Ingested {len(report) - len(failed)}/{len(due)} endpoints in "
+            f"{time.monotonic() - start:.2f}s" + (f" - failed: {failed}" if failed else "")
+        )
+        return report
+
+    def run_forever(self):
+        logger.info(f"Starting ingestion loop with intervals {self.intervals}")
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error in ingestion loop: {e}", exc_info=True)
+            time.sleep(TICK_SECONDS)
+
+def main():
+    """Run the ingestion service"""
+    if not os.getenv('REDIS_URL'):
+        logger.warning("REDIS_URL is not set; snapshots will only live in this process")
+    data_manager = DataManager('conf', stale_while_revalidate=False, local_store=True)
+    try:
+        Ingestor(data_manager).run_forever()
+    finally:
+        data_manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# utils/invalidation.py
+"""
+Signal-driven cache invalidation for DataManager.
+
+Pool data mostly changes at a few moments: when the pool finds a block and
+when a payment run goes out. Instead of refetching everything on short TTLs,
+the engine polls cheap signals (the newest pool block, the newest payment)
+and refreshes only the caches that depend on a signal when it changes.
+Caches covered by a signal get long TTLs (EXTENDED_TTLS) that only act as a
+safety net.
+
+A signal is only cheap if upstream honours its limit parameter. One whose
+response holds more rows than the limit is disabled, and its caches go back
+to their normal TTLs, so a check never turns into a full list download.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_INTERVAL = 60  # seconds between signal checks
+
+def _newest(field_name: str) -> Callable[[Any], Any]:
+    """Extract the newest value of field_name from a list response"""
+    def extract(data):
+        if not isinstance(data, list) or not data:
+            return None
+        values = [item.get(field_name) for item in data if isinstance(item, dict) and item.get(field_name) is not None]
+        return max(values) if values else None
+    return extract
+
+@dataclass(frozen=True)
+class Signal:
+    name: str
+    endpoint: str
+    params: Optional[Dict[str, Any]]
+    extract: Callable[[Any], Any]
+    dependents: List[str] = field(default_factory=list)
+
+DEFAULT_SIGNALS = [
+    # A new pool block changes the block list, pool effort and miners' last block
+    Signal('latest_pool_block', '/miningcore/blocks', {'limit': 1}, _newest('blockheight'),
+           ['block_stats', 'pool_stats', 'live_miner_data']),
+    # A payment run changes the total paid
+    Signal('latest_payment', '/miningcore/payments', {'limit': 1}, _newest('created'),
+           ['payment_stats'])
+]
+
+# Cache name -> (soft TTL, hard TTL) used when signals keep the cache fresh
+EXTENDED_TTLS = {
+    'block_stats': (3600, 21600),
+    'payment_stats': (21600, 86400)
+}
+
+class InvalidationEngine:
+    def __init__(self, data_manager, signals: List[Signal] = None, interval: float = SIGNAL_INTERVAL):
+        self.data_manager = data_manager
+        self.signals = signals if signals is not None else DEFAULT_SIGNALS
+        self.interval = interval
+        self._values = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        # Signals whose endpoint ignored the limit parameter
+        self.disabled = set()
+
+    @staticmethod
+    def _over_limit(signal: Signal, data: Any) -> bool:
+        limit = (signal.params or {}).get('limit')
+        return limit is not None and isinstance(data, list) and len(data) > limit
+
+    def _disable(self, signal: Signal, rows: int):
+        self.disabled.add(signal.name)
+        logger.warning(f"Signal {signal.name} returned {rows} rows for limit {signal.params['limit']}; "
+                       f"disabling it and restoring normal TTLs for {signal.dependents}")
+        self.data_manager.restore_ttls(signal.dependents)
+
+    def _load(self, name: str) -> Any:
+        redis_client = self.data_manager.redis
+        if redis_client:
+            try:
+                value = redis_client.get(f"signal:{name}")
+                if value is not None:
+                    return self.data_manager.codec.decode(value)
+            except Exception as e:
+                logger.error(f"Redis error reading signal {name}: {e}")
+        return self._values.get(name)
+
+    def _store(self, name: str, value: Any):
+        self._values[name] = value
+        redis_client = self.data_manager.redis
+        if redis_client:
+            try:
+                redis_client.set(f"signal:{name}", self.data_manager.codec.encode(value))
+            except Exception as e:
+                logger.error(f"Redis error storing signal {name}: {e}")
+
+    def check(self) -> List[str]:
+        """
+        Read every signal and return the caches whose signal changed.
+
+        The first observation of a signal only records it. Signal values live
+        in Redis so all workers agree on what has already been seen.
+        """
+        affected = set()
+        for signal in self.signals:
+            if signal.name in self.disabled:
+                continue
+            try:
+                data = self.data_manager.fetch(signal.endpoint, signal.params)
+                if self._over_limit(signal, data):
+                    self._disable(signal, len(data))
+                    continue
+                value = signal.extract(data)
+            except Exception as e:
+                logger.error(f"Error reading signal {signal.name}: {e}")
+                continue
+            if value is None:
+                continue
+            previous = self._load(signal.name)
+            if previous != value:
+                self._store(signal.name, value)
+                if previous is not None:
+                    logger.info(f"Signal {signal.name} changed {previous} -> {value}, refreshing {signal.dependents}")
+                    affected.update(signal.dependents)
+        return sorted(affected)
+
+    def run(self, force: bool = False) -> Dict[str, bool]:
+        """Check signals (at most once per interval unless forced) and refresh affected caches"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < self.interval:
+                return {}
+            self._last_check = now
+        affected = self.check()
+        if not affected:
+            return {}
+        return self.data_manager.refresh(affected)
+
+    def due(self) -> bool:
+        return time.monotonic() - self._last_check >= self.interval
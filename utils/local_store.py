@@ -0,0 +1,116 @@
+# utils/local_store.py
+"""
+Local SQLite store for pool history that only ever grows (payments, blocks,
+hashrate history, explorer transactions).
+
+Instead of re-downloading a full history on every refresh, the incremental
+stores built on this keep what they have already seen on disk and fetch only
+what is newer. The database runs in WAL mode so readers never block the
+single writer, and every process and thread gets its own connection.
+
+The file lives at LOCAL_STORE_PATH (default data/local_store.sqlite3); the
+ingest service keeps it on a volume so history survives restarts. Losing it
+only costs one full download.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = 'data/local_store.sqlite3'
+BUSY_TIMEOUT = 30             # seconds a writer waits for another writer's lock
+
+# DataManager._fetch_endpoint: (endpoint, params=None) -> data, or None on failure
+Fetch = Callable[..., Awaitable[Any]]
+
+_META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+class LocalStore:
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('LOCAL_STORE_PATH', DEFAULT_PATH)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self.ensure_schema(_META_SCHEMA)
+        logger.info(f"Opened local store at {self.path}")
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (a forked child opens its own)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # Autocommit; transaction() opens explicit write transactions
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block as one write transaction, taking the write lock up front"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, params)
+
+    def ensure_schema(self, schema: str):
+        self.connection().executescript(schema)
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_meta(self, key: str, value: Any, conn: sqlite3.Connection = None):
+        """Store a small JSON value, inside conn's transaction if given"""
+        (conn or self.connection()).execute(
+            'INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            (key, json.dumps(value))
+        )
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+async def fetch_newest(fetch: Fetch, endpoint: str, page_size: int, max_pages: int,
+                       reached: Callable[[List[Dict[str, Any]]], bool]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Page through a newest-first list endpoint until reached(page) says the
+    rest is already stored (or a short page ends the list).
+
+    Falls back to one full download if that takes more than max_pages.
+    reached runs in a worker thread, since it usually queries the store.
+    Returns None if any request failed, so callers never apply a partial sync.
+    """
+    rows = []
+    for page_number in range(max_pages):
+        page = await fetch(endpoint, {'limit': page_size, 'offset': page_number * page_size})
+        if not isinstance(page, list):
+            return None
+        rows.extend(page)
+        if len(page) < page_size or await asyncio.to_thread(reached, page):
+            return rows
+    logger.info(f"More than {max_pages} pages of new rows from {endpoint}, downloading the full list")
+    data = await fetch(endpoint)
+    return data if isinstance(data, list) else None
@@ -0,0 +1,153 @@
+# utils/metrics.py
+"""
+Prometheus metrics for caches, upstream requests and Dash callbacks.
+
+Under gunicorn every worker is a separate process, so metrics are written to
+per-process files in PROMETHEUS_MULTIPROC_DIR and merged when /metrics is
+scraped. The directory must be set (and emptied) before the workers start;
+entrypoint.sh does this and gunicorn.conf.py cleans up after exited workers.
+prometheus_client is optional; without it every helper here is a no-op.
+"""
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+    )
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+ENABLED = Counter is not None
+
+# Upstream calls take from a few milliseconds to the 30s request timeout
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+CALLBACK_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Miner addresses in URL paths are collapsed so each endpoint is one series
+_ADDRESS_SEGMENT = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{30,}$')
+
+if ENABLED:
+    CACHE_REQUESTS = Counter(
+        'cache_requests', 'Cache lookups by result (hit, miss or stale)',
+        ['layer', 'cache', 'result']
+    )
+    CACHE_ENTRIES = Gauge(
+        'cache_entries', 'Entries held in a cache, summed over live workers',
+        ['layer', 'cache'], multiprocess_mode='livesum'
+    )
+    CACHE_BYTES = Gauge(
+        'cache_bytes', 'Approximate serialized size of a cache, summed over live workers',
+        ['layer', 'cache'], multiprocess_mode='livesum'
+    )
+    UPSTREAM_LATENCY = Histogram(
+        'upstream_request_seconds', 'Upstream request latency, including retries',
+        ['client', 'host', 'endpoint', 'outcome'], buckets=LATENCY_BUCKETS
+    )
+    UPSTREAM_RETRIES = Counter(
+        'upstream_retries', 'Upstream request retries',
+        ['client', 'host', 'endpoint']
+    )
+    CIRCUIT_STATE = Gauge(
+        'circuit_breaker_state', 'Upstream circuit breaker state (0 closed, 1 half-open, 2 open), worst worker',
+        ['host'], multiprocess_mode='livemax'
+    )
+    CIRCUIT_REJECTIONS = Counter(
+        'circuit_breaker_rejections', 'Upstream calls failed fast by an open circuit breaker',
+        ['host']
+    )
+    CALLBACK_LATENCY = Histogram(
+        'dash_callback_seconds', 'Dash callback latency as seen by the server',
+        ['callback', 'status'], buckets=CALLBACK_BUCKETS
+    )
+
+def endpoint_label(path: str) -> str:
+    """Reduce a URL or path to a low-cardinality endpoint label"""
+    path = path.split('?', 1)[0]
+    if '://' in path:
+        path = '/' + path.split('://', 1)[1].split('/', 1)[-1]
+    return '/'.join('{address}' if _ADDRESS_SEGMENT.match(part) else part for part in path.split('/'))
+
+def approx_bytes(obj: Any) -> int:
+    """Approximate size of a cached value as compact JSON"""
+    try:
+        return len(json.dumps(obj, separators=(',', ':'), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+def record_cache(layer: str, cache: str, result: str):
+    if ENABLED:
+        CACHE_REQUESTS.labels(layer, cache, result).inc()
+
+def record_cache_size(layer: str, cache: str, entries: int, size: Optional[int] = None):
+    if ENABLED:
+        CACHE_ENTRIES.labels(layer, cache).set(entries)
+        if size is not None:
+            CACHE_BYTES.labels(layer, cache).set(size)
+
+def host_label(url: str) -> str:
+    """Host of a URL, or '' for a bare path"""
+    return urlparse(url).netloc if '://' in url else ''
+
+def record_upstream(client: str, url: str, seconds: float, ok: bool, retries: int = 0):
+    if ENABLED:
+        host, label = host_label(url), endpoint_label(url)
+        UPSTREAM_LATENCY.labels(client, host, label, 'ok' if ok else 'error').observe(seconds)
+        if retries:
+            UPSTREAM_RETRIES.labels(client, host, label).inc(retries)
+
+_CIRCUIT_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+def record_circuit_state(host: str, state: str):
+    if ENABLED:
+        CIRCUIT_STATE.labels(host).set(_CIRCUIT_STATES.get(state, 0))
+
+def record_circuit_rejection(host: str):
+    if ENABLED:
+        CIRCUIT_REJECTIONS.labels(host).inc()
+
+def record_callback(callback: str, seconds: float, status: int):
+    if ENABLED:
+        CALLBACK_LATENCY.labels(callback, str(status)).observe(seconds)
+
+def render() -> Tuple[bytes, str]:
+    """Return the exposition body and content type for /metrics"""
+    if not ENABLED:
+        return b'# prometheus_client is not installed\n', CONTENT_TYPE_LATEST
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def instrument_dash(server):
+    """Time every Dash callback request on the Flask server, labelled by its output id"""
+    from flask import g, request
+
+    @server.before_request
+    def _start_callback_timer():
+        if request.path.endswith('_dash-update-component'):
+            g.callback_started = time.perf_counter()
+
+    @server.after_request
+    def _observe_callback(response):
+        started = g.pop('callback_started', None)
+        if started is not None:
+            body = request.get_json(silent=True) or {}
+            record_callback(str(body.get('output', 'unknown')), time.perf_counter() - started, response.status_code)
+        return response
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of an exited worker (called from gunicorn's child_exit)"""
+    if ENABLED and os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,288 @@
+# utils/miner_cache.py
+"""
+Per-address cache for miner page data.
+
+Entries are keyed by data type, miner address and request parameters, expire
+after a TTL chosen per data type and are evicted least-recently-used once the
+cache holds more than max_entries or max_bytes. Values are also written to
+Redis (through the DataManager codec) so every gunicorn worker shares them,
+and a short Redis lease lets one worker fetch while the others wait for its
+result instead of hitting the upstream API as well.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Data type -> seconds an entry stays fresh
+MINER_CACHE_TTLS = {
+    'stats': 60,
+    'share_stats': 300,
+    'workers': 300,
+    'blocks': 300,
+    'payments': 600,
+    'bonus': 3600
+}
+DEFAULT_MINER_TTL = 300
+MAX_ENTRIES = 5000
+MAX_BYTES = 64 * 1024 * 1024  # approximate, measured as compact JSON
+STALE_TTL = 3600              # seconds an expired entry is kept to serve while upstream is down
+
+FETCH_LEASE_TTL = 30          # seconds; longer than one upstream request
+FETCH_WAIT = 5                # seconds a worker waits for another worker's fetch
+FETCH_POLL_INTERVAL = 0.1     # seconds
+
+# Delete the lease only if it still holds our token
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class MinerCache:
+    def __init__(self, redis_client=None, codec=None, ttls: Dict[str, int] = None,
+                 max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.redis = redis_client if codec is not None else None
+        self.codec = codec
+        self.ttls = ttls or MINER_CACHE_TTLS
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires_at, size, value), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, address: str, params: Optional[Dict] = None) -> str:
+        suffix = ','.join(f'{k}={params[k]}' for k in sorted(params)) if params else ''
+        return f'miner:{kind}:{address}:{suffix}'
+
+    def _ttl(self, kind: str) -> int:
+        return self.ttls.get(kind, DEFAULT_MINER_TTL)
+
+    def _get_local(self, key: str, allow_stale: bool = False) -> Any:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, size, value = item
+            now = time.time()
+            if expires_at + STALE_TTL <= now:
+                self._remove(key)
+                return None
+            if expires_at <= now and not allow_stale:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any, expires_at: float):
+        size = metrics.approx_bytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+            metrics.record_cache_size('miner_cache', 'all', len(self._entries), self._bytes)
+
+    def _remove(self, key: str):
+        """Drop key from the local cache; caller holds the lock"""
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def _get_shared(self, key: str, allow_stale: bool = False) -> Any:
+        if not self.redis:
+            return None
+        try:
+            data = self.redis.get(key)
+            if data is None:
+                return None
+            entry = self.codec.decode(data)
+            if not isinstance(entry, dict) or 'expires_at' not in entry:
+                return None
+            if entry['expires_at'] <= time.time() and not allow_stale:
+                return None
+            self._set_local(key, entry['data'], entry['expires_at'])
+            return entry['data']
+        except Exception as e:
+            logger.error(f"Redis error reading {key}: {e}")
+            return None
+
+    def _set_shared(self, key: str, value: Any, expires_at: float, ttl: int):
+        if not self.redis:
+            return
+        try:
+            self.redis.setex(key, ttl + STALE_TTL, self.codec.encode({'expires_at': expires_at, 'data': value}))
+        except Exception as e:
+            logger.error(f"Redis error storing {key}: {e}")
+
+    def get(self, kind: str, address: str, params: Optional[Dict] = None) -> Any:
+        """Return a cached value, checking this process first and then Redis"""
+        key = self.make_key(kind, address, params)
+        value = self._get_local(key)
+        if value is None:
+            value = self._get_shared(key)
+        return value
+
+    def get_stale(self, kind: str, address: str, params: Optional[Dict] = None) -> Any:
+        """Return the cached value even if it has expired (kept for up to STALE_TTL)"""
+        key = self.make_key(kind, address, params)
+        value = self._get_local(key, allow_stale=True)
+        if value is None:
+            value = self._get_shared(key, allow_stale=True)
+        if value is not None:
+            metrics.record_cache('miner_cache', kind, 'stale')
+        return value
+
+    def set(self, kind: str, address: str, value: Any, params: Optional[Dict] = None):
+        key = self.make_key(kind, address, params)
+        ttl = self._ttl(kind)
+        expires_at = time.time() + ttl
+        self._set_local(key, value, expires_at)
+        self._set_shared(key, value, expires_at, ttl)
+
+    def _acquire_fetch_lease(self, key: str) -> Optional[str]:
+        """Return a token if this worker should fetch key, or None if another worker already is"""
+        token = uuid.uuid4().hex
+        if not self.redis:
+            return token
+        try:
+            if self.redis.set(f'lease:{key}', token, nx=True, ex=FETCH_LEASE_TTL):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Redis error acquiring lease for {key}: {e}")
+            return token
+
+    def _release_fetch_lease(self, key: str, token: str):
+        if not self.redis:
+            return
+        try:
+            self.redis.eval(_RELEASE_LEASE_SCRIPT, 1, f'lease:{key}', token)
+        except Exception as e:
+            logger.error(f"Redis error releasing lease for {key}: {e}")
+
+    def _lease_held(self, key: str) -> bool:
+        try:
+            return self.redis.get(f'lease:{key}') is not None
+        except Exception as e:
+            logger.error(f"Redis error reading lease for {key}: {e}")
+            return False
+
+    def _wait_for_fetch(self, key: str) -> Any:
+        """Wait for another worker's fetch of key; None once its lease is gone without a value"""
+        deadline = time.monotonic() + FETCH_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(FETCH_POLL_INTERVAL)
+            value = self._get_shared(key)
+            if value is not None:
+                return value
+            if not self._lease_held(key):
+                # The fetch finished or failed; its value may have landed just before the release
+                return self._get_shared(key)
+        return None
+
+    def get_or_fetch(self, kind: str, address: str, fetch: Callable[[], Any],
+                     params: Optional[Dict] = None) -> Any:
+        """
+        Return the cached value for (kind, address, params), fetching it on a miss.
+
+        None means the upstream call failed; it is not cached, so the fetch
+        is retried on the next request. Empty results ({} or []) are cached
+        like any other value.
+        """
+        value = self.get(kind, address, params)
+        if value is not None:
+            metrics.record_cache('miner_cache', kind, 'hit')
+            return value
+        metrics.record_cache('miner_cache', kind, 'miss')
+
+        key = self.make_key(kind, address, params)
+        token = self._acquire_fetch_lease(key)
+        if token is None:
+            value = self._wait_for_fetch(key)
+            if value is not None:
+                return value
+            logger.debug(f"Fetch of {key} by another worker did not land, fetching directly")
+        try:
+            value = fetch()
+        except Exception as e:
+            logger.error(f"Fetch of {key} failed: {e}")
+            value = None
+        finally:
+            if token is not None:
+                self._release_fetch_lease(key, token)
+        if value is not None:
+            self.set(kind, address, value, params)
+            return value
+        # Upstream failed or its breaker is open; serve the last value we had
+        return self.get_stale(kind, address, params)
+
+    def get_or_fetch_many(self, address: str, requests: List[Tuple[str, Optional[Dict]]],
+                          fetch_batch: Callable[[List[int]], List[Any]]) -> List[Any]:
+        """
+        get_or_fetch for several (kind, params) requests of one address.
+
+        fetch_batch(indexes) fetches the given requests together and returns
+        their values in order (None for failures). Misses whose lease another
+        worker holds are waited for, and fetched here only if that worker's
+        value does not land.
+        """
+        values, owned, waiting = [], {}, []
+        for index, (kind, params) in enumerate(requests):
+            value = self.get(kind, address, params)
+            metrics.record_cache('miner_cache', kind, 'miss' if value is None else 'hit')
+            values.append(value)
+            if value is None:
+                token = self._acquire_fetch_lease(self.make_key(kind, address, params))
+                if token is None:
+                    waiting.append(index)
+                else:
+                    owned[index] = token
+
+        def fetch(indexes):
+            try:
+                fetched = fetch_batch(indexes)
+            except Exception as e:
+                logger.error(f"Batch fetch for {address} failed: {e}")
+                fetched = [None] * len(indexes)
+            finally:
+                for index in indexes:
+                    if index in owned:
+                        kind, params = requests[index]
+                        self._release_fetch_lease(self.make_key(kind, address, params), owned[index])
+            for index, value in zip(indexes, fetched):
+                kind, params = requests[index]
+                if value is not None:
+                    self.set(kind, address, value, params)
+                    values[index] = value
+                else:
+                    # Upstream failed or its breaker is open; serve the last value we had
+                    values[index] = self.get_stale(kind, address, params)
+
+        if owned:
+            fetch(list(owned))
+        missed = []
+        for index in waiting:
+            kind, params = requests[index]
+            values[index] = self._wait_for_fetch(self.make_key(kind, address, params))
+            if values[index] is None:
+                missed.append(index)
+        if missed:
+            logger.debug(f"Fetches of {len(missed)} entries for {address} by another worker did not land")
+            fetch(missed)
+        return values
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes}
@@ -0,0 +1,104 @@
+# utils/miner_settings.py
+"""
+In-memory copy of miningcore's miner_settings payout thresholds.
+
+PaymentThresholdUpdater already writes each miner's effective
+paymentthreshold into miner_settings, so the miner page can read it there
+instead of walking the explorer for the NFT. MinerSettings loads every row
+for the pool in one query on the (poolid, address) primary key and reloads
+it from a background thread; lookups are a dict read with no I/O. Addresses
+missing from the table fall back to the NFT lookup
+(utils/payout_thresholds.py).
+
+The reader is only started when POSTGRES_HOST is set, so deployments
+without database access keep the NFT lookup alone.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+POOL_ID = 'ErgoSigmanauts'
+REFRESH_INTERVAL = 300        # seconds between reloads of the table
+CONNECT_TIMEOUT = 10          # seconds
+
+_QUERY = """
+SELECT address, paymentthreshold
+FROM miner_settings
+WHERE poolid = %s
+"""
+
+def postgres_params() -> Dict[str, str]:
+    """Connection parameters for miningcore's database from the environment"""
+    return {
+        'dbname': os.getenv('POSTGRES_DB', 'miningcore'),
+        'user': os.getenv('POSTGRES_USER', 'postgres'),
+        'password': os.getenv('POSTGRES_PASSWORD', 'password'),
+        'host': os.getenv('POSTGRES_HOST', 'localhost'),
+        'port': os.getenv('POSTGRES_PORT', '5432')
+    }
+
+class MinerSettings:
+    def __init__(self, db_params: Optional[Dict[str, str]] = None, pool_id: str = POOL_ID,
+                 refresh_interval: float = REFRESH_INTERVAL):
+        self.db_params = db_params or postgres_params()
+        self.pool_id = pool_id
+        self.refresh_interval = refresh_interval
+        # address -> paymentthreshold; replaced whole on each load
+        self._thresholds: Dict[str, float] = {}
+        self.loaded_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> Optional['MinerSettings']:
+        """A started reader if the database is configured, else None"""
+        if not os.getenv('POSTGRES_HOST'):
+            return None
+        settings = cls()
+        settings.start()
+        return settings
+
+    def load(self) -> bool:
+        """Reload the pool's thresholds in one query; keeps the previous copy on failure"""
+        start = time.monotonic()
+        try:
+            conn = psycopg2.connect(connect_timeout=CONNECT_TIMEOUT, **self.db_params)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(_QUERY, (self.pool_id,))
+                    rows = cur.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Failed to load miner settings: {e}")
+            return False
+        self._thresholds = {address: float(threshold) for address, threshold in rows if threshold is not None}
+        self.loaded_at = time.time()
+        logger.info(f"Loaded {len(self._thresholds)} miner settings in {time.monotonic() - start:.2f}s")
+        return True
+
+    def threshold(self, address: str) -> Optional[float]:
+        """The address's payment threshold, or None if it has no row"""
+        return self._thresholds.get(address)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.load()
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Load in a daemon thread now and every refresh_interval seconds"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='miner-settings', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -15,9 +15,10 @@ from .calculate import (
     calculate_mining_effort
 )
 from .find_miner_id import ReadTokens
+from .payout_thresholds import PayoutThresholdResolver
+from .miner_settings import MinerSettings
 from utils.components import create_metric_section, create_stat_section
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -78,67 +79,30 @@ def create_image_text_block(text, image, style=None):
         ]
     )
 
-def get_minimum_payout(miner_address):
-    """Get minimum payout from Sigma Bytes NFT or return default value"""
-    try:
-        # Collection ID from Create.tsx
-        COLLECTION_ID = "10ba19fae939a8c185eddb239d85f4dc8a77564cb6167578d8019f24696446fc"
-        
-        find_tokens = ReadTokens()
-        # Look for Sigma Bytes NFT with name 'Sigma BYTES'
-        wallet_json = json.dumps({"addresses": [miner_address]})
-        tokens = find_tokens.find_token_name_in_wallet(wallet_json, 'Sigma BYTES')
-        
-        if tokens:
-            # Get the most recent token's description
-            for token in tokens:
-                token_id = token['tokenId']
-                token_info = find_tokens.get_token_description(token_id)
-                
-                if not token_info:
-                    logger.warning(f"Could not get token info for {token_id}")
-                    continue
-                    
-                try:
-                    # token_info is already a dictionary, no need to parse it
-                    logger.info(f"Token description: {token_info}")
-                    
-                    # Verify collection ID
-                    if token_info.get('collection_id') != COLLECTION_ID:
-                        logger.warning(f"Token {token_id} has wrong collection ID: {token_info.get('collection_id')}")
-                        continue
-                        
-                    # Verify token type
-                    token_type = token_info.get('type')
-                    if token_type != 'Pool Config':
-                        logger.warning(f"Token {token_id} has wrong type: {token_type}")
-                        continue
-                        
-                    # Verify address ownership
-                    token_address = token_info.get('address')
-                    if token_address != miner_address:
-                        logger.warning(f"Token {token_id} was minted for different address: {token_address}")
-                        continue
-                        
-                    # If we get here, all validations passed
-                    if 'minimumPayout' in token_info:
-                        min_payout = float(token_info['minimumPayout'])
-                        logger.info(f"Found valid Sigma Bytes NFT with minimum payout: {min_payout} ERG")
-                        return min_payout
-                    else:
-                        logger.warning(f"Token {token_id} has no minimumPayout field")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing token {token_id}: {e}")
-                    continue
-        
-        logger.info(f"No valid Sigma Bytes NFT found for address {miner_address}, using default minimum payout")
-        return 0.5  # Default minimum payout
-    except Exception as e:
-        logger.error(f"Error getting minimum payout: {e}")
-        return 0.5  # Return default value on error
+def get_minimum_payout(miner_address, resolver=None, settings=None):
+    """
+    Get minimum payout from miner_settings, else the Sigma Bytes NFT, else the default value
+
+    Pass the shared MinerSettings and PayoutThresholdResolver to use their
+    caches; without them the wallet is looked up afresh.
+    """
+    if settings is not None:
+        threshold = settings.threshold(miner_address)
+        if threshold is not None:
+            return threshold
+    if resolver is None:
+        resolver = PayoutThresholdResolver(ReadTokens())
+    return resolver.minimum_payout(miner_address)
 
 def register_callbacks(app, sharkapi, priceapi, styles):
+    # Shared by every miner page; thresholds and token descriptions are cached in Redis
+    data_manager = getattr(sharkapi, 'data_manager', None)
+    payout_resolver = PayoutThresholdResolver(
+        ReadTokens(), getattr(data_manager, 'redis', None), getattr(data_manager, 'codec', None)
+    )
+    # Thresholds the payment updater wrote to miningcore, reloaded in the background (None without a database)
+    miner_settings = MinerSettings.from_env()
+
     @app.callback(
         [Output('metrics-section', 'children')],
         [Input('mp-metrics-interval', 'n_intervals')],
@@ -147,15 +111,15 @@ def register_callbacks(app, sharkapi, priceapi, styles):
     def update_metrics(n, pathname):
         try:
             miner = unquote(pathname.lstrip('/'))
-            miner_data = sharkapi.get_miner_stats(miner)
-            pool_data = sharkapi.get_pool_stats()
-            shares_data = sharkapi.get_shares()
+            bundle = sharkapi.get_miner_bundle(miner)
+            miner_data = bundle.stats
+            pool_data = bundle.pool
             
             if not miner_data:
                 return [[]]  # Return empty if no data
             
             # Get worker stats for hashrate
-            worker_stats = sharkapi.sync_get_miner_workers(miner)
+            worker_stats = bundle.workers
             total_hashrate = 0
             if worker_stats:
                 for worker_data in worker_stats.values():
@@ -167,7 +131,7 @@ def register_callbacks(app, sharkapi, priceapi, styles):
             network_difficulty = pool_data.get('networkdifficulty', 0)
             
             # Get miner's last block timestamp
-            blocks = sharkapi.sync_get_my_blocks(miner)
+            blocks = bundle.blocks
             if blocks:
                 last_block_timestamp = blocks[0]['created']  # Most recent block's timestamp
                 logger.info(f"Using last block timestamp: {last_block_timestamp}")
@@ -251,15 +215,15 @@ def register_callbacks(app, sharkapi, priceapi, styles):
     def update_stats(n, pathname):
         try:
             miner = unquote(pathname.lstrip('/'))
-            miner_data = sharkapi.get_miner_stats(miner)
-            pool_data = sharkapi.get_pool_stats()
-            shares_data = sharkapi.get_shares()
+            bundle = sharkapi.get_miner_bundle(miner)
+            miner_data = bundle.stats
+            pool_data = bundle.pool
             
             if not miner_data:
                 return [[]]
 
             # Get minimum payout from Sigma Bytes NFT or default
-            min_payout = get_minimum_payout(miner)
+            min_payout = get_minimum_payout(miner, payout_resolver, miner_settings)
 
             # Payment Stats
             payment_stats = [
@@ -308,10 +272,11 @@ def register_callbacks(app, sharkapi, priceapi, styles):
     def update_chart(n, chart_type, pathname):
         try:
             miner = unquote(pathname.lstrip('/'))
+            bundle = sharkapi.get_miner_bundle(miner)
             
             if chart_type == 'workers':
                 title = 'WORKER HASHRATE OVER TIME'
-                data = sharkapi.sync_get_miner_workers(miner)
+                data = bundle.workers
                 if not data:
                     return {}, title
                 
@@ -348,11 +313,11 @@ def register_callbacks(app, sharkapi, priceapi, styles):
                 
             else:  # payments
                 title = 'PAYMENT HISTORY'
-                data = sharkapi.sync_get_miner_payment_stats(miner)
+                data = bundle.payments
                 if not data:
                     return {}, title
                     
-                df = pd.DataFrame(data)
+                df = pd.DataFrame(list(data))
                 df = df.rename(columns={
                     'timestamp': 'Time',
                     'amount': 'Amount'
@@ -386,10 +351,11 @@ def register_callbacks(app, sharkapi, priceapi, styles):
     def update_table(n, table_type, pathname):
         try:
             miner = unquote(pathname.lstrip('/'))
+            bundle = sharkapi.get_miner_bundle(miner)
             
             if table_type == 'workers':
                 title = 'Worker Data'
-                data = sharkapi.sync_get_miner_workers(miner)
+                data = bundle.workers
                 if not data:
                     return [], title
                 
@@ -409,11 +375,11 @@ def register_callbacks(app, sharkapi, priceapi, styles):
                 
             else:  # blocks
                 title = 'Block Data'
-                data = sharkapi.sync_get_my_blocks(miner)
+                data = bundle.blocks
                 if not data:
                     return [], title
                     
-                df = pd.DataFrame(data)
+                df = pd.DataFrame(list(data))
                 if df.empty:
                     return [], title
                     
@@ -452,7 +418,7 @@ def register_callbacks(app, sharkapi, priceapi, styles):
                 return [html.Div()]
 
             # Get bonus eligibility data
-            bonus_data = sharkapi.get_bonus_eligibility(wallet)
+            bonus_data = sharkapi.get_miner_bundle(wallet).bonus
             if not bonus_data:
                 return [create_metric_section(
                     'mining-reward-icon-2.png',
@@ -1,5 +1,4 @@
 from typing import Dict, List, Tuple
-import pandas as pd
 from dash import html
 import dash_bootstrap_components as dbc
 from .calculate import calculate_mining_effort, calculate_time_to_find_block
@@ -22,12 +21,11 @@ def create_stat_row(title: str, metrics: Dict[str, str], style, large_text_color
     )
 
 def calculate_pool_stats(sharkapi) -> Dict[str, str]:
-    block_data = sharkapi.get_block_stats()
-    block_df = pd.DataFrame(block_data)
+    latest_block = sharkapi.get_block_summary()['latest']
     pool_data = sharkapi.get_pool_stats()
     
     try:
-        recent_block = max(block_df['created'])
+        recent_block = latest_block['created']
         pool_effort = calculate_mining_effort(
             pool_data['networkdifficulty'], 
             pool_data['networkhashrate'],
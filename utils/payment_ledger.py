@@ -0,0 +1,151 @@
+# utils/payment_ledger.py
+"""
+Incremental ledger of pool payments.
+
+/miningcore/payments only grows, and "Total Paid" used to be computed by
+downloading and summing all of it on every refresh. The ledger keeps every
+payment it has seen in the local store with running confirmed totals for the
+pool and for each address. After a one-off full download it fetches the
+newest payments a page at a time and stops at the first page holding a
+payment it already knows, so a refresh costs as much as the new payments.
+Pages keep being read down to the oldest payment still stored as pending,
+so it is credited once it confirms.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .local_store import Fetch, LocalStore, fetch_newest
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = '/miningcore/payments'
+PAGE_SIZE = 100               # payments per incremental page (newest first)
+MAX_PAGES = 20                # more new pages than this and a full download is cheaper
+POOL = ''                     # payment_totals row holding the pool-wide totals
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    key TEXT PRIMARY KEY,
+    address TEXT NOT NULL,
+    amount REAL NOT NULL,
+    status TEXT,
+    created TEXT,
+    tx TEXT
+);
+CREATE INDEX IF NOT EXISTS payments_address ON payments (address);
+CREATE TABLE IF NOT EXISTS payment_totals (
+    address TEXT PRIMARY KEY,
+    total_paid REAL NOT NULL,
+    payments INTEGER NOT NULL,
+    last_payment TEXT
+);
+"""
+
+_CREDIT = """
+INSERT INTO payment_totals (address, total_paid, payments, last_payment) VALUES (?, ?, 1, ?)
+ON CONFLICT(address) DO UPDATE SET
+    total_paid = total_paid + excluded.total_paid,
+    payments = payments + 1,
+    last_payment = max(coalesce(last_payment, ''), coalesce(excluded.last_payment, ''))
+"""
+
+def payment_key(payment: Dict[str, Any]) -> str:
+    """Stable identity of a payment: its id, or its transaction and address"""
+    if payment.get('id') is not None:
+        return str(payment['id'])
+    return f"{payment.get('transactionconfirmationdata')}:{payment.get('address')}"
+
+class PaymentLedger:
+    def __init__(self, store: LocalStore, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        self.store = store
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.store.ensure_schema(_SCHEMA)
+
+    def known(self, payments: Iterable[Dict[str, Any]]) -> int:
+        """How many of payments are already in the ledger"""
+        keys = [payment_key(p) for p in payments]
+        if not keys:
+            return 0
+        placeholders = ','.join('?' * len(keys))
+        return self.store.execute(f'SELECT count(*) FROM payments WHERE key IN ({placeholders})', keys).fetchone()[0]
+
+    def pending(self) -> set:
+        """Keys of stored payments that have not confirmed yet"""
+        return {row['key'] for row in self.store.execute(
+            "SELECT key FROM payments WHERE coalesce(status, 'pending') = 'pending'"
+        )}
+
+    def apply(self, payments: List[Dict[str, Any]]) -> int:
+        """Record payments in one transaction, crediting newly confirmed ones; returns how many were new"""
+        added = 0
+        with self.store.transaction() as conn:
+            for payment in payments:
+                if not isinstance(payment, dict):
+                    continue
+                key = payment_key(payment)
+                status = payment.get('status')
+                row = conn.execute('SELECT status FROM payments WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    conn.execute(
+                        'INSERT INTO payments (key, address, amount, status, created, tx) VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, payment.get('address') or '', float(payment.get('amount') or 0), status,
+                         payment.get('created'), payment.get('transactionconfirmationdata'))
+                    )
+                    added += 1
+                elif row['status'] != status:
+                    conn.execute('UPDATE payments SET status = ? WHERE key = ?', (status, key))
+                else:
+                    continue
+                # A payment counts towards the totals once, when it is first seen confirmed
+                if status == 'confirmed' and (row is None or row['status'] != 'confirmed'):
+                    for address in (POOL, payment.get('address') or ''):
+                        conn.execute(_CREDIT, (address, float(payment.get('amount') or 0), payment.get('created')))
+            self.store.set_meta('payments:synced_at', time.time(), conn)
+        return added
+
+    async def _fetch_new(self, fetch: Fetch) -> Optional[List[Dict[str, Any]]]:
+        """Fetch payments the ledger may not have; None if upstream failed"""
+        if self.store.get_meta('payments:synced_at') is None:
+            data = await fetch(ENDPOINT)
+            return data if isinstance(data, list) else None
+        # Pages are newest first: once a known payment shows up the rest are known too,
+        # but pending payments further down must be re-read until they confirm
+        unseen = await asyncio.to_thread(self.pending)
+
+        def reached(page):
+            unseen.difference_update(payment_key(p) for p in page if isinstance(p, dict))
+            return not unseen and self.known(page) > 0
+
+        return await fetch_newest(fetch, ENDPOINT, self.page_size, self.max_pages, reached)
+
+    async def refresh(self, fetch: Fetch) -> Optional[Dict[str, Any]]:
+        """
+        Bring the ledger up to date and return the payment_stats summary.
+
+        fetch is DataManager._fetch_endpoint. Nothing is written unless every
+        page arrived, so a failed refresh cannot leave a gap behind the newest
+        payments. Returns None if upstream failed.
+        """
+        start = time.monotonic()
+        payments = await self._fetch_new(fetch)
+        if payments is None:
+            return None
+        added = await asyncio.to_thread(self.apply, payments)
+        logger.info(f"Payment ledger synced {added} new of {len(payments)} fetched payments in {time.monotonic() - start:.2f}s")
+        return await asyncio.to_thread(self.summary)
+
+    def totals(self, address: str = POOL) -> Dict[str, Any]:
+        """Confirmed totals for address (the whole pool by default)"""
+        row = self.store.execute(
+            'SELECT total_paid, payments, last_payment FROM payment_totals WHERE address = ?', (address,)
+        ).fetchone()
+        if row is None:
+            return {'total_paid': 0.0, 'payments': 0, 'last_payment': None}
+        return {'total_paid': row['total_paid'], 'payments': row['payments'], 'last_payment': row['last_payment']}
+
+    def summary(self) -> Dict[str, Any]:
+        """The payment_stats cache value"""
+        return self.totals(POOL)
@@ -0,0 +1,168 @@
+# utils/payout_thresholds.py
+"""
+Minimum payout resolution from Sigma BYTES "Pool Config" NFTs, with caching.
+
+The miner page used to build a new ReadTokens on every stats tick and ask
+the explorer for the wallet balance and for the description of every Sigma
+BYTES token in it. The resolver caches the resolved threshold per address,
+caches "no valid NFT" for a shorter time so a newly minted NFT is picked up
+soon, and keeps token descriptions for good since a minted token's
+description never changes. Values are written to Redis (through the
+DataManager codec) so every gunicorn worker shares them; an open miner page
+then makes no explorer calls until its threshold expires.
+"""
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from cachetools import LRUCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Collection ID from Create.tsx
+COLLECTION_ID = "10ba19fae939a8c185eddb239d85f4dc8a77564cb6167578d8019f24696446fc"
+TOKEN_NAME = 'Sigma BYTES'
+TOKEN_TYPE = 'Pool Config'
+DEFAULT_MINIMUM_PAYOUT = 0.5  # ERG
+
+THRESHOLD_TTL = 3600          # seconds a resolved threshold is cached
+NEGATIVE_TTL = 600            # seconds "no valid NFT" is cached
+MAX_ADDRESSES = 10000         # per-process cache entries for each kind
+MAX_DESCRIPTIONS = 10000
+
+def minimum_payout_from(token_id: str, token_info: Dict[str, Any], address: str) -> Optional[float]:
+    """The minimum payout a token description sets for address, or None if it is not a valid Pool Config"""
+    if token_info.get('collection_id') != COLLECTION_ID:
+        logger.warning(f"Token {token_id} has wrong collection ID: {token_info.get('collection_id')}")
+        return None
+    if token_info.get('type') != TOKEN_TYPE:
+        logger.warning(f"Token {token_id} has wrong type: {token_info.get('type')}")
+        return None
+    if token_info.get('address') != address:
+        logger.warning(f"Token {token_id} was minted for different address: {token_info.get('address')}")
+        return None
+    if 'minimumPayout' not in token_info:
+        logger.warning(f"Token {token_id} has no minimumPayout field")
+        return None
+    return float(token_info['minimumPayout'])
+
+class PayoutThresholdResolver:
+    def __init__(self, tokens, redis_client=None, codec=None, threshold_ttl: int = THRESHOLD_TTL,
+                 negative_ttl: int = NEGATIVE_TTL, default: float = DEFAULT_MINIMUM_PAYOUT):
+        self.tokens = tokens
+        self.redis = redis_client if codec is not None else None
+        self.codec = codec
+        self.threshold_ttl = threshold_ttl
+        self.negative_ttl = negative_ttl
+        self.default = default
+        # address -> threshold, and addresses without a valid NFT
+        self._thresholds = TTLCache(maxsize=MAX_ADDRESSES, ttl=threshold_ttl)
+        self._negative = TTLCache(maxsize=MAX_ADDRESSES, ttl=negative_ttl)
+        self._descriptions = LRUCache(maxsize=MAX_DESCRIPTIONS)
+        self._lock = threading.Lock()
+
+    def _get_shared(self, key: str) -> Any:
+        if not self.redis:
+            return None
+        try:
+            data = self.redis.get(key)
+            return self.codec.decode(data) if data is not None else None
+        except Exception as e:
+            logger.error(f"Redis error reading {key}: {e}")
+            return None
+
+    def _set_shared(self, key: str, value: Any, ttl: Optional[int] = None):
+        if not self.redis:
+            return
+        try:
+            if ttl is None:
+                self.redis.set(key, self.codec.encode(value))
+            else:
+                self.redis.setex(key, ttl, self.codec.encode(value))
+        except Exception as e:
+            logger.error(f"Redis error storing {key}: {e}")
+
+    def token_description(self, token_id: str) -> Optional[Dict[str, Any]]:
+        """A token's parsed description, fetched from the explorer at most once"""
+        with self._lock:
+            description = self._descriptions.get(token_id)
+        if description is None:
+            description = self._get_shared(f'token_description:{token_id}')
+        if description is None:
+            description = self.tokens.get_token_description(token_id)
+            if not description:
+                return None
+            self._set_shared(f'token_description:{token_id}', description)
+        with self._lock:
+            self._descriptions[token_id] = description
+        return description
+
+    def cached(self, address: str) -> Optional[Dict[str, Any]]:
+        """{'value': threshold or None} if address has a cached result, else None"""
+        with self._lock:
+            if address in self._thresholds:
+                return {'value': self._thresholds[address]}
+            if address in self._negative:
+                return {'value': None}
+        entry = self._get_shared(f'payout_threshold:{address}')
+        if isinstance(entry, dict) and 'value' in entry:
+            self._remember(address, entry['value'])
+            return entry
+        return None
+
+    def _remember(self, address: str, value: Optional[float]):
+        with self._lock:
+            if value is None:
+                self._negative[address] = True
+            else:
+                self._thresholds[address] = value
+
+    def lookup(self, address: str):
+        """
+        Resolve address's threshold from its wallet.
+
+        Returns (threshold or None, cacheable); a result is not cacheable if
+        the wallet balance or a token description could not be fetched.
+        """
+        wallet_json = json.dumps({"addresses": [address]})
+        tokens = self.tokens.find_token_name_in_wallet(wallet_json, TOKEN_NAME)
+        if tokens is None:
+            logger.warning(f"Could not read the wallet of {address}")
+            return None, False
+        cacheable = True
+        for token in tokens:
+            token_id = token['tokenId']
+            token_info = self.token_description(token_id)
+            if not token_info:
+                logger.warning(f"Could not get token info for {token_id}")
+                cacheable = False
+                continue
+            try:
+                min_payout = minimum_payout_from(token_id, token_info, address)
+            except Exception as e:
+                logger.error(f"Error processing token {token_id}: {e}")
+                continue
+            if min_payout is not None:
+                logger.info(f"Found valid Sigma Bytes NFT with minimum payout: {min_payout} ERG")
+                return min_payout, True
+        return None, cacheable
+
+    def minimum_payout(self, address: str) -> float:
+        """The address's minimum payout from its Sigma BYTES NFT, or the default"""
+        try:
+            entry = self.cached(address)
+            if entry is not None:
+                return self.default if entry['value'] is None else entry['value']
+            value, cacheable = self.lookup(address)
+            if cacheable:
+                self._remember(address, value)
+                ttl = self.negative_ttl if value is None else self.threshold_ttl
+                self._set_shared(f'payout_threshold:{address}', {'value': value}, ttl)
+            if value is None:
+                logger.info(f"No valid Sigma Bytes NFT found for address {address}, using default minimum payout")
+                return self.default
+            return value
+        except Exception as e:
+            logger.error(f"Error getting minimum payout: {e}")
+            return self.default
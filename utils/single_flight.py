@@ -0,0 +1,94 @@
+# utils/single_flight.py
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the fetch; callers arriving while it is in
+    flight wait on the same future and share its result (or exception). Works
+    from plain threads via do() and from coroutines via do_async(), and both
+    share the same in-flight table.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict] = None) -> Hashable:
+        """Build a key from an endpoint and its query parameters"""
+        return (endpoint, tuple(sorted((params or {}).items())))
+
+    def _join(self, key: Hashable):
+        """Return (future, is_leader) for key, registering a new flight if none is running"""
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.debug(f"{self.name}: coalesced call for {key}")
+                return future, False
+            future = Future()
+            # Mark it running so a cancelled follower cannot cancel the shared future
+            future.set_running_or_notify_cancel()
+            self._inflight[key] = future
+            return future, True
+
+    def _finish(self, key: Hashable):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn once for all concurrent callers with the same key"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    async def do_async(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await coro_fn() once for all concurrent callers with the same key"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            # Only the leader was cancelled; followers get an ordinary error
+            future.set_exception(RuntimeError(f"{self.name}: in-flight call for {key} was cancelled"))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Return call, coalesced and in-flight counts"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._inflight)
+            }
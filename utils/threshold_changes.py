@@ -0,0 +1,107 @@
+# utils/threshold_changes.py
+"""
+Detects which miners' payout thresholds may have changed since the last pass.
+
+The payment threshold updater used to re-verify every wallet every 12 hours,
+so a newly minted config NFT could wait that long to apply. Two cheap signals
+say which addresses are worth re-checking:
+
+- Sigma BYTES mints. The explorer's token search lists every token named
+  Sigma BYTES along with its description, which holds the address the config
+  was minted for. Reading the search total costs one request per poll; only
+  when it grows are the pages walked and the new tokens' addresses reported.
+- New miners, meaning addresses in miner_settings that have not been seen before.
+
+NFTs moved between wallets without a new mint do not show up here, so the
+updater still runs a slow full reconciliation as a safety net.
+"""
+import json
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from .payout_thresholds import COLLECTION_ID, TOKEN_NAME, TOKEN_TYPE
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 100        # tokens per explorer search page
+MAX_SEARCH_PAGES = 100
+
+class ThresholdChangeTracker:
+    def __init__(self, token_reader, page_size: int = SEARCH_PAGE_SIZE, max_pages: int = MAX_SEARCH_PAGES):
+        self.token_reader = token_reader
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.token_total = None
+        # Set once a poll has recorded the tokens that already exist
+        self.polled = False
+        self.known_tokens: Set[str] = set()
+        self.known_addresses: Set[str] = set()
+        # address -> when a change was last detected for it
+        self.last_changed: Dict[str, float] = {}
+
+    def _mark(self, addresses: Set[str]):
+        now = time.time()
+        for address in addresses:
+            self.last_changed[address] = now
+
+    @staticmethod
+    def _config_address(token: Dict) -> Optional[str]:
+        """The address a Sigma BYTES Pool Config token was minted for, if it is one"""
+        if token.get('name') != TOKEN_NAME:
+            return None
+        try:
+            description = json.loads(token.get('description') or '')
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(description, dict):
+            return None
+        if description.get('collection_id') != COLLECTION_ID or description.get('type') != TOKEN_TYPE:
+            return None
+        return description.get('address')
+
+    def poll_tokens(self) -> Optional[Set[str]]:
+        """
+        Addresses with Sigma BYTES config tokens minted since the last poll.
+
+        The first poll only records the tokens that exist. Returns None if
+        the explorer failed, leaving the state untouched for the next poll.
+        """
+        first = self.token_reader.search_tokens(TOKEN_NAME, 0, self.page_size)
+        if first is None:
+            return None
+        total = first.get('total')
+        if self.polled and total is not None and total == self.token_total:
+            return set()
+        items = first.get('items') or []
+        tokens = list(items)
+        for page_number in range(1, self.max_pages):
+            if len(items) < self.page_size or (total is not None and len(tokens) >= total):
+                break
+            page = self.token_reader.search_tokens(TOKEN_NAME, page_number * self.page_size, self.page_size)
+            if page is None:
+                return None
+            items = page.get('items') or []
+            tokens.extend(items)
+        new = [token for token in tokens if token.get('id') and token['id'] not in self.known_tokens]
+        baseline = not self.polled
+        self.known_tokens.update(token['id'] for token in new)
+        self.token_total = total
+        self.polled = True
+        if baseline:
+            return set()
+        addresses = {address for address in map(self._config_address, new) if address}
+        self._mark(addresses)
+        logger.info(f"{len(new)} new Sigma BYTES tokens for {len(addresses)} addresses")
+        return addresses
+
+    def new_addresses(self, addresses: Iterable[str]) -> Set[str]:
+        """Addresses not seen before; they are remembered from now on"""
+        new = set(addresses) - self.known_addresses
+        self.known_addresses.update(new)
+        self._mark(new)
+        return new
+
+    def reconciled(self, addresses: Iterable[str]):
+        """Record that a full sweep has just checked addresses"""
+        self.known_addresses.update(addresses)
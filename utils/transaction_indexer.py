@@ -0,0 +1,155 @@
+# utils/transaction_indexer.py
+"""
+Incremental index of the demurrage wallet's transactions from the Ergo explorer.
+
+Demurrage stats used to come from the first page of
+/addresses/{wallet}/transactions only, so they went wrong once the wallet
+had more than a page of activity since its last payout, and every input and
+output was rescanned on each refresh. The indexer pages through the history
+once, classifies each transaction as it is stored (utils/demurrage_utils.py),
+and afterwards fetches newest-first pages only until it meets a transaction
+it already has. The stats are then two indexed queries.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .demurrage_utils import DEMURRAGE_WALLET, EXPLORER_API, NANOERG_FACTOR, classify_transaction
+from .local_store import Fetch, LocalStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100               # transactions per explorer page (newest first)
+MAX_PAGES = 200               # bound on one sync, enough for 20k transactions
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallet_transactions (
+    wallet TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    outgoing INTEGER NOT NULL,
+    sent INTEGER NOT NULL,
+    received INTEGER NOT NULL,
+    PRIMARY KEY (wallet, id)
+);
+CREATE INDEX IF NOT EXISTS wallet_transactions_time ON wallet_transactions (wallet, timestamp);
+"""
+
+def transactions_url(wallet: str) -> str:
+    return f"{EXPLORER_API}/addresses/{wallet}/transactions"
+
+class TransactionIndexer:
+    def __init__(self, store: LocalStore, wallet: str = DEMURRAGE_WALLET, page_size: int = PAGE_SIZE,
+                 max_pages: int = MAX_PAGES):
+        self.store = store
+        self.wallet = wallet
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.store.ensure_schema(_SCHEMA)
+
+    def known(self, transactions: List[Dict[str, Any]]) -> int:
+        """How many of transactions are already indexed"""
+        ids = [tx.get('id') for tx in transactions]
+        if not ids:
+            return 0
+        placeholders = ','.join('?' * len(ids))
+        return self.store.execute(
+            f'SELECT count(*) FROM wallet_transactions WHERE wallet = ? AND id IN ({placeholders})',
+            [self.wallet, *ids]
+        ).fetchone()[0]
+
+    async def _fetch_new(self, fetch: Fetch) -> Optional[Tuple[List[Dict[str, Any]], Optional[int]]]:
+        """
+        Fetch transactions the index may not have; None if any page failed.
+
+        Returns (transactions, resume offset). Until the first walk has reached
+        the end of the history, each refresh reads up to max_pages from where
+        the last one stopped and returns the offset to resume from; after
+        that, pages are read only down to the first one holding an indexed
+        transaction and the offset is None.
+        """
+        synced = await asyncio.to_thread(self.store.get_meta, f'transactions:{self.wallet}:synced_at')
+        offset = 0
+        if synced is None:
+            offset = await asyncio.to_thread(self.store.get_meta, f'transactions:{self.wallet}:backfill_offset') or 0
+        url = transactions_url(self.wallet)
+        transactions = []
+        for _ in range(self.max_pages):
+            data = await fetch(url, {'offset': offset, 'limit': self.page_size})
+            if not isinstance(data, dict):
+                return None
+            items = data.get('items') or []
+            transactions.extend(items)
+            offset += self.page_size
+            if len(items) < self.page_size or (synced is not None and await asyncio.to_thread(self.known, items)):
+                return transactions, None
+        if synced is not None:
+            # More than max_pages of new transactions: walk on down on the following refreshes
+            logger.warning(f"More than {self.max_pages} pages of new transactions for {self.wallet}, resuming next refresh")
+        # New transactions only push older ones to higher offsets, so resuming can repeat rows but not skip them
+        return transactions, offset
+
+    def apply(self, transactions: List[Dict[str, Any]], resume_offset: Optional[int] = None) -> int:
+        """
+        Classify and store new transactions in one transaction; returns how many were new.
+
+        The index counts as synced only once a walk has reached the end of the
+        history (resume_offset None); until then the offset to resume from is kept.
+        """
+        added = 0
+        with self.store.transaction() as conn:
+            for tx in transactions:
+                if not isinstance(tx, dict) or not tx.get('id'):
+                    continue
+                outgoing, sent, received = classify_transaction(tx, self.wallet)
+                added += conn.execute(
+                    'INSERT OR IGNORE INTO wallet_transactions (wallet, id, timestamp, outgoing, sent, received) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (self.wallet, tx['id'], tx.get('timestamp', 0), int(outgoing), sent, received)
+                ).rowcount
+            synced_at = time.time() if resume_offset is None else None
+            self.store.set_meta(f'transactions:{self.wallet}:synced_at', synced_at, conn)
+            self.store.set_meta(f'transactions:{self.wallet}:backfill_offset', resume_offset, conn)
+        return added
+
+    async def refresh(self, fetch: Fetch) -> Optional[Dict[str, Any]]:
+        """
+        Bring the index up to date and return the demurrage summary.
+
+        fetch is DataManager._fetch_endpoint, which accepts absolute URLs.
+        Returns None if the explorer failed (nothing is stored in that case),
+        or while the first walk has not yet reached an outgoing payment.
+        """
+        start = time.monotonic()
+        fetched = await self._fetch_new(fetch)
+        if fetched is None:
+            return None
+        transactions, resume_offset = fetched
+        added = await asyncio.to_thread(self.apply, transactions, resume_offset)
+        logger.info(f"Indexed {added} new of {len(transactions)} fetched transactions in {time.monotonic() - start:.2f}s")
+        summary = await asyncio.to_thread(self.summary)
+        if resume_offset is not None:
+            logger.info(f"Transaction history of {self.wallet} indexed down to offset {resume_offset}, continuing next refresh")
+            # Walked newest first, so everything after an indexed payout is indexed too
+            if summary['last_payment_ts'] is None:
+                return None
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        """Same shape as demurrage_utils.summarize_demurrage"""
+        last = self.store.execute(
+            'SELECT timestamp, sent FROM wallet_transactions WHERE wallet = ? AND outgoing = 1 '
+            'ORDER BY timestamp DESC LIMIT 1', (self.wallet,)
+        ).fetchone()
+        if last is None:
+            return {'last_payment_ts': None, 'last_demurrage': 0, 'next_demurrage': 0}
+        received = self.store.execute(
+            'SELECT coalesce(sum(received), 0) FROM wallet_transactions WHERE wallet = ? AND timestamp > ?',
+            (self.wallet, last['timestamp'])
+        ).fetchone()[0]
+        return {
+            'last_payment_ts': last['timestamp'],
+            'last_demurrage': last['sent'] / NANOERG_FACTOR,
+            'next_demurrage': received / NANOERG_FACTOR
+        }
@@ -1,6 +1,8 @@
 # utils/types.py
-from dataclasses import dataclass
-from typing import Dict, List, Any
+import copy
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 
 @dataclass
 class MinerStats:
@@ -16,6 +18,107 @@ class MinerStats:
     paid_today: float = 0.0
     total_paid: float = 0.0
 
+    @classmethod
+    def from_api(cls, address: str, result: Optional[Dict[str, Any]]) -> Optional['MinerStats']:
+        """Build from a /sigscore/miners/{address} response; None if there is no data"""
+        if not result:
+            return None
+        return cls(
+            address=address,
+            current_hashrate=result.get('current_hashrate', 0.0),
+            shares_per_second=result.get('shares_per_second', 0.0),
+            effort=result.get('effort', 0.0),
+            time_to_find=result.get('time_to_find', 0.0),
+            last_block_found=result.get('last_block_found', {}),
+            payments=result.get('payments', {}),
+            workers=result.get('workers', []),
+            balance=result.get('balance', 0.0),
+            paid_today=result.get('paid_today', 0.0),
+            total_paid=result.get('total_paid', 0.0)
+        )
+
+@dataclass(frozen=True)
+class MinerBundle:
+    """
+    Snapshot of everything the miner page shows for one address.
+
+    The bundle's fields and containers are read-only. The records inside them
+    are plain dicts, deep-copied from the responses so a callback that edits
+    one cannot change the miner cache or another callback's view.
+    """
+    address: str
+    stats: Optional[MinerStats]
+    workers: Mapping[str, Tuple[Dict[str, Any], ...]]
+    blocks: Tuple[Dict[str, Any], ...]
+    payments: Tuple[Dict[str, Any], ...]
+    bonus: Optional[Mapping[str, Any]]
+    pool: Mapping[str, Any]
+    fetched_at: float
+
+    @classmethod
+    def build(cls, address: str, stats: Optional[MinerStats], workers: Dict, blocks: List,
+              payments: List, bonus: Optional[Dict], pool: Dict, fetched_at: float) -> 'MinerBundle':
+        """Create a bundle from copies of the data it is given, freezing the containers"""
+        stats, workers, blocks, payments, bonus, pool = copy.deepcopy((stats, workers, blocks, payments, bonus, pool))
+        return cls(
+            address=address,
+            stats=stats,
+            workers=MappingProxyType({worker: tuple(entries) for worker, entries in (workers or {}).items()}),
+            blocks=tuple(blocks or ()),
+            payments=tuple(payments or ()),
+            bonus=MappingProxyType(dict(bonus)) if bonus else None,
+            pool=MappingProxyType(dict(pool or {})),
+            fetched_at=fetched_at
+        )
+
+    @classmethod
+    def from_raw(cls, address: str, raw: Dict[str, Any], pool: Dict, fetched_at: float) -> 'MinerBundle':
+        """Create a bundle from the raw responses of MINER_BUNDLE_REQUESTS, keyed by kind"""
+        workers, blocks, payments = raw.get('workers'), raw.get('blocks'), raw.get('payments')
+        return cls.build(
+            address,
+            stats=MinerStats.from_api(address, raw.get('stats')),
+            workers=workers if isinstance(workers, dict) else {},
+            blocks=blocks if isinstance(blocks, list) else [],
+            payments=payments if isinstance(payments, list) else [],
+            bonus=parse_bonus_eligibility(raw.get('bonus')),
+            pool=pool,
+            fetched_at=fetched_at
+        )
+
+def miner_bundle_requests(address: str) -> List[Tuple[str, str, Optional[Dict[str, Any]]]]:
+    """(kind, endpoint, params) for every upstream request behind a MinerBundle"""
+    return [
+        ('stats', f"/sigscore/miners/{address}", None),
+        ('workers', f"/sigscore/miners/{address}/workers", {"days": 5}),
+        ('blocks', f"/miningcore/blocks/{address}", {"limit": 100}),
+        ('payments', f"/miningcore/payments/{address}", {"limit": 100}),
+        ('bonus', f"/sigscore/miners/{address}/bonus-eligibility", None)
+    ]
+
+def parse_bonus_eligibility(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Pick the fields the UI shows from a bonus-eligibility response"""
+    if not result:
+        return None
+    return {
+        'eligible': result.get('eligible', False),
+        'qualifying_days': result.get('qualifying_days', 0),
+        'total_days_active': result.get('total_days_active', 0),
+        'needs_days': result.get('needs_days', False),
+        'analysis': result.get('analysis', '')
+    }
+
+@dataclass
+class BatchResult:
+    """Results of ApiReader.fetch_many, in request order"""
+    results: List[Any]
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> List[int]:
+        """Indexes of the requests that failed"""
+        return sorted(self.errors)
+
 class ApiException(Exception):
     """Custom exception for API-related errors"""
     pass
\ No newline at end of file
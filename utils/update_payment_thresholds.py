@@ -1,34 +1,58 @@
-import os
 import logging
 import psycopg2
 from psycopg2.extras import DictCursor
 from datetime import datetime
 from .find_miner_id import ReadTokens
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
 import time
-import requests
+from .http_client import default_client
+from .miner_settings import POOL_ID, postgres_params
+from .threshold_changes import ThresholdChangeTracker
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = 16              # concurrent NFT lookups
+EXPLORER_RATE = 20            # explorer requests per second across all workers
+UPDATE_CHUNK = 500            # rows per UPDATE ... FROM (VALUES ...) statement
+CHANGE_POLL_INTERVAL = 120    # seconds between incremental passes
+FULL_SWEEP_INTERVAL = 43200   # seconds between full reconciliations (12 hours)
+ERROR_RETRY_INTERVAL = 300    # seconds to wait after a failed pass
+
+class RateBudget:
+    """Spaces calls at most rate per second apart, across threads"""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller's slot in the budget comes up"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 class PaymentThresholdUpdater:
-    def __init__(self):
+    def __init__(self, max_workers: int = MAX_WORKERS, explorer_rate: float = EXPLORER_RATE):
         """Initialize the updater with database connection from environment variables"""
-        self.db_params = {
-            'dbname': os.getenv('POSTGRES_DB', 'miningcore'),
-            'user': os.getenv('POSTGRES_USER', 'postgres'),
-            'password': os.getenv('POSTGRES_PASSWORD', 'password'),
-            'host': os.getenv('POSTGRES_HOST', 'localhost'),
-            'port': os.getenv('POSTGRES_PORT', '5432')
-        }
+        self.db_params = postgres_params()
         self.token_reader = ReadTokens()
-        self.pool_id = 'ErgoSigmanauts'
+        self.http = default_client()
+        self.pool_id = POOL_ID
         self.default_threshold = 0.1  # Default minimum payout if no NFT found
         self.api_base_url = "http://5.78.102.130:8000"
         self.collection_id = "10ba19fae939a8c185eddb239d85f4dc8a77564cb6167578d8019f24696446fc"
         self._db_connection = None
+        self.max_workers = max_workers
+        self.explorer_budget = RateBudget(explorer_rate)
+        self.changes = ThresholdChangeTracker(self.token_reader)
 
     @property
     def db_connection(self):
@@ -58,7 +82,7 @@ class PaymentThresholdUpdater:
                     "limit": limit,
                     "offset": offset
                 }
-                response = requests.get(url, params=params)
+                response = self.http.get(url, params=params)
                 
                 if response.status_code != 200:
                     logger.error(f"Failed to get miners from API: {response.status_code}")
@@ -111,6 +135,7 @@ class PaymentThresholdUpdater:
             wallet_json = json.dumps({"addresses": [address]})
             
             # Look for Sigma Bytes NFT
+            self.explorer_budget.acquire()
             tokens = self.token_reader.find_token_name_in_wallet(wallet_json, 'Sigma BYTES')
             
             if not tokens:
@@ -120,6 +145,7 @@ class PaymentThresholdUpdater:
             # Check each token found
             for token in tokens:
                 token_id = token['tokenId']
+                self.explorer_budget.acquire()
                 token_info = self.token_reader.get_token_description(token_id)
                 
                 if not token_info:
@@ -141,68 +167,150 @@ class PaymentThresholdUpdater:
             logger.error(f"Error checking NFT for address {address}: {e}")
             return None
 
-    def update_miner_threshold(self, address: str, new_threshold: float) -> bool:
-        """Update a miner's payment threshold in the database"""
-        query = """
-        UPDATE miner_settings 
-        SET paymentthreshold = %s, updated = NOW() 
-        WHERE poolid = %s AND address = %s
-        """
-        
+    def _rollback(self):
+        """Roll back after a failed statement; drop a closed connection so the next pass reconnects"""
+        conn = self._db_connection
+        if conn is None:
+            return
         try:
-            with self.db_connection.cursor() as cur:
-                cur.execute(query, (new_threshold, self.pool_id, address))
-                self.db_connection.commit()
-                return True
+            conn.rollback()
         except Exception as e:
-            logger.error(f"Failed to update threshold for {address}: {e}")
-            return False
+            logger.error(f"Failed to roll back: {e}")
+        if conn.closed:
+            self._db_connection = None
 
-    def get_current_threshold(self, address: str) -> Optional[float]:
-        """Get current threshold from database"""
+    def get_current_thresholds(self) -> Optional[Dict[str, float]]:
+        """Get every current threshold for the pool from the database in one query"""
         query = """
-        SELECT paymentthreshold 
+        SELECT address, paymentthreshold 
         FROM miner_settings 
-        WHERE poolid = %s AND address = %s
+        WHERE poolid = %s
         """
         
         try:
             with self.db_connection.cursor() as cur:
-                cur.execute(query, (self.pool_id, address))
-                result = cur.fetchone()
-                return float(result[0]) if result else None
+                cur.execute(query, (self.pool_id,))
+                thresholds = {address: float(threshold) for address, threshold in cur.fetchall()}
+            # End the read's implicit transaction so the connection does not sit idle in it
+            self.db_connection.rollback()
+            return thresholds
         except Exception as e:
-            logger.error(f"Failed to get current threshold for {address}: {e}")
+            logger.error(f"Failed to get current thresholds: {e}")
+            self._rollback()
             return None
 
-    def process_all_miners(self, miners: Optional[List[Dict]] = None):
-        """Process all miners and update their payment thresholds based on NFT ownership"""
+    def update_miner_thresholds(self, thresholds: Dict[str, float]) -> bool:
+        """Update many miners' payment thresholds in one transaction, UPDATE_CHUNK rows per statement"""
+        items = list(thresholds.items())
+        try:
+            with self.db_connection.cursor() as cur:
+                for i in range(0, len(items), UPDATE_CHUNK):
+                    chunk = items[i:i + UPDATE_CHUNK]
+                    query = f"""
+                    UPDATE miner_settings AS m
+                    SET paymentthreshold = v.threshold, updated = NOW()
+                    FROM (VALUES {', '.join(['(%s, %s)'] * len(chunk))}) AS v(address, threshold)
+                    WHERE m.poolid = %s AND m.address = v.address
+                    """
+                    cur.execute(query, tuple(value for item in chunk for value in item) + (self.pool_id,))
+            self.db_connection.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update {len(items)} thresholds: {e}")
+            self._rollback()
+            return False
+
+    def process_all_miners(self, miners: Optional[List[Dict]] = None,
+                           stored: Optional[Dict[str, float]] = None) -> Optional[Dict[str, float]]:
+        """
+        Process all miners and update their payment thresholds based on NFT ownership
+
+        Current thresholds are read in one query and changes written in one
+        transaction, both on this thread; the NFT lookups run on up to
+        max_workers threads within the explorer rate budget. Returns the
+        run's counts and per-phase timings, or None if the database could
+        not be read. stored skips the read when the caller already has the
+        current thresholds.
+        """
+        report = {}
+        start = time.monotonic()
         if miners is None:
             miners = self.get_all_miners()
+        report['fetch_seconds'] = time.monotonic() - start
             
         logger.info(f"Processing {len(miners)} miners")
         
+        # Get current thresholds from database
+        phase = time.monotonic()
+        if stored is None:
+            stored = self.get_current_thresholds()
+        if stored is None:
+            return None
+        current = {}
         for miner in miners:
             address = miner.get('address')
-            if not address:
+            if not address or address in current:
                 continue
-                
-            # Get current threshold from database
-            current_threshold = self.get_current_threshold(address)
-            if current_threshold is None:
+            if address not in stored:
                 logger.warning(f"Miner {address} not found in database")
                 continue
-            
-            # Get threshold from NFT
-            nft_threshold = self.get_miner_nft_threshold(address)
-            
-            # Only update if they have a valid NFT and the threshold is different
+            current[address] = stored[address]
+        report['read_seconds'] = time.monotonic() - phase
+        # Every stored address is now the baseline, including miners no longer active
+        self.changes.reconciled(stored)
+
+        # Get thresholds from NFTs
+        phase = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='nft-lookup') as executor:
+            nft_thresholds = dict(zip(current, executor.map(self.get_miner_nft_threshold, current)))
+        report['lookup_seconds'] = time.monotonic() - phase
+
+        # Only update if they have a valid NFT and the threshold is different
+        phase = time.monotonic()
+        changes = {}
+        for address, nft_threshold in nft_thresholds.items():
+            current_threshold = current[address]
             if nft_threshold is not None and abs(nft_threshold - current_threshold) > 0.000001:
                 logger.info(f"Updating threshold for {address}: {current_threshold} -> {nft_threshold}")
-                if self.update_miner_threshold(address, nft_threshold):
-                    logger.info(f"Successfully updated threshold for {address}")
-                else:
-                    logger.error(f"Failed to update threshold for {address}")
+                changes[address] = nft_threshold
+        updated = 0
+        if changes:
+            if self.update_miner_thresholds(changes):
+                logger.info(f"Successfully updated {len(changes)} thresholds")
+                updated = len(changes)
+            else:
+                logger.error(f"Failed to update {len(changes)} thresholds")
+        report['update_seconds'] = time.monotonic() - phase
+
+        elapsed = time.monotonic() - start
+        report.update(miners=len(current), updated=updated, total_seconds=elapsed,
+                      miners_per_second=len(current) / elapsed if elapsed > 0 else 0.0)
+        logger.info(
+            f"Checked {report['miners']} miners, updated {updated} in {elapsed:.1f}s "
+            f"({report['miners_per_second']:.1f} miners/s; fetch {report['fetch_seconds']:.1f}s, "
+            f"read {report['read_seconds']:.1f}s, lookup {report['lookup_seconds']:.1f}s, "
+            f"update {report['update_seconds']:.1f}s)"
+        )
+        return report
+
+    def process_changes(self) -> Optional[Dict[str, float]]:
+        """
+        Re-verify only miners whose NFTs may have changed: addresses with a
+        newly minted Sigma BYTES config token, and miners new to the database
+        """
+        minted = self.changes.poll_tokens()
+        if minted is None:
+            logger.warning("Could not poll Sigma BYTES mints; new NFTs wait for the next pass")
+            minted = set()
+        stored = self.get_current_thresholds()
+        if stored is None:
+            return None
+        affected = (minted | self.changes.new_addresses(stored)) & set(stored)
+        if not affected:
+            logger.debug("No threshold changes detected")
+            return {'miners': 0, 'updated': 0}
+        logger.info(f"Re-verifying {len(affected)} changed miners")
+        return self.process_all_miners([{'address': address} for address in sorted(affected)], stored)
 
     def __del__(self):
         """Close database connection on cleanup"""
@@ -210,22 +318,38 @@ class PaymentThresholdUpdater:
             self._db_connection.close()
 
 def main():
-    """Main function to run the payment threshold updater"""
+    """
+    Main function to run the payment threshold updater
+
+    A full sweep runs at start and every FULL_SWEEP_INTERVAL as a safety net;
+    in between, every CHANGE_POLL_INTERVAL, only changed miners are re-verified.
+    """
     updater = PaymentThresholdUpdater()
+    next_full_sweep = 0.0
     
     while True:
         try:
-            logger.info("Starting payment threshold update cycle")
-            updater.process_all_miners()
-            logger.info("Completed payment threshold update cycle")
+            if not updater.changes.polled:
+                # Record the Sigma BYTES tokens that exist before the first sweep checks every miner,
+                # so that anything minted from then on is reported as a change
+                if updater.changes.poll_tokens() is None:
+                    logger.warning("Could not record existing Sigma BYTES tokens, retrying")
+                    time.sleep(CHANGE_POLL_INTERVAL)
+                    continue
+            if time.monotonic() >= next_full_sweep:
+                logger.info("Starting payment threshold update cycle")
+                if updater.process_all_miners() is not None:
+                    logger.info("Completed payment threshold update cycle")
+                    next_full_sweep = time.monotonic() + FULL_SWEEP_INTERVAL
+            else:
+                updater.process_changes()
             
-            # Sleep for 12 hours (43200 seconds)
-            time.sleep(43200)
+            time.sleep(CHANGE_POLL_INTERVAL)
             
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
-            # Sleep for 5 minutes on error before retrying
-            time.sleep(300)
+            # Wait before retrying
+            time.sleep(ERROR_RETRY_INTERVAL)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file